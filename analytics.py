@@ -0,0 +1,275 @@
+"""Difficulty statistics of mine layouts, computed for many boards at once.
+
+Every statistic is a whole-array numpy operation over a stack of boards, a
+bool array of shape (boards, height, width), so no Python loop runs per
+block or per board:
+
+- openings: the connected areas of blocks without mines around (8-connected),
+  labelled by min label propagation with pointer jumping, plus the numbers
+  bordering them, which a single click on the area opens too;
+- isolated numbers: numbers bordering no opening, each needs its own click;
+- 3BV: the fewest clicks clearing the board, one per opening and one per
+  isolated number;
+- mine clustering: the mean number of mines around a mine, and that mean
+  divided by the one a uniformly random layout of the same board would have,
+  so 1.0 is random and larger is clumpier.
+
+analyze(field) returns the statistics of one MineField, analyze_batch the
+columns of a stack of boards. ColumnWriter streams the columns of batch after
+batch to a folder holding one raw array file per column, read back with
+read_columns, so a dataset never has to fit in memory:
+
+    python analytics.py --boards 1000000 --output expert_stats
+"""
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+# name -> dtype of every column analyze_batch returns
+COLUMNS = {
+    "three_bv": np.int32,
+    "openings": np.int32,
+    "opening_blocks": np.int32,  # blocks opened by clicking the openings
+    "largest_opening": np.int32,
+    "isolated_numbers": np.int32,
+    "mine_neighbours": np.float32,  # mean mines around a mine
+    "clustering": np.float32,
+}
+CHUNK = 1024  # boards analysed per batch by main, small enough to stay in cache
+SCHEMA = "columns.json"
+
+_SHIFTS = [(dy, dx) for dy in (0, 1, 2) for dx in (0, 1, 2) if (dy, dx) != (1, 1)]
+
+
+def layout_array(field):
+    """bool array (height, width) of the mines of a MineField"""
+    if not field._placed:
+        raise ValueError("the mines are not placed yet")
+    mines = np.frombuffer(bytes(field._mines), dtype=np.uint8)
+    return mines.reshape(field.height, field.width).astype(bool)
+
+
+def random_layouts(count, width, height, mine_count, rng=None):
+    """a stack of count uniformly random layouts, from a numpy Generator"""
+    rng = np.random.default_rng(rng)
+    size = width * height
+    boards = np.zeros((count, size), dtype=bool)
+    if mine_count:
+        # the blocks of the mine_count lowest of size random numbers
+        ranks = rng.random((count, size)).argpartition(mine_count - 1, axis=1)
+        np.put_along_axis(boards, ranks[:, :mine_count], True, axis=1)
+    return boards.reshape(count, height, width)
+
+
+def _neighbours(padded, height, width):
+    """the eight shifted views of a board stack padded by one block"""
+    return [padded[:, dy : dy + height, dx : dx + width] for dy, dx in _SHIFTS]
+
+
+def _pad(boards, value):
+    count, height, width = boards.shape
+    padded = np.full((count, height + 2, width + 2), value, dtype=boards.dtype)
+    padded[:, 1:-1, 1:-1] = boards
+    return padded
+
+
+def _count(boards):
+    """the number of set blocks around every block of a bool board stack"""
+    count, height, width = boards.shape
+    padded = _pad(boards.view(np.uint8), 0)
+    return sum(view for view in _neighbours(padded, height, width))
+
+
+def _label_zeros(zeros):
+    """label every 8-connected area of zeros with its lowest flat index
+
+    Blocks outside the areas get the label zeros.size. Each round takes the
+    lowest label around every zero, then follows labels to the label of
+    their block, which halves the remaining distances; labels only ever
+    point to blocks of the same area.
+    """
+    count, height, width = zeros.shape
+    none = zeros.size
+    indices = np.arange(none, dtype=np.int32).reshape(zeros.shape)
+    labels = np.where(zeros, indices, none)
+    # one past the end reads as "no area", so labels can index it
+    lookup = np.empty(none + 1, dtype=np.int32)
+    lookup[none] = none
+    while True:
+        # the 3x3 minimum as a minimum of three columns of three row minimums
+        padded = _pad(labels, none)
+        rows = np.minimum(padded[:, :, :-2], padded[:, :, 1:-1])
+        np.minimum(rows, padded[:, :, 2:], out=rows)
+        lowest = np.minimum(rows[:, :-2], rows[:, 1:-1])
+        np.minimum(lowest, rows[:, 2:], out=lowest)
+        lowest[~zeros] = none
+        lookup[:none] = lowest.ravel()
+        jumped = lookup[lowest]
+        if np.array_equal(jumped, labels):
+            return labels
+        labels = jumped
+
+
+def analyze_batch(boards):
+    """the COLUMNS of a bool array (boards, height, width) of mine layouts
+
+    Return a dict of arrays with one entry per board.
+    """
+    boards = np.asarray(boards, dtype=bool)
+    count, height, width = boards.shape
+    size = height * width
+    around = _count(boards)
+
+    zeros = ~boards & (around == 0)
+    numbers = ~boards & (around > 0)
+    labels = _label_zeros(zeros)
+    none = labels.size
+
+    # the areas around every number, each one counted once per number
+    border = np.stack(
+        [view[numbers] for view in _neighbours(_pad(labels, none), height, width)]
+    )
+    border.sort(axis=0)
+    first = border != none
+    first[1:] &= border[1:] != border[:-1]
+    borders = np.bincount(border[first], minlength=none + 1)[:none]
+
+    roots = np.flatnonzero(labels.ravel() == np.arange(none))
+    root_boards = roots // size
+    areas = np.bincount(labels[zeros], minlength=none)[roots] + borders[roots]
+    openings = np.bincount(root_boards, minlength=count)
+    largest = np.zeros(count, dtype=np.int64)
+    np.maximum.at(largest, root_boards, areas)
+
+    touching = np.zeros(boards.shape, dtype=bool)
+    touching[numbers] = border[0] != none  # the lowest label is an area if any
+    isolated = (numbers & ~touching).sum(axis=(1, 2))
+    opening_blocks = (zeros | touching).sum(axis=(1, 2))
+
+    # clustering against a random layout: a mine's neighbour is another mine
+    # with probability (mines - 1) / (blocks - 1)
+    mine_count = boards.sum(axis=(1, 2))
+    mine_around = np.where(boards, around, 0).sum(axis=(1, 2))
+    neighbour_blocks = _count(np.ones((1, height, width), dtype=bool))
+    mine_blocks = np.where(boards, neighbour_blocks, 0).sum(axis=(1, 2))
+    expected = mine_blocks * (mine_count - 1) / max(size - 1, 1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = np.where(mine_count > 0, mine_around / np.maximum(mine_count, 1), 0.0)
+        clustering = np.where(expected > 0, mine_around / expected, np.nan)
+
+    columns = {
+        "three_bv": openings + isolated,
+        "openings": openings,
+        "opening_blocks": opening_blocks,
+        "largest_opening": largest,
+        "isolated_numbers": isolated,
+        "mine_neighbours": mean,
+        "clustering": clustering,
+    }
+    return {name: columns[name].astype(dtype) for name, dtype in COLUMNS.items()}
+
+
+def analyze(field):
+    """the statistics of one MineField, or of one (height, width) layout"""
+    layout = field if isinstance(field, np.ndarray) else layout_array(field)
+    columns = analyze_batch(layout[np.newaxis])
+    return {name: column[0].item() for name, column in columns.items()}
+
+
+class ColumnWriter:
+    """Append batches of columns to a folder of raw little-endian arrays
+
+    Every column is the file <name>.bin in the folder; SCHEMA records the
+    dtypes and the number of rows written, it is rewritten on close.
+    """
+
+    def __init__(self, folder):
+        os.makedirs(folder, exist_ok=True)
+        self.folder = folder
+        self.rows = 0
+        self.dtypes = {}
+        self._files = {}
+
+    def write(self, columns):
+        """append one batch, a dict of equally long arrays"""
+        lengths = {len(column) for column in columns.values()}
+        if len(lengths) != 1:
+            raise ValueError("columns of different lengths")
+        if not self._files:
+            for name, column in columns.items():
+                self.dtypes[name] = np.asarray(column).dtype.newbyteorder("<")
+                path = os.path.join(self.folder, name + ".bin")
+                self._files[name] = open(path, "wb")
+        elif columns.keys() != self._files.keys():
+            raise ValueError("columns differ from the first batch")
+        for name, column in columns.items():
+            self._files[name].write(
+                np.ascontiguousarray(column, dtype=self.dtypes[name]).tobytes()
+            )
+        self.rows += lengths.pop()
+
+    def close(self):
+        for file in self._files.values():
+            file.close()
+        schema = {
+            "rows": self.rows,
+            "columns": {name: dtype.str for name, dtype in self.dtypes.items()},
+        }
+        with open(os.path.join(self.folder, SCHEMA), "w") as file:
+            json.dump(schema, file, indent=1)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def read_columns(folder, mmap=True):
+    """the columns written by a ColumnWriter, memory mapped unless mmap is False"""
+    with open(os.path.join(folder, SCHEMA)) as file:
+        schema = json.load(file)
+    columns = {}
+    for name, dtype in schema["columns"].items():
+        path = os.path.join(folder, name + ".bin")
+        if mmap and schema["rows"]:
+            columns[name] = np.memmap(path, dtype=dtype, mode="r", shape=schema["rows"])
+        else:
+            columns[name] = np.fromfile(path, dtype=dtype, count=schema["rows"])
+    return columns
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--boards", type=int, default=100000)
+    parser.add_argument("--size", default="30x16", help="board size WIDTHxHEIGHT")
+    parser.add_argument("--mines", type=int, default=99)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chunk", type=int, default=CHUNK, help="boards per batch")
+    parser.add_argument("--output", required=True, metavar="FOLDER")
+    args = parser.parse_args()
+
+    width, height = (int(v) for v in args.size.lower().split("x"))
+    rng = np.random.default_rng(args.seed)
+    start = time.perf_counter()
+    three_bv = 0
+    with ColumnWriter(args.output) as writer:
+        for done in range(0, args.boards, args.chunk):
+            count = min(args.chunk, args.boards - done)
+            columns = analyze_batch(
+                random_layouts(count, width, height, args.mines, rng)
+            )
+            writer.write(columns)
+            three_bv += int(columns["three_bv"].sum())
+    seconds = time.perf_counter() - start
+    print(
+        f"{args.boards} boards, mean 3BV {three_bv / max(args.boards, 1):.1f}, "
+        f"{args.boards / seconds:.0f} boards/s"
+    )
+
+
+if __name__ == "__main__":
+    main()
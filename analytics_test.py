@@ -0,0 +1,119 @@
+import os
+import random
+import tempfile
+import unittest
+
+from mine_field import MineField
+
+try:
+    import numpy as np
+except ImportError:  # the analytics are numpy only
+    np = None
+
+if np is not None:
+    import analytics
+
+
+def reference_stats(field):
+    """openings, their sizes, isolated numbers and 3BV, block by block"""
+    size = field.width * field.height
+    mines, counts = field._mines, field._counts
+    seen = set()
+    sizes = []
+    for start in range(size):
+        if mines[start] or counts[start] or start in seen:
+            continue
+        area, stack = {start}, [start]
+        seen.add(start)
+        while stack:
+            index = stack.pop()
+            for around in field.around(index):
+                if around in area or mines[around]:
+                    continue
+                area.add(around)
+                if not counts[around]:
+                    seen.add(around)
+                    stack.append(around)
+        sizes.append(len(area))
+    isolated = sum(
+        1
+        for index in range(size)
+        if not mines[index]
+        and counts[index]
+        and all(mines[i] or counts[i] for i in field.around(index))
+    )
+    return len(sizes), max(sizes, default=0), isolated, len(sizes) + isolated
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class AnalyticsTest(unittest.TestCase):
+    def test_small_boards(self):
+        stats = analytics.analyze(MineField.from_mines(4, 4, []))
+        self.assertEqual(stats["three_bv"], 1)
+        stats = analytics.analyze(MineField.from_mines(3, 3, [4]))
+        self.assertEqual((stats["openings"], stats["isolated_numbers"]), (0, 8))
+        stats = analytics.analyze(MineField.from_mines(5, 1, [4]))
+        self.assertEqual((stats["openings"], stats["largest_opening"]), (1, 4))
+
+    def test_same_as_reference(self):
+        rng = random.Random(3)
+        boards = ((9, 9, 10), (16, 16, 40), (30, 16, 99), (1, 7, 1))
+        for width, height, mine_count in boards:
+            for _ in range(20):
+                mines = rng.sample(range(width * height), mine_count)
+                field = MineField.from_mines(width, height, mines)
+                stats = analytics.analyze(field)
+                self.assertEqual(
+                    (
+                        stats["openings"],
+                        stats["largest_opening"],
+                        stats["isolated_numbers"],
+                        stats["three_bv"],
+                    ),
+                    reference_stats(field),
+                    (width, height, mines),
+                )
+
+    def test_batch_is_per_board(self):
+        boards = analytics.random_layouts(50, 16, 16, 40, rng=1)
+        self.assertEqual(boards.sum(axis=(1, 2)).tolist(), [40] * 50)
+        columns = analytics.analyze_batch(boards)
+        for i in (0, 17, 49):
+            single = analytics.analyze(boards[i])
+            for name, column in columns.items():
+                self.assertAlmostEqual(column[i], single[name], places=5)
+
+    def test_clustering(self):
+        # a 2x2 clump has 3 mines around every mine, far above a random layout
+        field = MineField.from_mines(10, 10, [0, 1, 10, 11])
+        stats = analytics.analyze(field)
+        self.assertEqual(stats["mine_neighbours"], 3.0)
+        self.assertGreater(stats["clustering"], 5)
+        boards = analytics.random_layouts(2000, 30, 16, 99, rng=2)
+        mean = np.nanmean(analytics.analyze_batch(boards)["clustering"])
+        self.assertAlmostEqual(mean, 1.0, delta=0.02)
+
+    def test_unplaced_field(self):
+        with self.assertRaises(ValueError):
+            analytics.analyze(MineField(9, 9, 10))
+
+    def test_column_writer(self):
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "stats")
+            batches = [
+                analytics.analyze_batch(analytics.random_layouts(count, 9, 9, 10, seed))
+                for seed, count in enumerate((30, 7))
+            ]
+            with analytics.ColumnWriter(path) as writer:
+                for batch in batches:
+                    writer.write(batch)
+            columns = analytics.read_columns(path)
+            self.assertEqual(set(columns), set(analytics.COLUMNS))
+            for name, column in columns.items():
+                expected = np.concatenate([batch[name] for batch in batches])
+                np.testing.assert_array_equal(column, expected)
+                self.assertEqual(column.dtype, analytics.COLUMNS[name])
+
+
+if __name__ == "__main__":
+    unittest.main()
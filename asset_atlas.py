@@ -0,0 +1,165 @@
+"""All game images packed into one cached atlas image.
+
+Building the images means loading every bitmap and smoothscaling each tile to
+every tile size in use. build_atlas does that once and packs the results into
+a single surface, one row per group of images: the unscaled sources, the tiles
+at each size and the faces. load_atlas keeps the packed image and a JSON index
+of its rects in a cache folder. The cache is keyed on the mtime and size of
+the source files, backed by a hash of their contents, so a fresh checkout
+with new mtimes but the same bitmaps still hits; it is rebuilt whenever a
+source or the requested layout changes. A hit loads the atlas with a single
+image load and slices it into subsurfaces.
+
+    atlas = load_atlas("resources", ["0", "flag"], {20: ["0", "flag"]})
+    atlas["20"]["flag"]  # the flag tile scaled to 20 x 20
+"""
+import hashlib
+import json
+import os
+
+import pygame
+
+VERSION = 1
+CACHE_FOLDER = ".cache"
+IMAGE_NAME = "atlas.bmp"
+INDEX_NAME = "atlas.json"
+SOURCE_GROUP = "source"
+
+
+def source_path(resource_folder, name):
+    return os.path.join(resource_folder, f"{name}.bmp")
+
+
+def build_atlas(resource_folder, names, scaled):
+    """return (atlas Surface, index) packing the images
+
+    names are the bitmaps to load, scaled maps a size to the names scaled to
+    size x size. The index maps a group, SOURCE_GROUP or str(size), to
+    {str(name): [x, y, width, height]}. Needs a display mode set, the images are
+    converted to its format.
+    """
+    sources = {
+        name: pygame.image.load(source_path(resource_folder, name)).convert()
+        for name in names
+    }
+    rows = [(SOURCE_GROUP, sources)]
+    for size, keys in scaled.items():
+        rows.append(
+            (
+                str(size),
+                {
+                    name: pygame.transform.smoothscale(sources[name], (size, size))
+                    for name in keys
+                },
+            )
+        )
+
+    index = {}
+    width = height = 0
+    for group, images in rows:
+        x = 0
+        rects = index[group] = {}
+        for name, image in images.items():
+            rects[str(name)] = [x, height, *image.get_size()]
+            x += image.get_width()
+        width = max(width, x)
+        height += max((image.get_height() for image in images.values()), default=0)
+
+    atlas = pygame.Surface((max(width, 1), max(height, 1))).convert()
+    for group, images in rows:
+        for name, image in images.items():
+            atlas.blit(image, index[group][str(name)][:2])
+    return atlas, index
+
+
+def load_atlas(resource_folder, names, scaled, cache_folder=None):
+    """return {group: {str(name): Surface}} as packed by build_atlas, cached
+
+    cache_folder defaults to CACHE_FOLDER inside resource_folder. A cache
+    that cannot be written is skipped, the atlas is then built every time.
+    """
+    if cache_folder is None:
+        cache_folder = os.path.join(resource_folder, CACHE_FOLDER)
+    image_path = os.path.join(cache_folder, IMAGE_NAME)
+    index_path = os.path.join(cache_folder, INDEX_NAME)
+    layout = {
+        "version": VERSION,
+        "names": [str(name) for name in names],
+        "scaled": {
+            str(size): [str(name) for name in keys] for size, keys in scaled.items()
+        },
+    }
+    stamps = {str(name): _stamp(source_path(resource_folder, name)) for name in names}
+
+    cached = _read_index(index_path)
+    atlas = None
+    if cached is not None and cached["layout"] == layout:
+        if cached["stamps"] == stamps:
+            atlas = _load_image(image_path)
+        elif cached["hash"] == _hash(resource_folder, names):
+            # touched but unchanged, e.g. a fresh checkout: refresh the stamps
+            atlas = _load_image(image_path)
+            if atlas is not None:
+                cached["stamps"] = stamps
+                try:
+                    _write(index_path, json.dumps(cached).encode())
+                except OSError:
+                    pass
+
+    if atlas is None:
+        atlas, rects = build_atlas(resource_folder, names, scaled)
+        cached = {
+            "layout": layout,
+            "stamps": stamps,
+            "hash": _hash(resource_folder, names),
+            "rects": rects,
+        }
+        try:
+            os.makedirs(cache_folder, exist_ok=True)
+            temporary = f"{image_path}.tmp.bmp"
+            pygame.image.save(atlas, temporary)
+            os.replace(temporary, image_path)
+            _write(index_path, json.dumps(cached).encode())
+        except (OSError, pygame.error):
+            pass  # read-only resources: use the atlas built in memory
+
+    return {
+        group: {name: atlas.subsurface(rect) for name, rect in rects.items()}
+        for group, rects in cached["rects"].items()
+    }
+
+
+def _stamp(path):
+    stat = os.stat(path)
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def _hash(resource_folder, names):
+    digest = hashlib.sha256()
+    for name in names:
+        with open(source_path(resource_folder, name), "rb") as file:
+            digest.update(file.read())
+    return digest.hexdigest()
+
+
+def _read_index(path):
+    try:
+        with open(path, "rb") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+def _load_image(path):
+    try:
+        return pygame.image.load(path).convert()
+    except (OSError, pygame.error):
+        return None
+
+
+def _write(path, data):
+    """replace path with data only once it is completely written"""
+    temporary = f"{path}.tmp"
+    with open(temporary, "wb") as file:
+        file.write(data)
+    os.replace(temporary, path)
@@ -0,0 +1,85 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+try:
+    import pygame
+except ImportError:  # the atlas is built with pygame
+    pygame = None
+
+if pygame is not None:
+    import asset_atlas
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+NAMES = [0, "flag", "face_normal"]
+SCALED = {20: [0, "flag"], 30: ["face_normal"]}
+
+
+@unittest.skipIf(pygame is None, "pygame is not installed")
+class AssetAtlasTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        pygame.display.init()
+        pygame.display.set_mode((1, 1))
+
+    @classmethod
+    def tearDownClass(cls):
+        pygame.display.quit()
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        for name in NAMES:
+            shutil.copy(asset_atlas.source_path(HERE, name), self.folder)
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def load(self):
+        """load the atlas, return it and whether it was built"""
+        build = mock.Mock(wraps=asset_atlas.build_atlas)
+        with mock.patch.object(asset_atlas, "build_atlas", build):
+            atlas = asset_atlas.load_atlas(self.folder, NAMES, SCALED)
+        return atlas, build.called
+
+    def test_images_match_scaled_sources(self):
+        for built in (True, False):
+            atlas, called = self.load()
+            self.assertEqual(called, built)
+            for size, names in SCALED.items():
+                for name in names:
+                    source = pygame.image.load(asset_atlas.source_path(HERE, name))
+                    expected = pygame.transform.smoothscale(
+                        source.convert(), (size, size)
+                    )
+                    image = atlas[str(size)][str(name)]
+                    self.assertEqual(image.get_size(), (size, size))
+                    self.assertEqual(
+                        pygame.image.tostring(image, "RGB"),
+                        pygame.image.tostring(expected, "RGB"),
+                    )
+            self.assertEqual(atlas[asset_atlas.SOURCE_GROUP]["flag"].get_size(), (25, 25))
+
+    def test_cache_invalidation(self):
+        self.assertTrue(self.load()[1])
+        self.assertFalse(self.load()[1])
+
+        # a new mtime alone is caught by the content hash
+        path = asset_atlas.source_path(self.folder, "flag")
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        self.assertFalse(self.load()[1])
+        self.assertFalse(self.load()[1])
+
+        shutil.copy(asset_atlas.source_path(HERE, "mine"), path)
+        self.assertTrue(self.load()[1])
+
+        # another layout
+        with mock.patch.dict(SCALED, {24: ["flag"]}):
+            self.assertTrue(self.load()[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
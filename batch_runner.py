@@ -0,0 +1,140 @@
+"""Play many seeded headless games with a strategy and report the throughput.
+
+A strategy is a callable strategy(session, rng) returning the next Action for
+a GameSession; rng is a random.Random seeded per game, so a batch is fully
+reproducible from its first seed.
+
+    python batch_runner.py --games 10000
+    python batch_runner.py --games 1000000 --record games.msr
+"""
+import argparse
+import random
+import time
+from collections import namedtuple
+
+from bitboard_field import BitboardMineField
+from game_session import REVEAL, Action, GameSession, GameStatus
+from mine_field import MineField, MineStatus
+from probability import probability_strategy
+from replay import GameRecorder, ReplayWriter
+from solver import solver_strategy
+
+BatchResult = namedtuple("BatchResult", "games wins clicks guesses seconds")
+
+
+def random_strategy(session, rng):
+    """reveal a random untouched block"""
+    field = session.field
+    status = field.statuses
+    initial = MineStatus.INITIAL.value
+    size = field.width * field.height
+    while True:
+        index = rng.randrange(size)
+        if status[index] == initial:
+            return Action(REVEAL, index % field.width, index // field.width, True)
+
+
+def play_game(
+    strategy,
+    width,
+    height,
+    mine_count,
+    seed,
+    max_actions=None,
+    record=False,
+    field_class=MineField,
+):
+    """play one game to the end, return the finished GameSession
+
+    With record the session keeps a replay.GameRecorder in session.recorder.
+    """
+    session = GameSession(width, height, mine_count, seed, field_class)
+    if record:
+        session.recorder = GameRecorder(session.field)
+    # not the board seed itself, that would replay the mine positions
+    rng = random.Random(f"strategy:{seed}")
+    max_actions = max_actions or 4 * width * height
+    while not session.is_over() and session.clicks < max_actions:
+        session.apply(strategy(session, rng))
+    return session
+
+
+def run_batch(
+    games,
+    strategy=random_strategy,
+    width=30,
+    height=16,
+    mine_count=99,
+    seed=0,
+    writer=None,
+    field_class=MineField,
+):
+    """play games with seeds seed .. seed + games - 1, return a BatchResult
+
+    Every game is recorded to writer if a replay.ReplayWriter is given.
+    """
+    wins = clicks = guesses = 0
+    start = time.perf_counter()
+    for game_seed in range(seed, seed + games):
+        session = play_game(
+            strategy,
+            width,
+            height,
+            mine_count,
+            game_seed,
+            record=writer is not None,
+            field_class=field_class,
+        )
+        if writer is not None:
+            writer.write(session.recorder)
+        wins += session.status == GameStatus.WIN
+        clicks += session.clicks
+        guesses += session.guesses
+    return BatchResult(games, wins, clicks, guesses, time.perf_counter() - start)
+
+
+STRATEGIES = {
+    "random": random_strategy,
+    "solver": solver_strategy,
+    "probability": probability_strategy,
+}
+
+ENGINES = {"bytes": MineField, "bitboard": BitboardMineField}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--size", default="30x16", help="board size WIDTHxHEIGHT")
+    parser.add_argument("--mines", type=int, default=99)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--strategy", default="random", choices=sorted(STRATEGIES))
+    parser.add_argument("--record", metavar="PATH", help="write a replay file")
+    parser.add_argument("--engine", default="bytes", choices=sorted(ENGINES))
+    args = parser.parse_args()
+
+    width, height = (int(v) for v in args.size.lower().split("x"))
+    writer = ReplayWriter(args.record) if args.record else None
+    try:
+        result = run_batch(
+            args.games,
+            STRATEGIES[args.strategy],
+            width,
+            height,
+            args.mines,
+            args.seed,
+            writer,
+            ENGINES[args.engine],
+        )
+    finally:
+        if writer is not None:
+            writer.close()
+    print(
+        f"{result.games} games, {result.wins} won, "
+        f"{result.clicks / result.games:.1f} clicks/game, "
+        f"{result.games / result.seconds:.0f} games/s"
+    )
+
+
+if __name__ == "__main__":
+    main()
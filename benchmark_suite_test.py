@@ -0,0 +1,58 @@
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+from benchmarks import suite
+from benchmarks.__main__ import main
+
+
+class BenchmarkSuiteTest(unittest.TestCase):
+    def test_summarize(self):
+        summary = suite.summarize([i / 1000 for i in range(1, 101)])
+        self.assertEqual(summary["samples"], 100)
+        self.assertAlmostEqual(summary["p50"], 50.5)
+        self.assertAlmostEqual(summary["p99"], 99.01)
+        self.assertEqual((summary["min"], summary["max"]), (1, 100))
+        self.assertEqual(suite.summarize([0.002])["p90"], 2)
+
+    def test_compare(self):
+        baseline = {"results": {"a": {"p50": 1.0}, "b": {"p50": 1.0}}}
+        results = {"results": {"a": {"p50": 1.1}, "b": {"p50": 1.5}, "c": {"p50": 9}}}
+        self.assertEqual(suite.compare(results, baseline, 0.2), [("b", 1.0, 1.5, 1.5)])
+
+    def test_cli_fails_on_regression(self):
+        with tempfile.TemporaryDirectory() as folder:
+            output = os.path.join(folder, "new.json")
+            baseline = os.path.join(folder, "old.json")
+            args = ["--cases", "construct,flood_fill", "--sizes", "beginner,12x7"]
+            args += ["--densities", "0.1", "--repeat", "3", "--output", output]
+            with redirect_stdout(StringIO()):
+                self.assertEqual(main(args), 0)
+            with open(output) as file:
+                results = json.load(file)
+            self.assertEqual(
+                sorted(results["results"]),
+                [
+                    "construct[12x7@0.1]",
+                    "construct[beginner@0.1]",
+                    "flood_fill[12x7@0.1]",
+                    "flood_fill[beginner@0.1]",
+                ],
+            )
+            self.assertEqual(results["results"]["flood_fill[12x7@0.1]"]["samples"], 3)
+
+            # a baseline ten times as fast
+            for result in results["results"].values():
+                result["p50"] /= 10
+            with open(baseline, "w") as file:
+                json.dump(results, file)
+            with redirect_stdout(StringIO()) as out:
+                self.assertEqual(main(args + ["--baseline", baseline]), 1)
+            self.assertIn("REGRESSION", out.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+"""Run the benchmark suite, see benchmarks.suite.
+
+Run from the repository root:
+
+    python -m benchmarks
+    python -m benchmarks --sizes beginner,expert,5000x5000 --densities 0.01,0.2
+    python -m benchmarks --output new.json --baseline old.json --threshold 0.1
+
+Prints one line per case and writes all results as JSON to --output. With
+--baseline the run exits with status 1 if any case's median got slower than
+the baseline's by more than --threshold.
+"""
+import argparse
+import json
+import sys
+
+from benchmarks import suite
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks", description=__doc__.splitlines()[0]
+    )
+    parser.add_argument(
+        "--cases",
+        default=",".join(suite.CASES),
+        help="comma separated, from: " + ", ".join(suite.CASES),
+    )
+    parser.add_argument(
+        "--sizes",
+        default=",".join(suite.SIZES),
+        help=f"comma separated presets ({', '.join(suite.PRESETS)}) or WIDTHxHEIGHT",
+    )
+    parser.add_argument(
+        "--densities",
+        default=",".join(map(str, suite.DENSITIES)),
+        help="mine densities of the cases that depend on them",
+    )
+    parser.add_argument("--repeat", type=int, default=suite.REPEAT)
+    parser.add_argument(
+        "--budget", type=float, default=suite.BUDGET, help="seconds per case at most"
+    )
+    parser.add_argument("--output", metavar="PATH", help="write the results as JSON")
+    parser.add_argument("--baseline", metavar="PATH", help="results to compare with")
+    parser.add_argument("--threshold", type=float, default=suite.THRESHOLD)
+    args = parser.parse_args(argv)
+
+    cases = args.cases.split(",")
+    unknown = [name for name in cases if name not in suite.CASES]
+    if unknown:
+        parser.error(f"unknown cases: {', '.join(unknown)}")
+
+    print(f"{'case':<36} {'n':>4} {'p50 ms':>10} {'p90 ms':>10} {'p99 ms':>10}")
+
+    def log(key, result):
+        print(
+            f"{key:<36} {result['samples']:>4} {result['p50']:>10.3f} "
+            f"{result['p90']:>10.3f} {result['p99']:>10.3f}",
+            flush=True,
+        )
+
+    results = suite.run(
+        cases,
+        args.sizes.split(","),
+        [float(density) for density in args.densities.split(",")],
+        args.repeat,
+        args.budget,
+        log,
+    )
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        regressions = suite.compare(results, baseline, args.threshold)
+        for key, old, new, ratio in regressions:
+            print(f"REGRESSION {key}: {old:.3f} ms -> {new:.3f} ms ({ratio:.2f}x)")
+        if regressions:
+            return 1
+        print(f"no case slower than {args.threshold:.0%} over the baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,67 @@
+"""Reveal-heavy play on the byte buffer and the bitboard MineField engines.
+
+Every game opens its first block, which places the mines and counts them, and
+then reveals the remaining safe blocks in a random order until the board is
+cleared, so most of the time goes into placing mines, counting and flood
+filling. Boards are seeded, both engines play the same games.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_engines
+    python -m benchmarks.bench_engines 200x200:0.05:5
+"""
+import random
+import sys
+import time
+
+from benchmarks.bench_memory import parse_size
+from bitboard_field import BitboardMineField
+from mine_field import MineField
+
+# size:density:games
+BOARDS = ["9x9:0.12:2000", "30x16:0.2:500", "100x100:0.05:50", "500x500:0.02:3"]
+ENGINES = {"bytes": MineField, "bitboard": BitboardMineField}
+
+
+def clear_board(field_class, width, height, mine_count, seed):
+    """play one game to the end, return the number of reveals made"""
+    field = field_class(width, height, mine_count, seed=seed)
+    field.open_mine(width // 2, height // 2)
+    order = list(range(width * height))
+    random.Random(seed).shuffle(order)
+    reveals = 1
+    for index in order:
+        if not field._opened[index] and not field._mines[index]:
+            field.open_mine(index % width, index // width)
+            reveals += 1
+    assert field.is_win()
+    return reveals
+
+
+def main(argv=None):
+    boards = (argv if argv is not None else sys.argv[1:]) or BOARDS
+    print(f"{'board':>10} {'density':>8} {'games':>6} {'reveals':>8}", end="")
+    for name in ENGINES:
+        print(f" {name + ' ms':>12}", end="")
+    print()
+    for text in boards:
+        size, density, games = text.split(":")
+        width, height = parse_size(size)
+        density, games = float(density), int(games)
+        mine_count = int(width * height * density)
+        timings = []
+        for field_class in ENGINES.values():
+            start = time.perf_counter()
+            reveals = sum(
+                clear_board(field_class, width, height, mine_count, seed)
+                for seed in range(games)
+            )
+            timings.append((time.perf_counter() - start) / games * 1000)
+        print(f"{size:>10} {density:>8} {games:>6} {reveals / games:>8.0f}", end="")
+        for milliseconds in timings:
+            print(f" {milliseconds:>12.2f}", end="")
+        print()
+
+
+if __name__ == "__main__":
+    main()
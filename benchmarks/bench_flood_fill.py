@@ -0,0 +1,76 @@
+"""Zero-area reveal on a large sparse board, iterative vs the old recursion.
+
+The recursive variant is the open_mine algorithm MineField used before the
+queue based flood fill, replayed on the same board, and is kept here as a
+regression benchmark. It is expected to end with a RecursionError on big
+boards.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_flood_fill
+    python -m benchmarks.bench_flood_fill 5000x5000 0.01
+"""
+import random
+import sys
+import time
+
+from mine_field import MineField, MineStatus, _get_around
+
+SIZE = "5000x5000"
+DENSITY = 0.01
+
+
+def recursive_open_mine(field, x, y):
+    """the pre-flood-fill open_mine, working on the MineField buffers"""
+    index = y * field.width + x
+    if field._mines[index]:
+        field._status[index] = MineStatus.BOOMED.value
+        return False
+
+    field._status[index] = MineStatus.OPENED.value
+    field._opened[index] = 1
+    around = _get_around(x, y, field.width, field.height)
+    _sum = 0
+    for i, j in around:
+        _sum += field._mines[j * field.width + i]
+
+    if _sum == 0:
+        for i, j in around:
+            if not field._opened[j * field.width + i]:
+                recursive_open_mine(field, i, j)
+    return True
+
+
+def make_board(width, height, density, seed=0):
+    """a board with a mine free top-left corner to start the reveal from"""
+    random.seed(seed)
+    field = MineField(width, height, int(width * height * density))
+    for x, y in [(0, 0)] + _get_around(0, 0, width, height):
+        field.get_mine(x, y).value = 0
+    return field
+
+
+def run(name, open_func, field):
+    start = time.perf_counter()
+    try:
+        open_func(field, 0, 0)
+        outcome = "ok"
+    except RecursionError:
+        outcome = "RecursionError"
+    elapsed = time.perf_counter() - start
+    opened = field._status.count(MineStatus.OPENED.value)
+    print(f"{name:>10} {outcome:>15} {opened:>12} opened {elapsed:>9.2f} s")
+
+
+def main(argv=None):
+    argv = argv if argv is not None else sys.argv[1:]
+    width, height = (int(v) for v in (argv[0] if argv else SIZE).lower().split("x"))
+    density = float(argv[1]) if len(argv) > 1 else DENSITY
+
+    print(f"{width}x{height}, density {density}")
+    run("iterative", MineField.open_mine, make_board(width, height, density))
+    run("recursive", recursive_open_mine, make_board(width, height, density))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+"""Neighbour lookups per second, before and after the cached offset tables.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_get_around
+"""
+import timeit
+
+from mine_field import MineField, _get_around
+from benchmarks.legacy_field import _get_around as legacy_get_around
+
+WIDTH = 30
+HEIGHT = 16
+NUMBER = 20
+
+
+def main():
+    field = MineField(WIDTH, HEIGHT, 0)
+    cells = [(x, y) for y in range(HEIGHT) for x in range(WIDTH)]
+    indices = range(WIDTH * HEIGHT)
+
+    cases = [
+        ("legacy _get_around", lambda: [legacy_get_around(x, y, WIDTH, HEIGHT) for x, y in cells]),
+        ("_get_around", lambda: [_get_around(x, y, WIDTH, HEIGHT) for x, y in cells]),
+        ("MineField.around", lambda: [field.around(index) for index in indices]),
+    ]
+    for name, func in cases:
+        seconds = min(timeit.repeat(func, number=NUMBER, repeat=5))
+        calls = NUMBER * len(cells) / seconds
+        print(f"{name:>20} {calls / 1e6:8.2f} M calls/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Memory and construction time of MineField, array engine vs legacy objects.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_memory
+    python -m benchmarks.bench_memory 30x16 480x480 2000x2000
+"""
+import gc
+import sys
+import time
+import tracemalloc
+
+from mine_field import MineField
+from benchmarks.legacy_field import MineField as LegacyMineField
+
+SIZES = ["30x16", "480x480", "2000x2000"]
+DENSITY = 0.2
+
+
+def parse_size(text):
+    width, height = text.lower().split("x")
+    return int(width), int(height)
+
+
+def measure(field_class, width, height, mine_count, **kwargs):
+    """return (construction seconds, peak traced bytes) of one board"""
+    gc.collect()
+    start = time.perf_counter()
+    field = field_class(width, height, mine_count, **kwargs)
+    elapsed = time.perf_counter() - start
+    del field
+
+    gc.collect()
+    tracemalloc.start()
+    field = field_class(width, height, mine_count, **kwargs)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del field
+    return elapsed, peak
+
+
+def main(argv=None):
+    sizes = (argv if argv is not None else sys.argv[1:]) or SIZES
+    print(f"{'size':>10} {'engine':>7} {'build ms':>10} {'peak MB':>10}")
+    for text in sizes:
+        width, height = parse_size(text)
+        mine_count = int(width * height * DENSITY)
+        engines = (
+            ("legacy", LegacyMineField, {}),
+            # place the mines up front, like the legacy engine does
+            ("array", MineField, {"first_click_safe": False}),
+        )
+        for name, field_class, kwargs in engines:
+            elapsed, peak = measure(field_class, width, height, mine_count, **kwargs)
+            print(f"{text:>10} {name:>7} {elapsed * 1000:>10.1f} {peak / 2**20:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
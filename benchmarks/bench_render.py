@@ -0,0 +1,103 @@
+"""Time to draw a whole board: block by block, blitted tiles and composited.
+
+"blocks" is the Game.mine_image loop with one blit per block, "blits" looks
+the tiles up with numpy and blits them in one call, "composite" writes them
+into the surface's pixels with numpy fancy indexing over a tile atlas. The
+board is drawn to an off-screen surface of its full size. Run from the
+repository root:
+
+    python -m benchmarks.bench_render
+    python -m benchmarks.bench_render 100x100:20 2000x2000:4
+"""
+import os
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import numpy as np
+import pygame
+
+from main import Game
+from benchmarks.bench_memory import parse_size
+from game_session import GameStatus
+from mine_field import MineField
+from viewport import BACKGROUND, TILE_KEYS, Viewport, tile_indices
+
+SIZES = ["30x16:20", "500x500:8", "500x500:20"]  # blocks:pixels per block
+DENSITY = 0.2
+REPEAT = 3
+
+
+def main(argv=None):
+    sizes = (argv if argv is not None else sys.argv[1:]) or SIZES
+    game = Game()
+    game.game_status = GameStatus.STARTED
+    print(f"{'size':>12} {'tile':>5} {'blocks ms':>10} {'blits ms':>10} {'composite ms':>13}")
+    for text in sizes:
+        board, _, tile_size = text.partition(":")
+        width, height = parse_size(board)
+        tile_size = int(tile_size or 20)
+        field = MineField(width, height, int(width * height * DENSITY), seed=1)
+        field.open_mine(width // 2, height // 2)
+
+        surface = pygame.Surface((width * tile_size, height * tile_size)).convert()
+        view = Viewport(surface.get_rect(), (width, height), tile_size)
+        window = field.window(*view.visible())
+        game.field, game.viewport, game.screen = field, view, surface
+        tiles = game.tile_cache.tiles(tile_size)
+        atlas = game.tile_cache.atlas(tile_size)
+
+        def blocks():
+            for y in range(height):
+                for x in range(width):
+                    image = game.mine_image(field.get_mine(x, y))
+                    if image is not None:
+                        surface.blit(image, view.block_rect(x, y))
+
+        timings = [
+            best_of(blocks),
+            best_of(lambda: draw_tiles(view, surface, window, tiles)),
+            best_of(lambda: view.draw_composite(surface, window, atlas, False)),
+        ]
+        print(
+            f"{board:>12} {tile_size:>5} "
+            f"{timings[0]:>10.1f} {timings[1]:>10.1f} {timings[2]:>13.1f}"
+        )
+    pygame.quit()
+
+
+def draw_tiles(view, surface, window, tiles):
+    """the blits baseline: tiles looked up with numpy, blitted in one call"""
+    x0, y0, x1, y1 = view.visible()
+    status, counts, mines = (
+        np.frombuffer(buffer, dtype=np.uint8).reshape(y1 - y0, x1 - x0)
+        for buffer in window
+    )
+    indices = tile_indices(status, counts, mines, False)
+    images = [tiles[key] for key in TILE_KEYS] + [None]
+    size = view.tile_size
+    left = view.rect.x + x0 * size - view.left
+    top = view.rect.y + y0 * size - view.top
+    surface.blits(
+        [
+            (images[tile], (left + i * size, top + j * size))
+            for j, row in enumerate(indices.tolist())
+            for i, tile in enumerate(row)
+            if tile != BACKGROUND
+        ],
+        False,
+    )
+
+
+def best_of(draw):
+    best = float("inf")
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        draw()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+if __name__ == "__main__":
+    main()
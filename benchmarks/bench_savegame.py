@@ -0,0 +1,50 @@
+"""Save and load times of savegame, with and without numpy.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_savegame
+    python -m benchmarks.bench_savegame 1000x1000 10000x10000
+"""
+import os
+import sys
+import tempfile
+import time
+from unittest import mock
+
+import bitpack
+import savegame
+from mine_field import MineField
+from benchmarks.bench_memory import parse_size
+
+SIZES = ["30x16", "1000x1000", "4000x4000"]
+DENSITY = 0.15
+
+
+def main(argv=None):
+    sizes = (argv if argv is not None else sys.argv[1:]) or SIZES
+    handle, path = tempfile.mkstemp(suffix=".sav")
+    os.close(handle)
+    print(f"{'size':>12} {'numpy':>6} {'save ms':>10} {'load ms':>10} {'MB':>8}")
+    try:
+        for text in sizes:
+            width, height = parse_size(text)
+            field = MineField(width, height, int(width * height * DENSITY))
+            field.open_mine(width // 2, height // 2)
+            for numpy in {bitpack.np, None}:
+                with mock.patch.object(bitpack, "np", numpy):
+                    start = time.perf_counter()
+                    savegame.save_game(path, field)
+                    saved = time.perf_counter()
+                    savegame.load_game(path)
+                    loaded = time.perf_counter()
+                print(
+                    f"{text:>12} {str(numpy is not None):>6} "
+                    f"{(saved - start) * 1000:>10.1f} {(loaded - saved) * 1000:>10.1f} "
+                    f"{os.path.getsize(path) / 1e6:>8.2f}"
+                )
+    finally:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
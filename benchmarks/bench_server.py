@@ -0,0 +1,99 @@
+"""Memory per session and request throughput of game_server.
+
+Starts sessions expert games, opens each one, and reports the memory they
+hold (tracemalloc) and the average diff size. Then clients concurrent
+asyncio clients play random reveals over a Unix socket, or TCP where Unix
+sockets are missing, and the requests per second are reported.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_server
+    python -m benchmarks.bench_server 10000 100
+"""
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from game_server import (
+    FRAME,
+    NEW,
+    REVEAL_COMMAND,
+    GameServer,
+    decode_response,
+    encode_request,
+)
+
+SESSIONS = 10000
+CLIENTS = 50
+REQUESTS = 200  # per client
+
+
+def memory(sessions):
+    server = GameServer()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    diff_bytes = 0
+    for _ in range(sessions):
+        data = encode_request(NEW, 30, 16, 99)
+        session_id, _, _ = decode_response(server.handle_request(data[0], data[1:]))
+        data = encode_request(REVEAL_COMMAND, session_id, 15, 8)
+        diff_bytes += len(server.handle_request(data[0], data[1:]))
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    print(
+        f"{sessions} expert sessions: {used / 1e6:.1f} MB, "
+        f"{used / sessions / 1000:.1f} kB each, first diff {diff_bytes / sessions:.0f} bytes"
+    )
+
+
+async def client(address, requests, rng):
+    if isinstance(address, str):
+        reader, writer = await asyncio.open_unix_connection(address)
+    else:
+        reader, writer = await asyncio.open_connection(*address)
+
+    async def call(data):
+        writer.write(data)
+        (size,) = FRAME.unpack(await reader.readexactly(FRAME.size))
+        return decode_response(await reader.readexactly(size))
+
+    session_id, _, _ = await call(encode_request(NEW, 30, 16, 99))
+    for _ in range(requests):
+        x, y = rng.randrange(30), rng.randrange(16)
+        await call(encode_request(REVEAL_COMMAND, session_id, x, y))
+    writer.close()
+
+
+async def throughput(clients, requests):
+    server = GameServer()
+    with tempfile.TemporaryDirectory() as folder:
+        if hasattr(asyncio, "start_unix_server"):
+            address = os.path.join(folder, "bench.sock")
+            await server.start(path=address)
+        else:
+            listener = await server.start(port=0)
+            address = listener.sockets[0].getsockname()[:2]
+        start = time.perf_counter()
+        await asyncio.gather(
+            *(client(address, requests, random.Random(i)) for i in range(clients))
+        )
+        elapsed = time.perf_counter() - start
+        await server.close()
+    total = clients * (requests + 1)
+    print(f"{clients} clients: {total / elapsed:.0f} requests/s")
+
+
+def main(argv=None):
+    argv = argv if argv is not None else sys.argv[1:]
+    sessions = int(argv[0]) if argv else SESSIONS
+    clients = int(argv[1]) if len(argv) > 1 else CLIENTS
+    memory(sessions)
+    asyncio.run(throughput(clients, REQUESTS))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Time per move of the solver strategy on expert games, against its 1 ms target.
+
+A move is one solver_strategy call, which solves, plus applying the action,
+during which the Solver catches up with the opened area through the field's
+open_listeners. Moves are timed over seeded games played to the end, and the
+percentiles are compared with TARGET_MS: the run fails, exit status 1, if
+the p99 is above it.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_solver
+    python -m benchmarks.bench_solver 500
+"""
+import random
+import statistics
+import sys
+import time
+
+from game_session import GameSession
+from solver import solver_strategy
+
+GAMES = 200
+TARGET_MS = 1.0
+WIDTH, HEIGHT, MINES = 30, 16, 99
+
+
+def move_times(games):
+    """seconds of every move of games seeded expert games"""
+    times = []
+    for seed in range(games):
+        session = GameSession(WIDTH, HEIGHT, MINES, seed)
+        rng = random.Random(f"strategy:{seed}")
+        while not session.is_over():
+            start = time.perf_counter()
+            session.apply(solver_strategy(session, rng))
+            times.append(time.perf_counter() - start)
+    return times
+
+
+def main(argv=None):
+    argv = argv if argv is not None else sys.argv[1:]
+    games = int(argv[0]) if argv else GAMES
+    ms = [t * 1000 for t in move_times(games)]
+    cuts = statistics.quantiles(ms, n=100, method="inclusive")
+    p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+    print(
+        f"{games} games, {len(ms)} moves: mean {statistics.fmean(ms):.3f} ms, "
+        f"p50 {p50:.3f}, p95 {p95:.3f}, p99 {p99:.3f}, max {max(ms):.2f}"
+    )
+    ok = p99 <= TARGET_MS
+    print(f"p99 {'within' if ok else 'above'} the {TARGET_MS} ms target")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
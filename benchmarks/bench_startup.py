@@ -0,0 +1,79 @@
+"""Startup time to the first frame, with a cold and a warm asset atlas cache.
+
+Every run is a new interpreter: the time covers importing the game, opening
+the window, loading the assets and drawing the first frame. Cold runs start
+without a cached atlas (asset_atlas.load_atlas builds and saves it), warm runs
+load the one saved by the run before. Both the median time to the first frame
+and the median time spent loading the assets are shown. Run from the repository root:
+
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup 20  # runs of each
+"""
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+RUNS = 10
+
+# run in a new interpreter, prints the milliseconds to the first frame and
+# the milliseconds spent in Game.load_resource
+SCRIPT = """
+import time
+start = time.perf_counter()
+import os, sys
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+import asset_atlas
+asset_atlas.CACHE_FOLDER = sys.argv[1]
+import pygame
+from main import Game
+load_resource = Game.load_resource
+def timed(self, *args):
+    global assets
+    begin = time.perf_counter()
+    load_resource(self, *args)
+    assets = time.perf_counter() - begin
+Game.load_resource = timed
+game = Game()
+game.render_full()
+pygame.display.update()
+print((time.perf_counter() - start) * 1000, assets * 1000)
+"""
+
+
+def first_frame(cache_folder):
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    output = subprocess.run(
+        [sys.executable, "-c", SCRIPT, cache_folder],
+        cwd=root,
+        env=dict(os.environ, PYGAME_HIDE_SUPPORT_PROMPT="1"),
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    frame, assets = output.split()[-2:]
+    return float(frame), float(assets)
+
+
+def main(argv=None):
+    argv = argv if argv is not None else sys.argv[1:]
+    runs = int(argv[0]) if argv else RUNS
+    cache_folder = tempfile.mkdtemp()
+    try:
+        cold, warm = [], []
+        for _ in range(runs):
+            shutil.rmtree(cache_folder)
+            cold.append(first_frame(cache_folder))
+            warm.append(first_frame(cache_folder))
+    finally:
+        shutil.rmtree(cache_folder, ignore_errors=True)
+    print(f"{'cache':>6} {'first frame ms':>15} {'assets ms':>10}")
+    for name, times in (("cold", cold), ("warm", warm)):
+        frame, assets = (statistics.median(column) for column in zip(*times))
+        print(f"{name:>6} {frame:>15.1f} {assets:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+"""The benchmark suite behind python -m benchmarks.
+
+A case is a setup and a timed run: setup(width, height, density) builds what
+one sample needs outside the clock, run(state) is the timed part. Every case
+is sampled repeat times, or as often as fits in budget seconds but at least
+MIN_SAMPLES times, and reported as percentiles in milliseconds. Cases with
+a board run once per size, and cases whose cost depends on the mine density
+once per density as well.
+
+Results are plain JSON, so two runs can be compared: compare reports every
+case whose median got slower than the baseline's by more than threshold.
+"""
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from collections import namedtuple
+from datetime import datetime, timezone
+
+from mine_field import MineField, MineStatus, _get_around
+
+# name -> (width, height, mine density)
+PRESETS = {
+    "beginner": (9, 9, 10 / 81),
+    "intermediate": (16, 16, 40 / 256),
+    "expert": (30, 16, 99 / 480),
+}
+SIZES = ["beginner", "intermediate", "expert", "1000x1000"]
+DENSITIES = [0.05, 0.2]
+REPEAT = 30
+BUDGET = 2.0  # seconds per case and parameters
+MIN_SAMPLES = 3
+THRESHOLD = 0.2  # a median 20% slower than the baseline is a regression
+PERCENTILES = (50, 90, 99)
+GET_AROUND_CELLS = 10000  # blocks looked up per _get_around sample
+SEED = 1
+
+# sized: runs per board size, dense: and per density
+Case = namedtuple("Case", "setup run sized dense")
+
+
+def parse_size(text):
+    """(width, height, density) of a preset name or WIDTHxHEIGHT"""
+    if text in PRESETS:
+        return PRESETS[text]
+    width, height = text.lower().split("x")
+    return int(width), int(height), PRESETS["expert"][2]
+
+
+def _mine_count(width, height, density):
+    return min(int(width * height * density), width * height - 9)
+
+
+def _construct_setup(width, height, density):
+    return width, height, _mine_count(width, height, density)
+
+
+def _construct(state):
+    width, height, mine_count = state
+    MineField(width, height, mine_count, seed=SEED, first_click_safe=False)
+
+
+def _get_around_setup(width, height, density):
+    rng = random.Random(SEED)
+    cells = min(GET_AROUND_CELLS, width * height)
+    return (
+        width,
+        height,
+        [(rng.randrange(width), rng.randrange(height)) for _ in range(cells)],
+    )
+
+
+def _get_around_run(state):
+    width, height, cells = state
+    for x, y in cells:
+        _get_around(x, y, width, height)
+
+
+def _flood_setup(width, height, density):
+    """a placed board, opened from its middle by the run"""
+    mine_count = _mine_count(width, height, density)
+    field = MineField(width, height, mine_count, seed=SEED, first_click_safe=False)
+    start = width // 2, height // 2
+    for x, y in [start, *_get_around(*start, width, height)]:
+        field.set_mine(x, y, 0)
+    return field, start
+
+
+def _flood_run(state):
+    field, (x, y) = state
+    field.open_mine(x, y)
+
+
+def _chord_setup(width, height, density):
+    """an opened board with every mine flagged and the numbers to chord"""
+    field, start = _flood_setup(width, height, density)
+    field.open_mine(*start)
+    for index in field.mine_indices:
+        field.toggle_status(index % width, index // width)
+    initial = MineStatus.INITIAL.value
+    counts, statuses = field.counts, field.statuses
+    numbers = [
+        (index % width, index // width)
+        for index, opened in enumerate(field.opened)
+        if opened
+        and counts[index]
+        and any(statuses[i] == initial for i in field.around(index))
+    ]
+    return field, numbers
+
+
+def _chord_run(state):
+    field, numbers = state
+    for x, y in numbers:
+        field.double_mouse_button_down(x, y)
+        field.double_mouse_button_up(x, y)
+
+
+_game = None
+
+
+def _pygame_game():
+    """one Game for every render sample, drawing to a dummy video driver"""
+    global _game
+    if _game is None:
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        from main import Game
+
+        _game = Game()
+    return _game
+
+
+def _render_setup(width, height, density):
+    from main import MINE_SIZE
+    from viewport import Viewport
+
+    game = _pygame_game()
+    field, start = _flood_setup(width, height, density)
+    field.open_mine(*start)
+    game.field = field
+    game.viewport = Viewport(game.viewport.rect, (width, height), MINE_SIZE)
+    game.viewport.center_on(*start)
+    return game
+
+
+def _render_run(game):
+    game.render_minesweeper()
+
+
+def _load_resource_setup(width, height, density):
+    from main import RESOURCE_FOLDER
+
+    return _pygame_game(), RESOURCE_FOLDER
+
+
+def _load_resource_run(state):
+    game, folder = state
+    game.load_resource(folder)
+
+
+CASES = {
+    "construct": Case(_construct_setup, _construct, True, True),
+    "get_around": Case(_get_around_setup, _get_around_run, True, False),
+    "flood_fill": Case(_flood_setup, _flood_run, True, True),
+    "chord": Case(_chord_setup, _chord_run, True, True),
+    "render": Case(_render_setup, _render_run, True, False),
+    "load_resource": Case(_load_resource_setup, _load_resource_run, False, False),
+}
+
+
+def sample(case, width, height, density, repeat=REPEAT, budget=BUDGET):
+    """return the run times of a case in seconds"""
+    times = []
+    deadline = time.perf_counter() + budget
+    while len(times) < repeat:
+        state = case.setup(width, height, density)
+        start = time.perf_counter()
+        case.run(state)
+        times.append(time.perf_counter() - start)
+        if len(times) >= MIN_SAMPLES and time.perf_counter() > deadline:
+            break
+    return times
+
+
+def summarize(times):
+    """milliseconds: min, mean, max and the PERCENTILES of a list of seconds"""
+    ms = sorted(t * 1000 for t in times)
+    summary = {
+        "samples": len(ms),
+        "min": ms[0],
+        "mean": statistics.fmean(ms),
+        "max": ms[-1],
+    }
+    if len(ms) > 1:
+        cuts = statistics.quantiles(ms, n=100, method="inclusive")
+    else:
+        cuts = ms * 99
+    for percentile in PERCENTILES:
+        summary[f"p{percentile}"] = cuts[percentile - 1]
+    return summary
+
+
+def run(
+    cases=None, sizes=SIZES, densities=DENSITIES, repeat=REPEAT, budget=BUDGET, log=None
+):
+    """run the suite, return the results as a JSON-ready dict
+
+    log(key, result) is called after every case, e.g. to print progress.
+    """
+    results = {}
+    for name in cases or CASES:
+        case = CASES[name]
+        for size in sizes if case.sized else [None]:
+            width, height, board_density = parse_size(size or "expert")
+            for density in densities if case.dense else [board_density]:
+                key = name
+                if case.sized:
+                    key += f"[{size}" + (f"@{density}]" if case.dense else "]")
+                times = sample(case, width, height, density, repeat, budget)
+                results[key] = dict(
+                    summarize(times),
+                    case=name,
+                    width=width if case.sized else None,
+                    height=height if case.sized else None,
+                    density=density if case.sized else None,
+                )
+                if log:
+                    log(key, results[key])
+    return {"meta": _meta(), "results": results}
+
+
+def _meta():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except OSError:
+        commit = ""
+    try:
+        import numpy
+    except ImportError:
+        numpy = None
+    return {
+        "commit": commit or None,
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "numpy": numpy.__version__ if numpy else None,
+    }
+
+
+def compare(results, baseline, threshold=THRESHOLD, statistic="p50"):
+    """return [(key, baseline ms, ms, ratio)] of the cases slower than threshold
+
+    Only cases found in both runs are compared.
+    """
+    regressions = []
+    old_results = baseline["results"]
+    for key, result in results["results"].items():
+        if key not in old_results:
+            continue
+        old, new = old_results[key][statistic], result[statistic]
+        ratio = new / old if old else float("inf")
+        if ratio > 1 + threshold:
+            regressions.append((key, old, new, ratio))
+    return regressions
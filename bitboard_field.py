@@ -0,0 +1,205 @@
+"""A MineField that reveals and counts with whole-board bit operations.
+
+BitboardMineField keeps the mines, the opened blocks, the flagged blocks and
+the blocks without mines around as Python integers with one bit per block.
+Rows are padded with one always clear bit, so block (x, y) is bit
+y * (width + 1) + x and shifting a board by one column never carries a block
+into the next row. The eight neighbours of every block are then eight shifts
+of the whole board:
+
+- around counts are a bit-sliced adder over the eight shifted mine boards,
+  giving four bit planes of the counts at once;
+- a zero area reveal is a masked dilation: the frontier of blocks without
+  mines around is grown by one block in every direction and masked with the
+  unopened blocks, until it stops growing;
+- a chord reveals all its untouched neighbours as one multi-source dilation.
+
+The flat buffers of MineField are kept up to date as well, everything reading
+them (rendering, the solver, savegame) works on either engine. Revealing a
+number touches no bitboard but the opened mask. Big integer operations cost
+the size of the whole board per dilation step, so the engine pays off on
+sparse boards whose reveals open large areas and is on par with MineField on
+expert boards, see benchmarks/bench_engines.
+"""
+from bitpack import join_planes, set_indices
+from mine_field import MineField, MineStatus
+
+_OPENED = MineStatus.OPENED.value
+_FLAGGED = MineStatus.FLAGGED.value
+_INITIAL = MineStatus.INITIAL.value
+_HINTING = MineStatus.HINTING.value
+_CLICKING = MineStatus.BOTH_BUTTON_CLICKING.value
+
+COUNT_PLANES = 4  # bits of an around count, at most 8
+_DIGITS = bytes.maketrans(b"\x00\x01", b"01")
+_BYTES = bytes.maketrans(b"01", b"\x00\x01")
+
+
+class BitboardMineField(MineField):
+    """MineField storing its masks as padded big integer bitboards"""
+
+    def __init__(
+        self, width=30, height=16, mine_count=99, seed=None, first_click_safe=True
+    ):
+        stride = width + 1
+        self._stride = stride
+        self._valid = int(("0" + "1" * width) * height, 2)  # every block, no padding
+        self._mine_bits = 0
+        self._zero_bits = self._valid  # no mines yet, every block is a zero
+        self._open_bits = 0
+        self._flag_bits = 0
+        super().__init__(width, height, mine_count, seed, first_click_safe)
+
+    def _bit(self, index):
+        return 1 << (index + index // self.width)
+
+    def _to_bits(self, buffer):
+        """bitboard of a buffer holding 0 or 1 per block"""
+        width = self.width
+        padded = b"".join(
+            bytes(buffer[start : start + width]) + b"\x00"
+            for start in range(0, width * self.height, width)
+        )
+        return int(padded[::-1].translate(_DIGITS), 2)
+
+    def _from_bits(self, bits):
+        """bytes of 0 or 1 per block, the inverse of _to_bits"""
+        width, stride = self.width, self._stride
+        digits = f"{bits:0{stride * self.height}b}".encode()[::-1].translate(_BYTES)
+        return b"".join(
+            digits[start : start + width]
+            for start in range(0, stride * self.height, stride)
+        )
+
+    def _dilate(self, bits):
+        """bits grown by one block in every direction, clipped to the board"""
+        stride = self._stride
+        row = bits | bits << 1 | bits >> 1
+        return (row | row << stride | row >> stride) & self._valid
+
+    def _set_layout(self, mine_indices):
+        self._mine_indices = list(mine_indices)
+        self.mine_count = len(self._mine_indices)
+        for i in self._mine_indices:
+            self._mines[i] = 1
+        self._mine_bits = self._to_bits(self._mines)
+        self._count_bits()
+        self._placed = True
+
+    def _count_bits(self):
+        """around counts from eight shifted mine boards added bit plane by plane"""
+        mines, stride, valid = self._mine_bits, self._stride, self._valid
+        planes = [0] * COUNT_PLANES
+        for shift in (1, stride - 1, stride, stride + 1):
+            # shifting right only drops bits or moves them into the padding,
+            # whose counts are never read
+            for neighbours in (mines << shift & valid, mines >> shift):
+                carry = neighbours
+                for bit in range(COUNT_PLANES):
+                    planes[bit], carry = planes[bit] ^ carry, planes[bit] & carry
+                    if not carry:
+                        break
+        any_count = planes[0] | planes[1] | planes[2] | planes[3]
+        self._zero_bits = valid & ~any_count & ~mines
+
+        unpacked = (self._from_bits(plane) for plane in planes)
+        self._counts = join_planes(unpacked, self.width * self.height)
+
+    def set_mine(self, x, y, value):
+        super().set_mine(x, y, value)
+        index = y * self.width + x
+        for i in (index, *self.around(index)):
+            bit = self._bit(i)
+            if not self._counts[i] and not self._mines[i]:
+                self._zero_bits |= bit
+            else:
+                self._zero_bits &= ~bit
+        bit = self._bit(index)
+        if self._mines[index]:
+            self._mine_bits |= bit
+        else:
+            self._mine_bits &= ~bit
+
+    def _write_status(self, index, value):
+        flagged = self._status[index] == _FLAGGED
+        super()._write_status(index, value)
+        if value == _FLAGGED:
+            self._flag_bits |= self._bit(index)
+        elif flagged:
+            self._flag_bits &= ~self._bit(index)
+
+    def _flood_fill(self, start):
+        return self._reveal([start])
+
+    def _reveal(self, sources):
+        """open the source blocks and the zero areas connected to them
+
+        sources must not be mines. Return the flat indices of the newly
+        opened blocks, in index order.
+        """
+        opened_flags, status = self._opened, self._status
+        unopened = self._valid & ~self._open_bits
+        newly_opened = [index for index in sources if not opened_flags[index]]
+        reached = 0
+        for index in sources:
+            self._write_status(index, _OPENED)
+            opened_flags[index] = 1
+            reached |= self._bit(index)
+        self._open_bits |= reached
+
+        # masked dilation from the zeros of the frontier, one layer per step;
+        # numbers open nothing else and need no board wide conversion
+        zero, frontier = self._zero_bits, reached
+        depth = 1
+        if reached & zero:
+            while True:
+                frontier = self._dilate(frontier & zero) & unopened & ~reached
+                if not frontier:
+                    break
+                depth += 1
+                reached |= frontier
+            area = reached & ~self._open_bits
+            self._open_bits |= area
+            flags_opened = (area & self._flag_bits).bit_count()
+            self._flag_bits &= ~area
+            self.flag_count -= flags_opened
+            area_opened = set_indices(self._from_bits(area))
+            for index in area_opened:
+                opened_flags[index] = 1
+                status[index] = _OPENED
+            newly_opened = sorted(newly_opened + area_opened)
+
+        self._dirty.update(newly_opened)
+        self.opened_count += len(newly_opened)
+        # dilations read no neighbours block by block
+        self.hooks.flood(newly_opened, depth, 0)
+        for listener in self.open_listeners:
+            listener(newly_opened)
+        return newly_opened
+
+    def double_mouse_button_down(self, x, y):
+        index = y * self.width + x
+        count = self._counts[index]
+        if count == 0:
+            return True
+
+        self._write_status(index, _CLICKING)
+        around = self._dilate(self._bit(index))
+        neighbours = self.around(index)
+        self.hooks.count("neighbour_lookups", len(neighbours))
+        untouched = [i for i in neighbours if self._status[i] == _INITIAL]
+
+        # all mines around are marked
+        if (around & self._flag_bits).bit_count() != count:
+            for around_index in untouched:
+                self._write_status(around_index, _HINTING)
+            return True
+
+        mines = [i for i in untouched if self._mines[i]]
+        for around_index in mines:
+            self._write_status(around_index, MineStatus.BOOMED.value)
+            self.boomed = True
+        safe = [i for i in untouched if not self._mines[i]]
+        if safe:
+            self._reveal(safe)
+        return not mines
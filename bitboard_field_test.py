@@ -0,0 +1,65 @@
+import random
+import unittest
+
+import mine_field_test
+from bitboard_field import BitboardMineField
+from mine_field import MineField, MineStatus
+
+
+class BitboardMineFieldTest(mine_field_test.MineFieldTest):
+    field_class = BitboardMineField
+
+
+class SameAsMineFieldTest(unittest.TestCase):
+    def play(self, field, moves):
+        """apply moves to field, return what every call returned"""
+        results = []
+        for kind, x, y in moves:
+            if kind == "reveal":
+                results.append(sorted(field.flood_fill(x, y)))
+            elif kind == "open":
+                results.append(field.open_mine(x, y))
+            elif kind == "flag":
+                field.toggle_status(x, y)
+            elif kind == "chord":
+                results.append(field.double_mouse_button_down(x, y))
+                field.double_mouse_button_up(x, y)
+        return results
+
+    def test_random_games(self):
+        """Both engines end every random game in the same state"""
+        rng = random.Random(5)
+        for width, height, mine_count in ((1, 1, 0), (1, 7, 1), (9, 9, 10), (30, 16, 99)):
+            for seed in range(10):
+                fields = [
+                    cls(width, height, mine_count, seed=seed)
+                    for cls in (MineField, BitboardMineField)
+                ]
+                moves = []
+                for _ in range(60):
+                    kind = rng.choice(["open", "open", "flag", "chord"])
+                    moves.append((kind, rng.randrange(width), rng.randrange(height)))
+                self.assertEqual(*(self.play(field, moves) for field in fields))
+                expected, field = fields
+                self.assertEqual(field._status, expected._status)
+                self.assertEqual(field._opened, expected._opened)
+                self.assertEqual(field._counts, expected._counts)
+                self.assertEqual(
+                    (field.opened_count, field.flag_count, field.boomed),
+                    (expected.opened_count, expected.flag_count, expected.boomed),
+                )
+
+    def test_set_mine_keeps_bitboards(self):
+        """Moved mines change what a reveal opens, like on MineField"""
+        fields = [cls.from_mines(8, 8, [9, 54]) for cls in (MineField, BitboardMineField)]
+        for field in fields:
+            field.set_mine(1, 1, 0)
+            field.set_mine(7, 0, 1)
+            field.toggle_status(7, 0)
+        self.assertEqual(*(sorted(field.flood_fill(0, 0)) for field in fields))
+        self.assertEqual(*(field._counts for field in fields))
+        self.assertEqual(fields[1].get_mine(7, 0).status, MineStatus.FLAGGED)
+
+
+if __name__ == "__main__":
+    unittest.main()
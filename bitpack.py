@@ -0,0 +1,82 @@
+"""Bit packing and varints shared by the replay and save formats.
+
+Bits are packed most significant first: block 0 of a board is the top bit of
+the first byte, the last byte is padded with zero bits. Packing goes through
+numpy when it is installed and through Python's big integers otherwise, both
+run at C speed; the integer route reads a flag buffer as the digits of a
+base 2 number. join_planes puts bit planes back together into one byte per
+block the same way.
+"""
+from itertools import compress
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional, see pack_bits
+    np = None
+
+_TO_DIGITS = bytes.maketrans(b"\x00\x01", b"01")
+_FROM_DIGITS = bytes.maketrans(b"01", b"\x00\x01")
+
+
+def pack_bits(flags):
+    """pack a buffer of 0/1 bytes into (len(flags) + 7) // 8 bytes"""
+    if np is not None:
+        return np.packbits(np.frombuffer(flags, dtype=np.uint8)).tobytes()
+    count = len(flags)
+    if not count:
+        return b""
+    padding = -count % 8
+    digits = bytes(flags).translate(_TO_DIGITS) + b"0" * padding
+    return int(digits, 2).to_bytes((count + padding) // 8, "big")
+
+
+def unpack_bits(data, count):
+    """return a bytearray of count 0/1 bytes from packed data"""
+    if np is not None:
+        bits = np.unpackbits(np.frombuffer(data, dtype=np.uint8), count=count)
+        return bytearray(bits.tobytes())
+    if not count:
+        return bytearray()
+    size = (count + 7) // 8
+    digits = format(int.from_bytes(data[:size], "big"), f"0{size * 8}b")
+    return bytearray(digits.encode("ascii", "strict")[:count].translate(_FROM_DIGITS))
+
+
+def set_indices(flags):
+    """flat indices of the non-zero bytes of a 0/1 buffer"""
+    if np is not None:
+        return np.flatnonzero(np.frombuffer(flags, dtype=np.uint8)).tolist()
+    return list(compress(range(len(flags)), flags))
+
+
+def join_planes(planes, size, offset=0):
+    """bytearray of size bytes, offset + sum(plane[i] << bit) at every byte i
+
+    planes are buffers of size 0/1 bytes, bit 0 first. Read as big integers
+    and shifted, their sum has no carries between bytes as long as every
+    byte stays below 256.
+    """
+    value = int.from_bytes(bytes([offset]) * size, "big") if offset else 0
+    for bit, plane in enumerate(planes):
+        value += int.from_bytes(plane, "big") << bit
+    return bytearray(value.to_bytes(size, "big"))
+
+
+def write_varint(out, value):
+    """append an unsigned LEB128 varint to a bytearray"""
+    while value > 0x7F:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def read_varint(data, pos):
+    """return (value, position after it) of the varint at data[pos]"""
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
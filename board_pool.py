@@ -0,0 +1,114 @@
+"""Boards built ahead of time so that a new game starts without a stall.
+
+A BoardPool keeps up to size boards from a factory, built on a background
+executor: one thread by default, or a process pool for generators that are
+expensive in pure Python, such as no_guess.generate_no_guess. Finished
+boards are moved to a ready queue by the futures' callbacks, so get pops a
+board in O(1) and never waits for the generator; on a miss it returns the
+fallback board instead. wait blocks until a board is ready, e.g. before the
+first game. Refilling starts when fewer than low_water boards
+are ready or building, and tops the pool up to size again.
+
+    pool = BoardPool(partial(MineField, 30, 16, 99), size=4)
+    field = pool.get()
+"""
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+POOL_SIZE = 4
+
+
+class BoardPool:
+    def __init__(
+        self, factory, size=POOL_SIZE, low_water=None, fallback=None, executor=None
+    ):
+        """factory builds a board on the executor, fallback is used on a miss
+
+        With a process pool executor the factory must be picklable, i.e. a
+        module level function or a functools.partial of one. fallback
+        defaults to calling the factory in the caller's thread.
+        """
+        self.factory = factory
+        self.size = size
+        self.low_water = size if low_water is None else low_water
+        self.fallback = fallback or factory
+        self._owns_executor = executor is None
+        self._executor = executor or ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="BoardPool"
+        )
+        self._ready = deque()
+        self._building = 0
+        self._lock = threading.Lock()
+        self._finished = threading.Condition(self._lock)  # a build is done
+        self._closed = False
+
+        self.hits = 0
+        self.misses = 0
+        self.failures = 0
+        self._refill()
+
+    def _refill(self):
+        with self._lock:
+            if self._closed or len(self._ready) + self._building >= self.low_water:
+                return
+            count = self.size - len(self._ready) - self._building
+            self._building += count
+        for _ in range(count):
+            self._executor.submit(self.factory).add_done_callback(self._done)
+
+    def _done(self, future):
+        with self._lock:
+            self._building -= 1
+            if future.cancelled() or future.exception() is not None:
+                self.failures += 1
+            elif not self._closed:
+                self._ready.append(future.result())
+            self._finished.notify_all()
+
+    def ready(self):
+        """number of boards that get can return right away"""
+        return len(self._ready)
+
+    def wait(self, timeout=None):
+        """block until a board is ready or none is building, True if one is ready"""
+        with self._lock:
+            self._finished.wait_for(
+                lambda: self._ready or not self._building or self._closed, timeout
+            )
+            return bool(self._ready)
+
+    def get(self):
+        """return a ready board, or the fallback board if none is ready"""
+        with self._lock:
+            board = self._ready.popleft() if self._ready else None
+            if board is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        self._refill()
+        return self.fallback() if board is None else board
+
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self):
+        return {
+            "size": self.size,
+            "ready": len(self._ready),
+            "building": self._building,
+            "hits": self.hits,
+            "misses": self.misses,
+            "failures": self.failures,
+            "hit_rate": self.hit_rate(),
+        }
+
+    def close(self):
+        """drop the ready boards and cancel the ones not started yet"""
+        with self._lock:
+            self._closed = True
+            self._ready.clear()
+            self._finished.notify_all()
+        if self._owns_executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
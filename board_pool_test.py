@@ -0,0 +1,102 @@
+import pickle
+import threading
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from board_pool import BoardPool
+from mine_field import MineField
+
+
+class BoardPoolTest(unittest.TestCase):
+    def test_hits_and_misses(self):
+        """Ready boards are hits, an empty pool falls back and counts a miss"""
+        release = threading.Event()
+
+        def factory():
+            release.wait()
+            return MineField(9, 9, 10)
+
+        pool = BoardPool(factory, size=2, fallback=lambda: "fallback")
+        self.assertEqual(pool.get(), "fallback")
+        self.assertEqual((pool.hits, pool.misses), (0, 1))
+
+        release.set()
+        self._wait_ready(pool, 2)
+        self.assertIsInstance(pool.get(), MineField)
+        self.assertEqual((pool.hits, pool.misses), (1, 1))
+        self.assertEqual(pool.hit_rate(), 0.5)
+        pool.close()
+
+    def test_wait(self):
+        """wait returns once a board is ready, and without one if all failed"""
+        release = threading.Event()
+
+        def factory():
+            release.wait()
+            return MineField(9, 9, 10)
+
+        pool = BoardPool(factory, size=1)
+        self.assertFalse(pool.wait(timeout=0.01))
+        release.set()
+        self.assertTrue(pool.wait())
+        self.assertIsInstance(pool.get(), MineField)
+        self.assertEqual(pool.misses, 0)
+        pool.close()
+
+        def failing():
+            raise ValueError
+
+        pool = BoardPool(failing, size=1)
+        self.assertFalse(pool.wait())
+        self.assertEqual(pool.failures, 1)
+        pool.close()
+
+    def test_low_water(self):
+        """Refilling only starts once the pool runs low"""
+        built = []
+
+        def factory():
+            built.append(1)
+            return MineField(9, 9, 10)
+
+        pool = BoardPool(factory, size=4, low_water=2)
+        self._wait_ready(pool, 4)
+        pool.get()
+        self._wait_ready(pool, 3)
+        self.assertEqual(len(built), 4)
+        pool.get()
+        pool.get()
+        self._wait_ready(pool, 4)
+        self.assertEqual(len(built), 7)
+        pool.close()
+
+    def test_process_pool(self):
+        """Boards built in other processes arrive playable"""
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            pool = BoardPool(partial(MineField, 9, 9, 10), size=2, executor=executor)
+            self._wait_ready(pool, 2)
+            field = pool.get()
+        self.assertTrue(field.open_mine(4, 4))
+        self.assertEqual(len(field.mine_indices), 10)
+
+    def test_pickle_field(self):
+        """A field round trips through pickle without its listeners"""
+        field = MineField(9, 9, 10)
+        field.open_listeners.append(print)
+        field.open_mine(0, 0)
+        copy = pickle.loads(pickle.dumps(field))
+        self.assertEqual(copy.open_listeners, [])
+        self.assertEqual(copy.mine_indices, field.mine_indices)
+        self.assertEqual(bytes(copy._opened), bytes(field._opened))
+
+    def _wait_ready(self, pool, count):
+        for _ in range(500):
+            if pool.ready() >= count and not pool._building:
+                return
+            threading.Event().wait(0.01)
+        self.fail(f"pool never had {count} boards ready")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+"""A thin client of game_server: the server plays, the client mirrors.
+
+RemoteField is a MineField that is never played locally. It only holds what
+the player has been shown, filled in from the server's diffs, so everything
+that draws a MineField (Game, the viewport, the tile lookups) draws it as is.
+GameClient talks to the server over a blocking socket, one request and one
+response at a time, which is all a player clicking on a board needs.
+
+    client = GameClient(("127.0.0.1", 8765))
+    field = client.new_game(30, 16, 99)
+    status = client.play(game_server.REVEAL_COMMAND, 15, 8)
+"""
+import socket
+
+import game_server
+from game_session import GameStatus
+from mine_field import MineField, MineStatus
+
+_OPENED = (MineStatus.OPENED.value, MineStatus.BOTH_BUTTON_CLICKING.value)
+
+
+def parse_address(text):
+    """(host, port) for "host:port" or ":port", a Unix socket path otherwise"""
+    host, separator, port = text.rpartition(":")
+    if separator and port.isdigit():
+        return host or "127.0.0.1", int(port)
+    return text
+
+
+class RemoteField(MineField):
+    """The part of a server side MineField a player can see"""
+
+    def __init__(self, width, height, mine_count):
+        super().__init__(width, height, mine_count)
+        self._placed = True  # the layout is on the server, never place it here
+
+    def apply(self, cells):
+        """apply the (index, state) pairs of a diff"""
+        for index, state in cells:
+            status, value = state >> 4, state & 0xF
+            self._write_status(index, status)
+            if status in _OPENED:
+                self._counts[index] = value
+                if not self._opened[index]:
+                    self._opened[index] = 1
+                    self.opened_count += 1
+            else:
+                self._mines[index] = value
+
+    def is_win(self):
+        return False  # the server decides, see GameClient.status
+
+
+class GameClient:
+    def __init__(self, address, timeout=10.0):
+        """address is (host, port) or a Unix socket path"""
+        if isinstance(address, str):
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._socket.settimeout(timeout)
+            self._socket.connect(address)
+        else:
+            self._socket = socket.create_connection(address, timeout)
+        self.session = None
+        self.field = None
+        self.status = GameStatus.READY
+
+    def request(self, command, *fields):
+        """send one request, return (session id, GameStatus, cells)"""
+        self._socket.sendall(game_server.encode_request(command, *fields))
+        (size,) = game_server.FRAME.unpack(self._receive(game_server.FRAME.size))
+        return game_server.decode_response(self._receive(size))
+
+    def _receive(self, size):
+        data = bytearray()
+        while len(data) < size:
+            chunk = self._socket.recv(size - len(data))
+            if not chunk:
+                raise ConnectionError("server closed the connection")
+            data += chunk
+        return data
+
+    def new_game(self, width, height, mine_count):
+        """start a game on the server, closing the previous one; return its field"""
+        if self.session is not None:
+            try:
+                self.request(game_server.CLOSE, self.session)
+            except ValueError:
+                pass  # already evicted
+        self.session, self.status, _ = self.request(
+            game_server.NEW, width, height, mine_count
+        )
+        self.field = RemoteField(width, height, mine_count)
+        return self.field
+
+    def play(self, command, x, y):
+        """play REVEAL_COMMAND, FLAG_COMMAND or CHORD_COMMAND, return the GameStatus"""
+        _, self.status, cells = self.request(command, self.session, x, y)
+        self.field.apply(cells)
+        return self.status
+
+    def close(self):
+        self._socket.close()
@@ -0,0 +1,279 @@
+"""Many headless games hosted by one asyncio process, for thin clients.
+
+Every session holds one game_session.GameSession, i.e. one MineField of flat
+buffers, so an expert game costs a few kilobytes and 10000 of them fit in well
+under 100 MB. Sessions are not tied to a connection: a client creates one and
+plays it by id, over any connection, until it is closed or has been idle for
+idle_timeout seconds, after which it is evicted. A server holds at most
+max_sessions sessions of max_cells blocks in total, a NEW request beyond
+either is answered with an error.
+
+Requests are a command byte followed by fixed size little-endian fields:
+
+    NEW    width u16, height u16, mine count u32
+    REVEAL, FLAG, CHORD    session u32, x u16, y u16
+    CLOSE  session u32
+
+Every request is answered with one frame, a u32 length and the body:
+
+    DIFF   session u32, GameStatus value u8, varint cell count, then per
+           changed cell varint (index - previous index), state u8
+    ERROR  utf-8 message
+
+A diff only holds the cells changed by the request. The state of a cell is
+its MineStatus value << 4 | its value, the around count of an opened cell,
+1 for a mine once the game is lost and 0 otherwise, so a client never learns
+more than a player would see. game_client.RemoteField applies the diffs.
+
+    python game_server.py --port 8765
+    python game_server.py --unix /tmp/minesweeper.sock
+"""
+import argparse
+import asyncio
+import itertools
+import struct
+import time
+
+from bitpack import read_varint, write_varint
+from game_session import CHORD, FLAG, REVEAL, Action, GameSession, GameStatus
+from mine_field import MineField, MineStatus
+
+IDLE_TIMEOUT = 300.0  # seconds
+MAX_SIZE = 1000  # largest board width or height a client may ask for
+MAX_SESSIONS = 50000
+MAX_CELLS = 20_000_000  # blocks of all sessions together, a few hundred MB
+
+# request commands
+NEW = 0
+REVEAL_COMMAND = 1
+FLAG_COMMAND = 2
+CHORD_COMMAND = 3
+CLOSE = 4
+
+NEW_REQUEST = struct.Struct("<HHI")
+PLAY_REQUEST = struct.Struct("<IHH")
+CLOSE_REQUEST = struct.Struct("<I")
+REQUESTS = {
+    NEW: NEW_REQUEST,
+    REVEAL_COMMAND: PLAY_REQUEST,
+    FLAG_COMMAND: PLAY_REQUEST,
+    CHORD_COMMAND: PLAY_REQUEST,
+    CLOSE: CLOSE_REQUEST,
+}
+ACTIONS = {REVEAL_COMMAND: REVEAL, FLAG_COMMAND: FLAG, CHORD_COMMAND: CHORD}
+
+# response kinds
+DIFF = 0
+ERROR = 1
+
+FRAME = struct.Struct("<I")
+DIFF_HEADER = struct.Struct("<BIB")
+
+_OPENED = (MineStatus.OPENED.value, MineStatus.BOTH_BUTTON_CLICKING.value)
+
+
+def encode_request(command, *fields):
+    return bytes([command]) + REQUESTS[command].pack(*fields)
+
+
+def encode_diff(session_id, status, cells):
+    """a DIFF body from (index, state) pairs in index order"""
+    out = bytearray(DIFF_HEADER.pack(DIFF, session_id, status.value))
+    write_varint(out, len(cells))
+    previous = 0
+    for index, state in cells:
+        write_varint(out, index - previous)
+        out.append(state)
+        previous = index
+    return bytes(out)
+
+
+def decode_response(body):
+    """return (session id, GameStatus, [(index, state)]) of a DIFF body
+
+    Raises ValueError with the server's message for an ERROR body.
+    """
+    if body[0] == ERROR:
+        raise ValueError(bytes(body[1:]).decode())
+    _, session_id, status = DIFF_HEADER.unpack_from(body)
+    count, pos = read_varint(body, DIFF_HEADER.size)
+    cells = []
+    index = 0
+    for _ in range(count):
+        delta, pos = read_varint(body, pos)
+        index += delta
+        cells.append((index, body[pos]))
+        pos += 1
+    return session_id, GameStatus(status), cells
+
+
+class _Session:
+    __slots__ = ("game", "last_seen", "mines_shown", "cells")
+
+    def __init__(self, game, now):
+        self.game = game
+        self.last_seen = now
+        self.mines_shown = False
+        self.cells = game.field.width * game.field.height
+
+
+class GameServer:
+    def __init__(
+        self,
+        idle_timeout=IDLE_TIMEOUT,
+        field_class=MineField,
+        max_sessions=MAX_SESSIONS,
+        max_cells=MAX_CELLS,
+    ):
+        self.idle_timeout = idle_timeout
+        self.field_class = field_class
+        self.max_sessions = max_sessions
+        self.max_cells = max_cells
+        self.sessions = {}  # session id -> _Session
+        self.cells = 0  # blocks of all sessions
+        self.evicted = 0
+        self._ids = itertools.count(1)
+        self._server = None
+        self._evictor = None
+
+    def handle_request(self, command, payload, now=None):
+        """answer one request, return the response body"""
+        now = time.monotonic() if now is None else now
+        if command not in REQUESTS or len(payload) != REQUESTS[command].size:
+            return _error("malformed request")
+        fields = REQUESTS[command].unpack(payload)
+        if command == NEW:
+            width, height, mine_count = fields
+            if not (0 < width <= MAX_SIZE and 0 < height <= MAX_SIZE):
+                return _error("unsupported board size")
+            if mine_count >= width * height:
+                return _error("too many mines")
+            if (
+                len(self.sessions) >= self.max_sessions
+                or self.cells + width * height > self.max_cells
+            ):
+                return _error("server full")
+            session_id = next(self._ids)
+            game = GameSession(width, height, mine_count, field_class=self.field_class)
+            self.sessions[session_id] = _Session(game, now)
+            self.cells += width * height
+            return encode_diff(session_id, game.status, [])
+
+        session_id = fields[0]
+        session = self.sessions.get(session_id)
+        if session is None:
+            return _error(f"no session {session_id}")
+        if command == CLOSE:
+            self._drop(session_id)
+            return encode_diff(session_id, session.game.status, [])
+
+        _, x, y = fields
+        field = session.game.field
+        if not (x < field.width and y < field.height):
+            return _error("block outside the board")
+        session.last_seen = now
+        session.game.apply(Action(ACTIONS[command], x, y))
+        return encode_diff(session_id, session.game.status, self._changes(session))
+
+    def _changes(self, session):
+        """(index, state) of the cells changed since the last request"""
+        field = session.game.field
+        changed = field.pop_dirty()
+        if session.game.status == GameStatus.OVER and not session.mines_shown:
+            session.mines_shown = True
+            changed.update(field.mine_indices)
+        lost = session.mines_shown
+        status, counts, mines = field.statuses, field.counts, field.mines
+        cells = []
+        for index in sorted(changed):
+            value = status[index]
+            if value in _OPENED:
+                cells.append((index, value << 4 | counts[index]))
+            else:
+                cells.append((index, value << 4 | (lost and mines[index])))
+        return cells
+
+    def evict_idle(self, now=None):
+        """drop the sessions idle for longer than idle_timeout, return how many"""
+        now = time.monotonic() if now is None else now
+        idle = [
+            session_id
+            for session_id, session in self.sessions.items()
+            if now - session.last_seen > self.idle_timeout
+        ]
+        for session_id in idle:
+            self._drop(session_id)
+        self.evicted += len(idle)
+        return len(idle)
+
+    def _drop(self, session_id):
+        self.cells -= self.sessions.pop(session_id).cells
+
+    async def handle_connection(self, reader, writer):
+        """serve requests from one client until it disconnects"""
+        try:
+            while True:
+                try:
+                    command = (await reader.readexactly(1))[0]
+                    size = REQUESTS[command].size if command in REQUESTS else 0
+                    payload = await reader.readexactly(size)
+                except asyncio.IncompleteReadError:
+                    break
+                body = self.handle_request(command, payload)
+                writer.write(FRAME.pack(len(body)) + body)
+                if command not in REQUESTS:
+                    break  # out of step with the client, nothing to resync on
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def evict_forever(self):
+        """evict idle sessions every half idle_timeout"""
+        while True:
+            await asyncio.sleep(self.idle_timeout / 2)
+            self.evict_idle()
+
+    async def start(self, host="127.0.0.1", port=0, path=None):
+        """listen on a TCP port, or on a Unix socket if path is given
+
+        Return the asyncio.Server. Idle sessions are evicted until close.
+        """
+        if path is None:
+            self._server = await asyncio.start_server(
+                self.handle_connection, host, port
+            )
+        else:
+            self._server = await asyncio.start_unix_server(self.handle_connection, path)
+        self._evictor = asyncio.ensure_future(self.evict_forever())
+        return self._server
+
+    async def close(self):
+        self._evictor.cancel()
+        self._server.close()
+        await self._server.wait_closed()
+
+
+def _error(message):
+    return bytes([ERROR]) + message.encode()
+
+
+async def _main(args):
+    server = await GameServer(args.idle_timeout).start(args.host, args.port, args.unix)
+    for sock in server.sockets:
+        print("serving on", sock.getsockname())
+    await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", metavar="PATH", help="listen on a Unix socket")
+    parser.add_argument("--idle-timeout", type=float, default=IDLE_TIMEOUT)
+    asyncio.run(_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
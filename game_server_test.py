@@ -0,0 +1,215 @@
+import asyncio
+import os
+import tempfile
+import threading
+import unittest
+
+import game_server
+from game_client import GameClient, RemoteField, parse_address
+from game_server import (
+    CHORD_COMMAND,
+    CLOSE,
+    FLAG_COMMAND,
+    NEW,
+    REVEAL_COMMAND,
+    GameServer,
+    decode_response,
+    encode_request,
+)
+from game_session import GameStatus
+from mine_field import MineStatus
+
+try:
+    import pygame
+except ImportError:  # only the network mode of the pygame client needs it
+    pygame = None
+
+
+def request(server, command, *fields, now=None):
+    """answer a request on server, as the bytes a client would send"""
+    data = encode_request(command, *fields)
+    return decode_response(server.handle_request(data[0], data[1:], now))
+
+
+class GameServerTest(unittest.TestCase):
+    def test_diffs_mirror_the_field(self):
+        """A RemoteField fed the diffs shows what the server's field shows"""
+        server = GameServer()
+        session_id, status, cells = request(server, NEW, 30, 16, 99)
+        self.assertEqual((status, cells), (GameStatus.READY, []))
+        field = server.sessions[session_id].game.field
+        remote = RemoteField(30, 16, 99)
+        for command, x, y in [
+            (REVEAL_COMMAND, 15, 8),
+            (FLAG_COMMAND, 0, 0),
+            (FLAG_COMMAND, 1, 0),
+            (FLAG_COMMAND, 1, 0),
+        ]:
+            _, status, cells = request(server, command, session_id, x, y)
+            remote.apply(cells)
+        self.assertEqual(status, GameStatus.STARTED)
+        self.assertEqual(remote._status, field._status)
+        self.assertEqual(remote.flag_count, field.flag_count)
+        self.assertEqual(remote.opened_count, field.opened_count)
+        for index, opened in enumerate(field._opened):
+            if opened:
+                self.assertEqual(remote._counts[index], field._counts[index])
+        # nothing about the hidden blocks leaks
+        self.assertFalse(any(remote._mines))
+
+    def test_lost_game_shows_mines(self):
+        server = GameServer()
+        session_id, _, _ = request(server, NEW, 9, 9, 10)
+        request(server, REVEAL_COMMAND, session_id, 4, 4)
+        field = server.sessions[session_id].game.field
+        mine = field.mine_indices[0]
+        x, y = mine % 9, mine // 9
+        remote = RemoteField(9, 9, 10)
+        _, status, cells = request(server, REVEAL_COMMAND, session_id, x, y)
+        remote.apply(cells)
+        self.assertEqual(status, GameStatus.OVER)
+        self.assertEqual(
+            [i for i, mine in enumerate(remote._mines) if mine],
+            sorted(field.mine_indices),
+        )
+        self.assertEqual(remote.get_mine(x, y).status, MineStatus.BOOMED)
+
+    def test_chord(self):
+        server = GameServer()
+        session_id, _, _ = request(server, NEW, 3, 3, 1)
+        game = server.sessions[session_id].game
+        game.field._set_layout([0])  # one mine in the corner
+        request(server, REVEAL_COMMAND, session_id, 1, 1)
+        request(server, FLAG_COMMAND, session_id, 0, 0)
+        _, status, cells = request(server, CHORD_COMMAND, session_id, 1, 1)
+        self.assertEqual(status, GameStatus.WIN)
+        # the centre, the 7 safe blocks and the flag set again by the win
+        self.assertEqual(len(cells), 9)
+
+    def test_errors(self):
+        server = GameServer()
+        with self.assertRaisesRegex(ValueError, "no session"):
+            request(server, REVEAL_COMMAND, 7, 0, 0)
+        with self.assertRaisesRegex(ValueError, "too many mines"):
+            request(server, NEW, 3, 3, 9)
+        session_id, _, _ = request(server, NEW, 3, 3, 1)
+        with self.assertRaisesRegex(ValueError, "outside"):
+            request(server, REVEAL_COMMAND, session_id, 3, 0)
+        self.assertEqual(server.handle_request(42, b"")[0], game_server.ERROR)
+        request(server, CLOSE, session_id)
+        self.assertEqual(server.sessions, {})
+
+    def test_server_full(self):
+        server = GameServer(max_sessions=2, max_cells=200)
+        first, _, _ = request(server, NEW, 10, 10, 10)
+        with self.assertRaisesRegex(ValueError, "server full"):
+            request(server, NEW, 11, 10, 10)  # too many blocks
+        second, _, _ = request(server, NEW, 5, 5, 5)
+        with self.assertRaisesRegex(ValueError, "server full"):
+            request(server, NEW, 2, 2, 1)  # too many sessions
+        self.assertEqual(server.cells, 125)
+        request(server, CLOSE, first)
+        request(server, NEW, 10, 10, 10)
+        self.assertEqual(server.evict_idle(now=float("inf")), 2)
+        self.assertEqual(server.cells, 0)
+
+    def test_idle_sessions_evicted(self):
+        server = GameServer(idle_timeout=10)
+        idle, _, _ = request(server, NEW, 9, 9, 10, now=0)
+        active, _, _ = request(server, NEW, 9, 9, 10, now=0)
+        request(server, FLAG_COMMAND, active, 0, 0, now=8)
+        self.assertEqual(server.evict_idle(now=15), 1)
+        self.assertEqual(list(server.sessions), [active])
+        with self.assertRaisesRegex(ValueError, "no session"):
+            request(server, FLAG_COMMAND, idle, 0, 0, now=15)
+
+    def test_parse_address(self):
+        self.assertEqual(parse_address("example.org:8765"), ("example.org", 8765))
+        self.assertEqual(parse_address(":80"), ("127.0.0.1", 80))
+        self.assertEqual(parse_address("/tmp/game.sock"), "/tmp/game.sock")
+
+
+class ServerThread:
+    """a GameServer listening on a background event loop"""
+
+    def __init__(self, path=None):
+        self.server = GameServer()
+        self.loop = asyncio.new_event_loop()
+        started = threading.Event()
+
+        async def start():
+            listener = await self.server.start(port=0, path=path)
+            self.address = path or listener.sockets[0].getsockname()[:2]
+            started.set()
+
+        self.thread = threading.Thread(
+            target=self.loop.run_until_complete, args=(self._run(start),)
+        )
+        self.thread.start()
+        started.wait(5)
+
+    async def _run(self, start):
+        self.stopped = asyncio.Event()
+        await start()
+        await self.stopped.wait()
+        await self.server.close()
+
+    def stop(self):
+        self.loop.call_soon_threadsafe(self.stopped.set)
+        self.thread.join(5)
+        self.loop.close()
+
+
+class SocketTest(unittest.TestCase):
+    def play(self, address):
+        client = GameClient(address)
+        try:
+            field = client.new_game(30, 16, 99)
+            self.assertEqual(client.play(REVEAL_COMMAND, 15, 8), GameStatus.STARTED)
+            self.assertGreater(field.opened_count, 0)
+            self.assertEqual(field.get_mine(15, 8).status, MineStatus.OPENED)
+            client.play(FLAG_COMMAND, 0, 0)
+            self.assertEqual(field.flag_count, 1)
+            previous = client.session
+            client.new_game(9, 9, 10)
+            self.assertNotEqual(client.session, previous)
+        finally:
+            client.close()
+
+    def test_tcp(self):
+        server = ServerThread()
+        try:
+            self.play(server.address)
+            self.assertEqual(len(server.server.sessions), 1)
+        finally:
+            server.stop()
+
+    @unittest.skipUnless(hasattr(os, "fork"), "Unix sockets only")
+    def test_unix_socket(self):
+        with tempfile.TemporaryDirectory() as folder:
+            server = ServerThread(os.path.join(folder, "game.sock"))
+            try:
+                self.play(server.address)
+            finally:
+                server.stop()
+
+    @unittest.skipIf(pygame is None, "pygame is not installed")
+    def test_pygame_client(self):
+        """The game's network mode renders the server's board"""
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        import main
+
+        server = ServerThread()
+        try:
+            game = main.Game(server=server.address)
+            game.start_game()
+            game.handle_gameplay_actions(15, 8, True, False)
+            self.assertEqual(game.field.get_mine(15, 8).status, MineStatus.OPENED)
+            game.render_full()
+            game.client.close()
+        finally:
+            server.stop()
+
+
+if __name__ == "__main__":
+    unittest.main()
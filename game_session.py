@@ -0,0 +1,106 @@
+from collections import namedtuple
+from enum import Enum
+
+import replay
+from mine_field import MineField, MineStatus
+
+
+class GameStatus(Enum):
+    READY = 1
+    STARTED = 2
+    OVER = 3
+    WIN = 4
+
+
+REVEAL = "reveal"
+FLAG = "flag"
+CHORD = "chord"
+
+# guess: the strategy could not prove the block safe, only used for statistics
+Action = namedtuple("Action", "kind x y guess", defaults=(False,))
+
+
+class GameSession:
+    """A game of minesweeper driven by actions instead of mouse events.
+
+    Only depends on MineField, so games can be played without pygame, e.g. by
+    bots or in bulk. The rules follow Game.handle_gameplay_actions: reveal
+    opens an untouched block, flag cycles the mark of a block and chord opens
+    around a number whose mines are all flagged.
+    """
+
+    def __init__(
+        self, width=30, height=16, mine_count=99, seed=None, field_class=MineField
+    ):
+        # field_class picks the engine, e.g. bitboard_field.BitboardMineField
+        self.field = field_class(width, height, mine_count, seed)
+        self.status = GameStatus.READY
+        self.clicks = 0
+        self.guesses = 0
+        # a replay.GameRecorder to record the field calls into, if any
+        self.recorder = None
+
+    def _record(self, kind, x, y):
+        if self.recorder is not None:
+            self.recorder.record(kind, x, y)
+
+    def is_over(self):
+        return self.status in (GameStatus.OVER, GameStatus.WIN)
+
+    def reveal(self, x, y):
+        """open (x, y), return the flat indices of the newly opened blocks"""
+        if not self._start():
+            return []
+        if self.field.get_mine(x, y).status != MineStatus.INITIAL:
+            return []
+        self._record(replay.REVEAL, x, y)
+        if self.field.get_mine(x, y).value:
+            self.field.open_mine(x, y)
+            self.status = GameStatus.OVER
+            return []
+        opened = self.field.flood_fill(x, y)
+        self._check_win()
+        return opened
+
+    def flag(self, x, y):
+        if self._start():
+            self._record(replay.FLAG, x, y)
+            self.field.toggle_status(x, y)
+
+    def chord(self, x, y):
+        """open around (x, y) if all its mines are flagged"""
+        if not self._start():
+            return
+        if self.field.get_mine(x, y).status != MineStatus.OPENED:
+            return
+        self._record(replay.CHORD_DOWN, x, y)
+        if not self.field.double_mouse_button_down(x, y):
+            self.status = GameStatus.OVER
+        self._record(replay.CHORD_UP, x, y)
+        self.field.double_mouse_button_up(x, y)
+        self._check_win()
+
+    def apply(self, action):
+        """play an Action, counting clicks and guesses"""
+        self.clicks += 1
+        if action.guess:
+            self.guesses += 1
+        if action.kind == REVEAL:
+            self.reveal(action.x, action.y)
+        elif action.kind == FLAG:
+            self.flag(action.x, action.y)
+        elif action.kind == CHORD:
+            self.chord(action.x, action.y)
+        else:
+            raise ValueError(f"Unknown action: {action.kind}")
+
+    def _start(self):
+        """start a ready game, return False if the game is already finished"""
+        if self.status == GameStatus.READY:
+            self.status = GameStatus.STARTED
+        return self.status == GameStatus.STARTED
+
+    def _check_win(self):
+        if self.status == GameStatus.STARTED and self.field.is_win():
+            self.status = GameStatus.WIN
+            self.field.flag_all_mines()
@@ -0,0 +1,70 @@
+import subprocess
+import sys
+import unittest
+
+from batch_runner import run_batch
+from game_session import CHORD, FLAG, REVEAL, Action, GameSession, GameStatus
+from mine_field import MineField, MineStatus
+
+
+def make_session(width, height, mines):
+    """Build a session whose field has mines exactly at the given (x, y)"""
+    session = GameSession(width, height, 0)
+    for x, y in mines:
+        session.field.set_mine(x, y, 1)
+    return session
+
+
+class GameSessionTest(unittest.TestCase):
+    def test_no_pygame(self):
+        """Headless games never import pygame"""
+        code = (
+            "import sys, batch_runner; batch_runner.run_batch(5); "
+            "print('pygame' in sys.modules)"
+        )
+        output = subprocess.check_output([sys.executable, "-c", code], text=True)
+        self.assertEqual(output.strip(), "False")
+
+    def test_seeded_field(self):
+        """The same seed places the same mines"""
+        self.assertEqual(
+            MineField(30, 16, 99, seed=5).mine_indices,
+            MineField(30, 16, 99, seed=5).mine_indices,
+        )
+
+    def test_reveal_and_win(self):
+        """Revealing every safe block wins and flags the mines"""
+        session = make_session(5, 1, [(2, 0)])
+        self.assertEqual(sorted(session.reveal(0, 0)), [0, 1])
+        self.assertEqual(session.status, GameStatus.STARTED)
+        session.apply(Action(REVEAL, 1, 0))
+        self.assertEqual(session.status, GameStatus.STARTED)
+        session.apply(Action(REVEAL, 4, 0))
+        self.assertEqual(session.status, GameStatus.WIN)
+        self.assertEqual(session.field.get_mine(2, 0).status, MineStatus.FLAGGED)
+        self.assertEqual(session.clicks, 2)
+
+    def test_reveal_mine(self):
+        """Revealing a mine ends the game, later actions are ignored"""
+        session = make_session(3, 3, [(0, 0)])
+        session.apply(Action(REVEAL, 0, 0, guess=True))
+        self.assertEqual(session.status, GameStatus.OVER)
+        self.assertEqual(session.guesses, 1)
+        self.assertEqual(session.reveal(2, 2), [])
+
+    def test_flag_and_chord(self):
+        """A chord around a satisfied number opens the remaining blocks"""
+        session = make_session(3, 3, [(0, 0)])
+        session.apply(Action(REVEAL, 1, 1))
+        session.apply(Action(FLAG, 0, 0))
+        session.apply(Action(CHORD, 1, 1))
+        self.assertEqual(session.status, GameStatus.WIN)
+
+    def test_batch_reproducible(self):
+        """A batch with the same seed plays the same games"""
+        first, second = run_batch(50, seed=3), run_batch(50, seed=3)
+        self.assertEqual(first[:4], second[:4])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,331 @@
+"""An unbounded minesweeper board, generated chunk by chunk.
+
+The plane is split into chunks of chunk_size x chunk_size blocks. The mines of
+a chunk follow from the world seed and the chunk coordinate alone, so a chunk
+is only generated when a reveal, a flood fill or the renderer reaches it, and
+can be dropped and generated again at any time. Generated chunks are kept in
+an LRU cache of cache_size chunks. Statuses are the only state a player
+changes; they live in a sparse store holding one buffer per chunk that was
+ever changed, so memory follows the explored area and not the world size.
+
+The blocks around the origin never hold a mine, a game starts by opening it.
+Blocks are addressed by (x, y), negative coordinates included.
+
+At low densities the blocks without mines around percolate and an area may
+never end, so one flood fill opens at most fill_limit blocks. The opened
+blocks it had no budget left to spread from are kept as a frontier, and
+reveal_frontier carries on from the ones inside a window, e.g. the view.
+"""
+import random
+from collections import OrderedDict
+
+from mine_field import MineStatus, _count_around, _STATUS
+
+CHUNK_SIZE = 32
+DENSITY = 0.16
+CACHE_SIZE = 1024
+FILL_LIMIT = 10000  # blocks opened by one flood fill at most
+
+_INITIAL = MineStatus.INITIAL.value
+_OPENED = MineStatus.OPENED.value
+_FLAGGED = MineStatus.FLAGGED.value
+_HINTING = MineStatus.HINTING.value
+_CLICKING = MineStatus.BOTH_BUTTON_CLICKING.value
+_AROUND = [(dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1) if dx or dy]
+
+
+class InfiniteMine:
+    """A view of one block of an InfiniteMineField, like mine_field.Mine"""
+
+    __slots__ = ("_field", "x", "y")
+
+    def __init__(self, field, x, y):
+        self._field = field
+        self.x = x
+        self.y = y
+
+    def get_value(self):
+        return self._field.get_value(self.x, self.y)
+
+    value = property(fget=get_value, doc="0:NO MINE 1:MINE")
+
+    def get_around_mine_count(self):
+        return self._field.around_count(self.x, self.y)
+
+    around_mine_count = property(fget=get_around_mine_count, doc="mine count around")
+
+    def get_status(self):
+        return _STATUS[self._field.get_status(self.x, self.y)]
+
+    def set_status(self, value):
+        self._field.set_status(self.x, self.y, value)
+
+    status = property(fget=get_status, fset=set_status, doc="BlockStatus")
+
+    def toggle_status(self):
+        self._field.toggle_status(self.x, self.y)
+
+
+class _Chunk:
+    __slots__ = ("mines", "counts")
+
+    def __init__(self, mines):
+        self.mines = mines
+        self.counts = None  # needs the neighbouring chunks, computed on demand
+
+
+class InfiniteMineField:
+    def __init__(
+        self,
+        seed=0,
+        density=DENSITY,
+        chunk_size=CHUNK_SIZE,
+        cache_size=CACHE_SIZE,
+        fill_limit=FILL_LIMIT,
+    ):
+        self.seed = seed
+        self.density = density
+        self.chunk_size = chunk_size
+        self.cache_size = cache_size
+        self.fill_limit = fill_limit
+
+        self._chunks = OrderedDict()  # chunk coordinate -> _Chunk, least recent first
+        self._status = {}  # chunk coordinate -> bytearray of MineStatus values
+        self._dirty = set()  # (x, y) of blocks whose status changed
+        # opened blocks without mines around whose neighbours are not opened yet
+        self._frontier = set()
+        self.open_listeners = []
+
+        self.opened_count = 0
+        self.flag_count = 0
+        self.boomed = False
+        self.generated_chunks = 0  # including chunks generated again after eviction
+
+    def _locate(self, x, y):
+        """return (chunk coordinate, index inside the chunk) of a block"""
+        size = self.chunk_size
+        return (x // size, y // size), (y % size) * size + x % size
+
+    def _chunk(self, key):
+        chunk = self._chunks.get(key)
+        if chunk is None:
+            chunk = self._chunks[key] = _Chunk(self._generate(key))
+            self.generated_chunks += 1
+            if len(self._chunks) > self.cache_size:
+                self._chunks.popitem(last=False)
+        else:
+            self._chunks.move_to_end(key)
+        return chunk
+
+    def _generate(self, key):
+        """the mines of a chunk, from the world seed and the chunk coordinate"""
+        size = self.chunk_size
+        cx, cy = key
+        rng = random.Random(f"{self.seed}:{cx}:{cy}")
+        mines = bytearray(size * size)
+        for index in rng.sample(range(size * size), round(size * size * self.density)):
+            mines[index] = 1
+        # keep the opening around the origin free
+        for y in (-1, 0, 1):
+            for x in (-1, 0, 1):
+                origin_key, index = self._locate(x, y)
+                if origin_key == key:
+                    mines[index] = 0
+        return mines
+
+    def _chunk_counts(self, key):
+        """around counts of a chunk, padded with the edges of its neighbours"""
+        chunk = self._chunk(key)
+        if chunk.counts is not None:
+            return chunk.counts
+        size = self.chunk_size
+        cx, cy = key
+        mines = {
+            (dx, dy): self._chunk((cx + dx, cy + dy)).mines
+            for dx in (-1, 0, 1)
+            for dy in (-1, 0, 1)
+        }
+        grid = bytearray()
+        for y in range(-1, size + 1):
+            dy = (y >= size) - (y < 0)
+            start = y % size * size
+            grid.append(mines[-1, dy][start + size - 1])
+            grid += mines[0, dy][start : start + size]
+            grid.append(mines[1, dy][start])
+        padded = size + 2
+        counts = _count_around(grid, padded, padded)
+        chunk.counts = b"".join(
+            counts[y * padded + 1 : (y + 1) * padded - 1] for y in range(1, size + 1)
+        )
+        return chunk.counts
+
+    def get_mine(self, x, y):
+        return InfiniteMine(self, x, y)
+
+    def window(self, x0, y0, x1, y1):
+        """(status, counts, mines) of the blocks x0 <= x < x1, y0 <= y < y1
+
+        Like MineField.window, generating the chunks the window reaches.
+        """
+        size = self.chunk_size
+        blank = bytes([_INITIAL]) * size
+        status, counts, mines = bytearray(), bytearray(), bytearray()
+        for y in range(y0, y1):
+            row = y % size * size
+            x = x0
+            while x < x1:
+                key = (x // size, y // size)
+                start = row + x % size
+                end = start + min(size - x % size, x1 - x)
+                chunk_status = self._status.get(key)
+                if chunk_status is None:
+                    status += blank[: end - start]
+                else:
+                    status += chunk_status[start:end]
+                counts += self._chunk_counts(key)[start:end]
+                mines += self._chunk(key).mines[start:end]
+                x += end - start
+        return bytes(status), bytes(counts), bytes(mines)
+
+    def get_value(self, x, y):
+        key, index = self._locate(x, y)
+        return self._chunk(key).mines[index]
+
+    def around_count(self, x, y):
+        key, index = self._locate(x, y)
+        return self._chunk_counts(key)[index]
+
+    def get_status(self, x, y):
+        key, index = self._locate(x, y)
+        status = self._status.get(key)
+        return _INITIAL if status is None else status[index]
+
+    def set_status(self, x, y, status):
+        self._write_status(x, y, status.value)
+
+    def _write_status(self, x, y, value):
+        """change a status, keeping flag_count and the dirty set up to date"""
+        key, index = self._locate(x, y)
+        status = self._status.get(key)
+        if status is None:
+            status = self._status[key] = bytearray([_INITIAL]) * self.chunk_size**2
+        self.flag_count += (value == _FLAGGED) - (status[index] == _FLAGGED)
+        status[index] = value
+        self._dirty.add((x, y))
+
+    def pop_dirty(self):
+        """return the (x, y) of blocks changed since the last call"""
+        dirty, self._dirty = self._dirty, set()
+        return dirty
+
+    def is_win(self):
+        return False  # there is always more board
+
+    def is_lost(self):
+        return self.boomed
+
+    def explored_chunks(self):
+        """number of chunks holding a changed status"""
+        return len(self._status)
+
+    def toggle_status(self, x, y):
+        status = self.get_status(x, y)
+        if status == _INITIAL:
+            self._write_status(x, y, _FLAGGED)
+        elif status == _FLAGGED:
+            self._write_status(x, y, MineStatus.QUESTION_MARK.value)
+        elif status == MineStatus.QUESTION_MARK.value:
+            self._write_status(x, y, _INITIAL)
+
+    def _is_opened(self, x, y):
+        return self.get_status(x, y) in (_OPENED, _CLICKING)
+
+    def open_mine(self, x, y):
+        if self.get_value(x, y):
+            self._write_status(x, y, MineStatus.BOOMED.value)
+            self.boomed = True
+            return False
+        self.flood_fill(x, y)
+        return True
+
+    def flood_fill(self, x, y):
+        """open (x, y) and the area without mines around connected to it
+
+        Return the (x, y) of the newly opened blocks, at most about
+        fill_limit of them; the rest of the area is left to reveal_frontier.
+        """
+        newly_opened = [] if self._is_opened(x, y) else [(x, y)]
+        if newly_opened:
+            self._write_status(x, y, _OPENED)
+        return self._fill([(x, y)], newly_opened)
+
+    def reveal_frontier(self, x0, y0, x1, y1):
+        """carry on the flood fills from the frontier blocks x0 <= x < x1,
+        y0 <= y < y1, without spreading from blocks outside of it
+
+        Return the (x, y) of the newly opened blocks.
+        """
+        inside = [
+            (x, y) for x, y in self._frontier if x0 <= x < x1 and y0 <= y < y1
+        ]
+        if not inside:
+            return []
+        return self._fill(inside, [], (x0, y0, x1, y1))
+
+    def _fill(self, layer, newly_opened, bounds=None):
+        """spread from the opened blocks of layer, layer by layer
+
+        Blocks outside bounds, or reached once fill_limit blocks are opened,
+        join the frontier instead of spreading.
+        """
+        frontier = self._frontier
+        while layer:
+            next_layer = []
+            for x, y in layer:
+                if self.around_count(x, y):
+                    continue
+                if len(newly_opened) >= self.fill_limit or (
+                    bounds is not None
+                    and not (bounds[0] <= x < bounds[2] and bounds[1] <= y < bounds[3])
+                ):
+                    frontier.add((x, y))
+                    continue
+                frontier.discard((x, y))
+                for dx, dy in _AROUND:
+                    cell = (x + dx, y + dy)
+                    if self._is_opened(*cell):
+                        continue
+                    self._write_status(*cell, _OPENED)
+                    newly_opened.append(cell)
+                    next_layer.append(cell)
+            layer = next_layer
+
+        self.opened_count += len(newly_opened)
+        for listener in self.open_listeners:
+            listener(newly_opened)
+        return newly_opened
+
+    def double_mouse_button_down(self, x, y):
+        count = self.around_count(x, y)
+        if count == 0:
+            return True
+
+        self._write_status(x, y, _CLICKING)
+        around = [(x + dx, y + dy) for dx, dy in _AROUND]
+        flags = sum(self.get_status(*cell) == _FLAGGED for cell in around)
+
+        # all mines around are marked
+        result = True
+        for cell in around:
+            if self.get_status(*cell) == _INITIAL:
+                if flags != count:
+                    self._write_status(*cell, _HINTING)
+                elif not self.open_mine(*cell):
+                    result = False
+        return result
+
+    def double_mouse_button_up(self, x, y):
+        self._write_status(x, y, _OPENED)
+        for dx, dy in _AROUND:
+            if self.get_status(x + dx, y + dy) == _HINTING:
+                self._write_status(x + dx, y + dy, _INITIAL)
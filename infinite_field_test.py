@@ -0,0 +1,107 @@
+import random
+import unittest
+
+from infinite_field import InfiniteMineField
+from mine_field import MineStatus
+
+
+def brute_count(field, x, y):
+    return sum(
+        field.get_value(x + dx, y + dy)
+        for dx in (-1, 0, 1)
+        for dy in (-1, 0, 1)
+        if dx or dy
+    )
+
+
+class InfiniteMineFieldTest(unittest.TestCase):
+    def test_counts_across_chunks(self):
+        """Around counts are right on chunk borders and at negative coordinates"""
+        field = InfiniteMineField(seed=1, chunk_size=8)
+        rng = random.Random(1)
+        blocks = [(7, 7), (8, 8), (-1, -1), (-8, 0), (0, -9)] + [
+            (rng.randrange(-100, 100), rng.randrange(-100, 100)) for _ in range(300)
+        ]
+        for x, y in blocks:
+            self.assertEqual(field.around_count(x, y), brute_count(field, x, y))
+
+    def test_deterministic(self):
+        """Mines follow from the seed, whatever the cache evicted in between"""
+        small = InfiniteMineField(seed=2, cache_size=9)
+        large = InfiniteMineField(seed=2)
+        rng = random.Random(2)
+        for _ in range(300):
+            x, y = rng.randrange(-500, 500), rng.randrange(-500, 500)
+            self.assertEqual(small.get_value(x, y), large.get_value(x, y))
+            self.assertEqual(small.around_count(x, y), large.around_count(x, y))
+        self.assertLessEqual(len(small._chunks), 9)
+        self.assertNotEqual(
+            [InfiniteMineField(seed=3).get_value(x, 0) for x in range(100)],
+            [large.get_value(x, 0) for x in range(100)],
+        )
+
+    def test_origin_opens(self):
+        field = InfiniteMineField(seed=4)
+        self.assertTrue(field.open_mine(0, 0))
+        self.assertGreaterEqual(field.opened_count, 1)
+        self.assertEqual(field.get_mine(0, 0).status, MineStatus.OPENED)
+
+    def test_memory_follows_explored_area(self):
+        """Far away reveals only keep statuses for the chunks they touched"""
+        field = InfiniteMineField(seed=5, cache_size=64)
+        rng = random.Random(5)
+        for _ in range(50):
+            x, y = rng.randrange(-10**9, 10**9), rng.randrange(-10**9, 10**9)
+            if not field.get_value(x, y):
+                field.flood_fill(x, y)
+        self.assertLessEqual(len(field._chunks), 64)
+        self.assertLess(field.explored_chunks(), 50 * 4)
+
+    def test_chord(self):
+        """Chording opens around a number once its mines are flagged"""
+        field = InfiniteMineField(seed=6)
+        field.open_mine(0, 0)
+        x, y = next(
+            (x, y)
+            for x in range(-3, 4)
+            for y in range(-3, 4)
+            if field.get_mine(x, y).status == MineStatus.OPENED
+            and field.around_count(x, y)
+        )
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                if field.get_value(x + dx, y + dy):
+                    field.toggle_status(x + dx, y + dy)
+        self.assertTrue(field.double_mouse_button_down(x, y))
+        field.double_mouse_button_up(x, y)
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                expected = (
+                    MineStatus.FLAGGED
+                    if field.get_value(x + dx, y + dy)
+                    else MineStatus.OPENED
+                )
+                self.assertEqual(field.get_mine(x + dx, y + dy).status, expected)
+
+    def test_low_density_fill_is_bounded(self):
+        """A percolating area opens fill_limit blocks, the view opens on demand"""
+        field = InfiniteMineField(seed=1, density=0.02, fill_limit=2000)
+        self.assertTrue(field.open_mine(0, 0))
+        self.assertLessEqual(field.opened_count, 2000 + 8)
+        self.assertTrue(field._frontier)
+
+        far = [(x, y) for x in range(300, 340) for y in range(-20, 20)]
+        self.assertFalse(any(field._is_opened(*cell) for cell in far))
+        # panning the view to x = 300 opens the area as it comes into view
+        for left in range(0, 301, 20):
+            while field.reveal_frontier(left, -20, left + 40, 20):
+                pass
+        self.assertGreater(sum(field._is_opened(*cell) for cell in far), len(far) // 2)
+        for x, y in field._frontier:
+            # every frontier block is an opened block without mines around
+            self.assertTrue(field._is_opened(x, y))
+            self.assertEqual(field.around_count(x, y), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,175 @@
+"""Opt-in timers and counters for the game loop and the MineField hot paths.
+
+Instruments collects per-phase timings and event counters; NullInstruments
+has the same methods doing nothing. The choice is made once, at startup:
+timed(name, func) returns a timing wrapper of func when instrumenting and
+func itself otherwise, so the game loop calls exactly the same functions as
+without instrumentation. MineField calls its hooks once per reveal and once
+per chord; the byte engine adds the neighbours it reads per block to a local
+count, so a NullInstruments costs that addition and one empty method call
+per reveal.
+
+Collected so far can be read as overlay_lines() for an on-screen overlay,
+as snapshot() for a dict, and appended to a file every dump_interval
+seconds by maybe_dump: one JSON object per line, or CSV rows if the path
+ends in .csv.
+
+    instruments = Instruments("profile.csv")
+    update = instruments.timed("display.update", pygame.display.update)
+"""
+import csv
+import json
+import os
+import time
+from collections import deque
+
+DUMP_INTERVAL = 5.0  # seconds
+WINDOW = 300  # recent values kept per distribution
+
+
+class NullInstruments:
+    """Instruments that do nothing, used when instrumentation is disabled"""
+
+    enabled = False
+
+    def timed(self, name, func):
+        return func
+
+    def count(self, name, amount=1):
+        pass
+
+    def observe(self, name, value):
+        pass
+
+    def flood(self, opened, depth, lookups):
+        pass
+
+    def maybe_dump(self, now=None):
+        pass
+
+    def dump(self):
+        pass
+
+
+NULL_INSTRUMENTS = NullInstruments()
+
+
+class Instruments:
+    enabled = True
+
+    def __init__(self, dump_path=None, dump_interval=DUMP_INTERVAL, window=WINDOW):
+        self.dump_path = dump_path
+        self.dump_interval = dump_interval
+        self.window = window
+        self.phases = {}  # name -> [calls, total seconds, max seconds]
+        self.counters = {}  # name -> int
+        self.values = {}  # name -> deque of the most recent values
+        self.started = time.perf_counter()
+        self._last_dump = self.started
+
+    def timed(self, name, func):
+        """return func wrapped to add its run time to phase name"""
+        phase = self.phases.setdefault(name, [0, 0.0, 0.0])
+        perf_counter = time.perf_counter
+
+        def timed_func(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = perf_counter() - start
+                phase[0] += 1
+                phase[1] += elapsed
+                if elapsed > phase[2]:
+                    phase[2] = elapsed
+
+        return timed_func
+
+    def count(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def observe(self, name, value):
+        values = self.values.get(name)
+        if values is None:
+            values = self.values[name] = deque(maxlen=self.window)
+        values.append(value)
+
+    def flood(self, opened, depth, lookups):
+        """a reveal opened the flat indices opened, in depth flood fill layers
+        and reading the neighbours of blocks lookups times"""
+        self.count("reveals")
+        self.count("cells_opened", len(opened))
+        self.observe("cells_per_reveal", len(opened))
+        self.observe("flood_depth", depth)
+        self.count("neighbour_lookups", lookups)
+
+    def snapshot(self):
+        """everything collected so far, times in milliseconds"""
+        phases = {
+            name: {
+                "calls": calls,
+                "total_ms": total * 1000,
+                "mean_ms": total * 1000 / calls if calls else 0.0,
+                "max_ms": longest * 1000,
+            }
+            for name, (calls, total, longest) in self.phases.items()
+        }
+        values = {}
+        for name, recent in self.values.items():
+            ordered = sorted(recent)
+            values[name] = {
+                "mean": sum(ordered) / len(ordered),
+                "p95": ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))],
+                "max": ordered[-1],
+            }
+        return {
+            "seconds": time.perf_counter() - self.started,
+            "phases": phases,
+            "counters": dict(self.counters),
+            "values": values,
+        }
+
+    def overlay_lines(self):
+        """short text lines summing up the snapshot, for an on-screen overlay"""
+        snapshot = self.snapshot()
+        lines = [
+            f"{name} {phase['mean_ms']:.2f} ms, max {phase['max_ms']:.1f}"
+            for name, phase in snapshot["phases"].items()
+            if phase["calls"]
+        ]
+        lines += [f"{name} {value}" for name, value in snapshot["counters"].items()]
+        lines += [
+            f"{name} mean {value['mean']:.1f}, max {value['max']}"
+            for name, value in snapshot["values"].items()
+        ]
+        return lines
+
+    def maybe_dump(self, now=None):
+        """append a snapshot to dump_path if dump_interval has passed"""
+        now = time.perf_counter() if now is None else now
+        if self.dump_path and now - self._last_dump >= self.dump_interval:
+            self._last_dump = now
+            self.dump()
+
+    def dump(self):
+        """append a snapshot to dump_path, if there is one"""
+        if not self.dump_path:
+            return
+        snapshot = self.snapshot()
+        if not self.dump_path.endswith(".csv"):
+            with open(self.dump_path, "a") as file:
+                file.write(json.dumps(snapshot) + "\n")
+            return
+
+        new_file = not os.path.exists(self.dump_path)
+        with open(self.dump_path, "a", newline="") as file:
+            writer = csv.writer(file)
+            if new_file:
+                writer.writerow(["seconds", "kind", "name", "field", "value"])
+            seconds = round(snapshot["seconds"], 3)
+            for kind in ("phases", "values"):
+                for name, fields in snapshot[kind].items():
+                    for field, value in fields.items():
+                        writer.writerow([seconds, kind, name, field, value])
+            for name, value in snapshot["counters"].items():
+                writer.writerow([seconds, "counters", name, "count", value])
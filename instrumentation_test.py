@@ -0,0 +1,146 @@
+import csv
+import json
+import os
+import tempfile
+import unittest
+
+from bitboard_field import BitboardMineField
+from instrumentation import NULL_INSTRUMENTS, Instruments
+from mine_field import MineField, MineStatus
+
+try:
+    import pygame
+except ImportError:  # only the overlay needs pygame
+    pygame = None
+
+
+class InstrumentsTest(unittest.TestCase):
+    def test_null_timed_is_the_function(self):
+        """Disabled instrumentation leaves the function as it is"""
+        self.assertIs(NULL_INSTRUMENTS.timed("len", len), len)
+
+    def test_timed(self):
+        instruments = Instruments()
+        timed_len = instruments.timed("len", len)
+        self.assertEqual(timed_len("abc"), 3)
+        self.assertEqual(timed_len([]), 0)
+        phase = instruments.snapshot()["phases"]["len"]
+        self.assertEqual(phase["calls"], 2)
+        self.assertGreaterEqual(phase["max_ms"], phase["mean_ms"])
+
+    def test_timed_counts_raising_calls(self):
+        instruments = Instruments()
+        with self.assertRaises(ValueError):
+            instruments.timed("int", int)("x")
+        self.assertEqual(instruments.snapshot()["phases"]["int"]["calls"], 1)
+
+    def test_field_counters(self):
+        """A reveal reports its size, its depth and the neighbours it read"""
+        for field_class in (MineField, BitboardMineField):
+            instruments = Instruments()
+            # a 5x1 row whose only mine is at its right end: 0 0 0 1 *
+            field = field_class.from_mines(5, 1, [4])
+            field.hooks = instruments
+            field.open_mine(0, 0)
+            snapshot = instruments.snapshot()
+            self.assertEqual(snapshot["values"]["flood_depth"]["max"], 4)
+            self.assertEqual(snapshot["counters"]["cells_opened"], 4, field_class)
+            self.assertEqual(snapshot["counters"]["reveals"], 1)
+            # the zeros 0, 1 and 2 read their 1, 2 and 2 neighbours, the
+            # bitboard dilations read none
+            lookups = 5 if field_class is MineField else 0
+            self.assertEqual(snapshot["counters"]["neighbour_lookups"], lookups)
+
+    def test_chord_counts_lookups(self):
+        instruments = Instruments()
+        field = MineField.from_mines(3, 3, [0])
+        field.hooks = instruments
+        field.open_mine(1, 1)
+        lookups = instruments.counters.get("neighbour_lookups", 0)
+        field.double_mouse_button_down(1, 1)
+        self.assertEqual(instruments.counters["neighbour_lookups"], lookups + 8)
+
+    def test_hooks_are_not_pickled(self):
+        import pickle
+
+        field = MineField.from_mines(3, 3, [0])
+        field.hooks = Instruments()
+        self.assertIs(pickle.loads(pickle.dumps(field)).hooks, NULL_INSTRUMENTS)
+
+    def test_dump(self):
+        with tempfile.TemporaryDirectory() as folder:
+            for name in ("profile.json", "profile.csv"):
+                path = os.path.join(folder, name)
+                instruments = Instruments(path, dump_interval=1.0)
+                instruments.timed("len", len)("abc")
+                instruments.count("reveals")
+                now = instruments.started
+                instruments.maybe_dump(now + 0.5)
+                self.assertFalse(os.path.exists(path))
+                instruments.maybe_dump(now + 1.0)
+                instruments.maybe_dump(now + 2.0)
+                with open(path, newline="") as file:
+                    if name.endswith(".json"):
+                        snapshots = [json.loads(line) for line in file]
+                        self.assertEqual(len(snapshots), 2)
+                        self.assertEqual(snapshots[0]["counters"], {"reveals": 1})
+                    else:
+                        rows = list(csv.reader(file))
+                        self.assertEqual(rows[0][:3], ["seconds", "kind", "name"])
+                        self.assertIn("reveals", [row[2] for row in rows])
+                        self.assertEqual(rows.count(rows[0]), 1)  # one header
+
+
+@unittest.skipIf(pygame is None, "pygame is not installed")
+class GameInstrumentsTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+    def test_disabled_wraps_nothing(self):
+        import main
+
+        game = main.Game()
+        self.assertNotIn("render_minesweeper", vars(game))
+        self.assertIs(game.update_display, pygame.display.update)
+        self.assertFalse(game.show_overlay)
+
+    def test_phases_and_overlay(self):
+        import main
+
+        instruments = Instruments()
+        game = main.Game(instruments=instruments)
+        self.assertIs(game.field.hooks, instruments)
+        game.start_game()
+        game.handle_gameplay_actions(0, 0, True, False)
+        game.render_full()
+        x, y = next(
+            (x, y)
+            for y in range(game.height)
+            for x in range(game.width)
+            if game.field.get_mine(x, y).status == MineStatus.INITIAL
+        )
+        game.handle_gameplay_actions(x, y, False, True)  # flag it
+        self.assertTrue(game.render_changes())
+        rect = game.render_overlay()
+        self.assertTrue(rect.width and rect.height)
+        phases = instruments.snapshot()["phases"]
+        self.assertEqual(phases["render_changes"]["calls"], 1)
+        self.assertEqual(phases["render_minesweeper"]["calls"], 1)
+        self.assertEqual(phases["update_game_status"]["calls"], 2)
+        self.assertEqual(instruments.counters["reveals"], 1)
+
+    def test_quit_dumps(self):
+        import main
+
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "profile.json")
+            game = main.Game(instruments=Instruments(path))
+            with self.assertRaises(SystemExit):
+                game.handle_events([pygame.event.Event(pygame.QUIT)])
+            with open(path) as file:
+                self.assertEqual(len(file.readlines()), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,10 +1,37 @@
+import argparse
 import os
+import random
 import sys
 import time
-from enum import Enum
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 import pygame
-from pygame.locals import MOUSEBUTTONDOWN, MOUSEBUTTONUP, QUIT
+from pygame.locals import (
+    K_DOWN,
+    K_F3,
+    K_LEFT,
+    K_RIGHT,
+    K_UP,
+    KEYDOWN,
+    MOUSEBUTTONDOWN,
+    MOUSEBUTTONUP,
+    MOUSEWHEEL,
+    QUIT,
+    USEREVENT,
+)
+from game_session import GameStatus
+from board_pool import POOL_SIZE, BoardPool
+from infinite_field import InfiniteMineField
 from mine_field import MineStatus, MineField
+from no_guess import generate_no_guess
+import replay
+import savegame
+from viewport import PIXEL_ZOOM, TILE_KEYS, ZOOM_LEVELS, TileCache, Viewport
+from asset_atlas import SOURCE_GROUP, load_atlas
+import game_client
+import game_server
+from instrumentation import NULL_INSTRUMENTS, Instruments
 
 
 FIELD_WIDTH = 30
@@ -12,45 +39,309 @@ FIELD_HEIGHT = 16
 MINE_COUNT = 99
 
 MINE_SIZE = 20
+FACES = ("face_fail", "face_normal", "face_success")
+# the bitmaps and the font sit next to this file
+RESOURCE_FOLDER = os.path.dirname(os.path.abspath(__file__))
 
-SCREEN_WIDTH = FIELD_WIDTH * MINE_SIZE
-SCREEN_HEIGHT = (FIELD_HEIGHT + 2) * MINE_SIZE
+# larger boards are seen through a window of at most this many blocks
+MAX_VIEW_WIDTH = 40
+MAX_VIEW_HEIGHT = 24
+MIN_VIEW_WIDTH = 16  # room for the header, narrower boards are centred
 
 RED = (200, 40, 40)
 WHITE = (225, 225, 225) 
 
-
-class GameStatus(Enum):
-    READY = 1
-    STARTED = 2
-    OVER = 3
-    WIN = 4
+TIMER_EVENT = USEREVENT  # posted once per second while the game is running
+# the only events the loop wakes up for; mouse motion and window events are
+# blocked, so an idle game sleeps until a click, a key or the timer
+HANDLED_EVENTS = (
+    QUIT, MOUSEBUTTONDOWN, MOUSEBUTTONUP, KEYDOWN, MOUSEWHEEL, TIMER_EVENT
+)
+
+PAN_STEP = 4 * MINE_SIZE  # pixels per arrow key press
+PAN_KEYS = {K_LEFT: (-1, 0), K_RIGHT: (1, 0), K_UP: (0, -1), K_DOWN: (0, 1)}
+
+SAVE_PATH = "minesweeper.sav"  # an unfinished game is kept here between runs
+
+# the instrumentation overlay, toggled with F3
+OVERLAY_KEY = K_F3
+OVERLAY_INTERVAL = 0.5  # seconds between refreshes of its numbers
+OVERLAY_FONT_SIZE = 16
+# the Game methods timed as phases of a frame, display.update is timed too;
+# render_changes draws the changed blocks of an incremental frame, its time
+# includes the update_game_status and render_game_info it calls
+TIMED_PHASES = (
+    "handle_events",
+    "render_changes",
+    "render_minesweeper",
+    "render_game_info",
+    "update_game_status",
+)
+
+
+class LoopStats:
+    """Frame times and CPU usage of the main loop
+
+    A frame is the work done after waking up, from handling the events to
+    display.update; the time spent waiting for events is not part of it.
+    """
+
+    def __init__(self, window=300):
+        self.frame_times = deque(maxlen=window)
+        self.reset()
+
+    def reset(self):
+        self.frames = 0
+        self.frame_times.clear()
+        self.start_wall = time.perf_counter()
+        self.start_cpu = time.process_time()
+
+    def add_frame(self, seconds):
+        self.frames += 1
+        self.frame_times.append(seconds)
+
+    def cpu_usage(self):
+        """share of one core used since the last reset, 0.0 when idle"""
+        wall = time.perf_counter() - self.start_wall
+        return (time.process_time() - self.start_cpu) / wall if wall > 0 else 0.0
+
+    def summary(self):
+        times = sorted(self.frame_times)
+
+        def percentile_ms(q):
+            if not times:
+                return 0.0
+            return times[min(len(times) - 1, int(q * len(times)))] * 1000
+
+        return {
+            "frames": self.frames,
+            "cpu_usage": self.cpu_usage(),
+            "frame_ms_p50": percentile_ms(0.5),
+            "frame_ms_p95": percentile_ms(0.95),
+            "frame_ms_max": percentile_ms(1.0),
+        }
 
 
 class Game:
-    def __init__(self, resource_folder="resources"):
+    def __init__(
+        self,
+        resource_folder=RESOURCE_FOLDER,
+        incremental=True,
+        fps=None,
+        no_guess=False,
+        pool_size=POOL_SIZE,
+        replay_path=None,
+        save_path=None,
+        infinite=False,
+        world_seed=None,
+        width=FIELD_WIDTH,
+        height=FIELD_HEIGHT,
+        mine_count=MINE_COUNT,
+        server=None,
+        instruments=None,
+    ):
         pygame.init()
-        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+        self.width, self.height, self.mine_count = width, height, mine_count
+        # an unbounded board seen through the window, generated from world_seed
+        self.infinite = infinite
+        self.world_seed = world_seed
+        if infinite:
+            view_width, view_height = FIELD_WIDTH, FIELD_HEIGHT
+        else:
+            view_width = max(MIN_VIEW_WIDTH, min(width, MAX_VIEW_WIDTH))
+            view_height = min(height, MAX_VIEW_HEIGHT)
+        self.screen_width = view_width * MINE_SIZE
+        self.screen_height = (view_height + 2) * MINE_SIZE
+        self.screen = pygame.display.set_mode((self.screen_width, self.screen_height))
         pygame.display.set_caption("Minesweeper")
+        # the blocks below the header, panned with the arrow keys, zoomed with the wheel
+        self.viewport = Viewport(
+            (0, MINE_SIZE * 2, self.screen_width, view_height * MINE_SIZE),
+            None if infinite else (width, height),
+            MINE_SIZE,
+        )
+        pygame.key.set_repeat(200, 16)
+        pygame.event.set_blocked(None)
+        pygame.event.set_allowed(HANDLED_EVENTS)
 
         self.bgcolor = WHITE  # background color
+        # redraw only changed blocks, falling back to full frames when needed
+        self.incremental = incremental
+        # None: sleep until an event arrives, otherwise cap the frame rate
+        self.fps = fps
+        self.clock = pygame.time.Clock()
+        self.loop_stats = LoopStats()
+        # an instrumentation.Instruments times the phases of every frame and
+        # counts the work of every reveal; without one nothing is wrapped
+        self.instruments = instruments or NULL_INSTRUMENTS
+        self.update_display = pygame.display.update
+        if self.instruments.enabled:
+            for name in TIMED_PHASES:
+                setattr(self, name, self.instruments.timed(name, getattr(self, name)))
+            self.update_display = self.instruments.timed(
+                "display.update", pygame.display.update
+            )
+        self.show_overlay = self.instruments.enabled
+        self.overlay = None  # the rendered overlay and when it was rendered
+        self.overlay_time = 0.0
+        # a random board places its mines on the first reveal, building one
+        # only allocates its buffers; no-guess boards are built in the
+        # background and reset_game pops one, building it on a miss
+        self.random_board = partial(MineField, width, height, mine_count)
+        self.pool_executor = None
+        self.board_pool = None
+        if no_guess:
+            # too slow for a thread next to the game loop; a miss builds its
+            # board right away, a random one would need guessing
+            self.pool_executor = ProcessPoolExecutor()
+            self.board_pool = BoardPool(
+                partial(generate_no_guess, width, height, mine_count),
+                pool_size,
+                executor=self.pool_executor,
+            )
+            self.board_pool.wait()  # the first game starts with a pooled board
+
+        # every game played is appended to this replay file, if any
+        self.replay_writer = replay.ReplayWriter(replay_path) if replay_path else None
+        self.recorder = None
+        # an unfinished game is saved here on quit and resumed on start
+        self.save_path = save_path
+        # with a game_server address the games are played by the server, the
+        # field only mirrors what it sends back
+        self.client = game_client.GameClient(server) if server else None
 
         self.load_resource(resource_folder)
 
         self.reset_game()
+        if save_path and os.path.exists(save_path):
+            self.resume_game()
 
     def run(self):
         """Main game loop"""
+        self.loop_stats.reset()
         while True:
-            self.screen.fill(self.bgcolor)
-            
-            self.handle_events()
+            if self.fps is None:
+                events = [pygame.event.wait()] + pygame.event.get()
+            else:
+                self.clock.tick(self.fps)
+                events = pygame.event.get()
+            frame_start = time.perf_counter()
+
+            self.handle_events(events)
+
+            if self.incremental and not self.needs_full_redraw():
+                dirty_rects = self.render_changes()
+                if self.show_overlay:
+                    dirty_rects.append(self.render_overlay())
+                if dirty_rects:
+                    self.update_display(dirty_rects)
+            else:
+                self.render_full()
+                if self.show_overlay:
+                    self.render_overlay()
+                self.update_display()
+
+            self.loop_stats.add_frame(time.perf_counter() - frame_start)
+            self.instruments.maybe_dump()
+
+    def needs_full_redraw(self):
+        # all mines are uncovered when the game is lost
+        return self.full_redraw or (
+            self.game_status == GameStatus.OVER
+            and self.drawn_game_status != GameStatus.OVER
+        )
+
+    def render_full(self):
+        """Redraw the whole screen"""
+        self.reveal_frontier()
+        # a win flags every mine, which must happen before the blocks are drawn
+        self.update_game_status()
+        self.field.pop_dirty()  # every block is drawn below
+
+        self.screen.fill(self.bgcolor)
+        self.render_minesweeper()
+        self.render_game_info()
+        self.render_face()
+
+        self.full_redraw = False
+        self.drawn_game_status = self.game_status
+        self.drawn_info = self.game_info()
+
+    def reveal_frontier(self):
+        """open the visible rest of unbounded areas too large for one fill"""
+        if self.infinite:
+            self.field.reveal_frontier(*self.viewport.visible())
+
+    def render_changes(self):
+        """Redraw changed blocks and header, return the rects to update"""
+        self.update_game_status()
+        self.reveal_frontier()
+
+        dirty = self.field.pop_dirty()
+        x0, y0, x1, y1 = self.viewport.visible()
+        if len(dirty) > (x1 - x0) * (y1 - y0):
+            # more changes than blocks on screen, e.g. a huge area opened
+            self.render_full()
+            return [self.screen.get_rect()]
+        width, infinite = self.width, self.infinite
+        changed = []
+        for block in dirty:
+            x, y = block if infinite else (block % width, block // width)
+            if x0 <= x < x1 and y0 <= y < y1:
+                changed.append((x, y))
+        if changed and self.viewport.pixel_mode():
+            # blocks are pixels, redrawing them all is cheaper than one by one
             self.render_minesweeper()
+            dirty_rects = [self.viewport.rect]
+        else:
+            dirty_rects = [self.render_mine(x, y) for x, y in changed]
+
+        info = self.game_info()
+        if info != self.drawn_info:
+            header = pygame.Rect(0, 0, self.screen_width, MINE_SIZE * 2)
+            self.screen.fill(self.bgcolor, header)
             self.render_game_info()
-            self.update_game_status()
             self.render_face()
+            dirty_rects.append(header)
+            self.drawn_info = info
+        self.drawn_game_status = self.game_status
+
+        return dirty_rects
+
+    def render_overlay(self):
+        """draw the loop and instrumentation numbers over the board
+
+        The text is rendered again every OVERLAY_INTERVAL seconds only.
+        Return the rect drawn.
+        """
+        now = time.perf_counter()
+        if self.overlay is None or now - self.overlay_time >= OVERLAY_INTERVAL:
+            stats = self.loop_stats.summary()
+            lines = [
+                f"frame p50 {stats['frame_ms_p50']:.2f} ms, "
+                f"p95 {stats['frame_ms_p95']:.2f}, cpu {stats['cpu_usage']:.0%}"
+            ]
+            lines += self.instruments.overlay_lines()
+            font = pygame.font.Font(None, OVERLAY_FONT_SIZE)
+            texts = [font.render(line, True, WHITE) for line in lines]
+            line_height = font.get_linesize()
+            self.overlay = pygame.Surface(
+                (max(text.get_width() for text in texts) + 4, len(texts) * line_height)
+            )
+            for i, text in enumerate(texts):
+                self.overlay.blit(text, (2, i * line_height))
+            self.overlay_time = now
+        return self.screen.blit(self.overlay, self.viewport.rect.topleft)
 
-            pygame.display.update()
+    def game_info(self):
+        """what the header shows: mine counter, timer and face"""
+        return self.field.flag_count, self.elapsed_time, self.game_status
+
+    def mine_counter(self):
+        # an unbounded board has no mine total, count the flags up instead
+        if self.infinite:
+            return self.field.flag_count
+        return self.mine_count - self.field.flag_count
 
     def load_resource(self, resource_folder):
         # Add path validation
@@ -60,94 +351,120 @@ class Game:
         self.font = pygame.font.Font(f"{resource_folder}/a.TTF", MINE_SIZE * 2)
         self.font_width, self.font_height = self.font.size("999")        
         # load images, because the size of resource file is not the same, so it is processed uniformly
-        # en: Load and scale number images (0-8)
-        self.img_dict = {}
-        for i in range(9):
-            img = pygame.image.load(f"{resource_folder}/{i}.bmp").convert()
-            self.img_dict[i] = pygame.transform.smoothscale(img, (MINE_SIZE, MINE_SIZE))
-
-        # load other game elements
-        elements = ["blank", "flag", "ask", "mine", "blood", "error"]
-
-        for elem in elements:
-            img = pygame.image.load(f"{resource_folder}/{elem}.bmp").convert()
-            self.img_dict[elem] = pygame.transform.smoothscale(img, (MINE_SIZE, MINE_SIZE))
-
-        # load face images
+        # en: the tiles at every zoom level drawn as tiles and the faces come
+        # prescaled from one cached atlas image, see asset_atlas
         self.face_size = int(MINE_SIZE * 1.5)
-        self.face_pos_x = (SCREEN_WIDTH - self.face_size) // 2
+        self.face_pos_x = (self.screen_width - self.face_size) // 2
         self.face_pos_y = (MINE_SIZE * 2 - self.face_size) // 2
-        faces = ["face_fail", "face_normal", "face_success"]
-        for face in faces:
-            img = pygame.image.load(f"{resource_folder}/{face}.bmp").convert()
-            self.img_dict[face] = pygame.transform.smoothscale(
-                img, (self.face_size, self.face_size)
-            )
+        tile_sizes = [size for size in ZOOM_LEVELS if size > PIXEL_ZOOM]
+        scaled = {size: list(TILE_KEYS) for size in tile_sizes}
+        scaled.setdefault(self.face_size, []).extend(FACES)
+        atlas = load_atlas(resource_folder, TILE_KEYS + FACES, scaled)
+        sources = {key: atlas[SOURCE_GROUP][str(key)] for key in TILE_KEYS}
+        tiles = {
+            size: {key: atlas[str(size)][str(key)] for key in TILE_KEYS}
+            for size in tile_sizes
+        }
+        self.tile_cache = TileCache(sources, self.bgcolor, tiles)
+        self.img_dict = dict(self.tile_cache.tiles(MINE_SIZE))
+        for face in FACES:
+            self.img_dict[face] = atlas[str(self.face_size)][face]
 
     def print_text(self, x, y, text, fcolor=(255, 255, 255)):
         imgText = self.font.render(text, True, fcolor)
         self.screen.blit(imgText, (x, y))
 
     def render_minesweeper(self):
-        """Render minesweeper game blocks"""
-        self.flag_count = 0
-        self.opened_count = 0
-
-        for row in self.field.block:
-            for mine in row:
-                pos = (mine.x * MINE_SIZE, (mine.y + 2) * MINE_SIZE)
-                if mine.status == MineStatus.OPENED:
-                    self.screen.blit(self.img_dict[mine.around_mine_count], pos)
-                    self.opened_count += 1
-                elif mine.status == MineStatus.BOTH_BUTTON_CLICKING:
-                    self.screen.blit(self.img_dict[mine.around_mine_count], pos)
-                elif mine.status == MineStatus.BOOMED:
-                    self.screen.blit(self.img_dict["blood"], pos)
-                elif mine.status == MineStatus.FLAGGED:
-                    self.screen.blit(self.img_dict["flag"], pos)
-                    self.flag_count += 1
-                elif mine.status == MineStatus.QUESTION_MARK:
-                    self.screen.blit(self.img_dict["ask"], pos)
-                elif mine.status == MineStatus.HINTING:
-                    self.screen.blit(self.img_dict[0], pos)
-                elif self.game_status == GameStatus.OVER and mine.value:
-                    self.screen.blit(self.img_dict["mine"], pos)
-                elif mine.value == 0 and mine.status == MineStatus.FLAGGED:
-                    self.screen.blit(self.img_dict["error"], pos)
-                elif mine.status == MineStatus.INITIAL:
-                    self.screen.blit(self.img_dict["blank"], pos)
-
-        return self.flag_count, self.opened_count
+        """Render the game blocks inside the viewport"""
+        viewport = self.viewport
+        self.screen.set_clip(viewport.rect)
+        self.screen.fill(self.bgcolor, viewport.rect)
+        x0, y0, x1, y1 = viewport.visible()
+        game_over = self.game_status == GameStatus.OVER
+        if viewport.pixel_mode():
+            viewport.draw_pixels(
+                self.screen,
+                self.field.window(x0, y0, x1, y1),
+                self.tile_cache.palette(),
+                game_over,
+            )
+        elif viewport.vectorized():
+            viewport.draw_composite(
+                self.screen,
+                self.field.window(x0, y0, x1, y1),
+                self.tile_cache.atlas(viewport.tile_size),
+                game_over,
+            )
+        else:
+            get_mine = self.field.get_mine
+            for y in range(y0, y1):
+                for x in range(x0, x1):
+                    image = self.mine_image(get_mine(x, y))
+                    if image is not None:
+                        self.screen.blit(image, viewport.block_rect(x, y))
+        self.screen.set_clip(None)
+
+    def render_mine(self, x, y):
+        """Render a single block, return its rect"""
+        rect = self.viewport.block_rect(x, y)
+        self.screen.set_clip(self.viewport.rect)
+        image = self.mine_image(self.field.get_mine(x, y))
+        if image is None:
+            self.screen.fill(self.bgcolor, rect)
+        else:
+            self.screen.blit(image, rect)
+        self.screen.set_clip(None)
+        return rect.clip(self.viewport.rect)
+
+    def mine_image(self, mine):
+        """the image showing the block in its current status"""
+        tiles = self.tile_cache.tiles(self.viewport.tile_size)
+        if mine.status == MineStatus.OPENED:
+            return tiles[mine.around_mine_count]
+        elif mine.status == MineStatus.BOTH_BUTTON_CLICKING:
+            return tiles[mine.around_mine_count]
+        elif mine.status == MineStatus.BOOMED:
+            return tiles["blood"]
+        elif mine.status == MineStatus.FLAGGED:
+            return tiles["flag"]
+        elif mine.status == MineStatus.QUESTION_MARK:
+            return tiles["ask"]
+        elif mine.status == MineStatus.HINTING:
+            return tiles[0]
+        elif self.game_status == GameStatus.OVER and mine.value:
+            return tiles["mine"]
+        elif mine.value == 0 and mine.status == MineStatus.FLAGGED:
+            return tiles["error"]
+        elif mine.status == MineStatus.INITIAL:
+            return tiles["blank"]
+        return None
 
     def is_win(self):
-        block_count = FIELD_WIDTH * FIELD_HEIGHT
-        return (self.flag_count + self.opened_count == block_count) or \
-            (block_count - self.opened_count == MINE_COUNT)
+        return self.field.is_win()
 
     def update_game_status(self):
         if self.game_status == GameStatus.STARTED:
             self.elapsed_time = int(time.time() - self.start_time)
+        else:
+            pygame.time.set_timer(TIMER_EVENT, 0)  # nothing left to tick
 
-        if self.is_win():
+        if self.game_status != GameStatus.WIN and self.is_win():
             self.game_status = GameStatus.WIN
             # en: Auto-flag all mines when won
-            for row in self.field.block:
-                for mine in row:
-                    if mine.value:
-                        mine.status = MineStatus.FLAGGED
+            self.field.flag_all_mines()
 
     def render_game_info(self):
         # Render mine counter
         self.print_text(
             30,
             (MINE_SIZE * 2 - self.font_height) // 2 - 2,
-            "%02d" % (MINE_COUNT - self.flag_count),
+            "%02d" % self.mine_counter(),
             RED,
         )
 
         # Render timer
         self.print_text(
-            SCREEN_WIDTH - self.font_width - 30,
+            self.screen_width - self.font_width - 30,
             (MINE_SIZE * 2 - self.font_height) // 2 - 2,
             "%03d" % self.elapsed_time,
             RED,
@@ -168,31 +485,60 @@ class Game:
                 self.img_dict["face_normal"], (self.face_pos_x, self.face_pos_y)
             )
 
-    def handle_events(self):
-        for event in pygame.event.get():
+    def handle_events(self, events=None):
+        # TIMER_EVENT needs no handling, waking the loop up is all it is for
+        for event in pygame.event.get() if events is None else events:
             if event.type == QUIT:
+                self.save_game()
+                self.save_replay()
+                if self.replay_writer:
+                    self.replay_writer.close()
+                if self.board_pool:
+                    self.board_pool.close()
+                    self.pool_executor.shutdown(wait=False, cancel_futures=True)
+                if self.client:
+                    self.client.close()
+                self.instruments.dump()  # the stats since the last periodic dump
                 sys.exit()
             elif event.type == MOUSEBUTTONDOWN:
                 self.handle_mouse_button_down(event)
             elif event.type == MOUSEBUTTONUP:
                 self.handle_mouse_button_up(event)
+            elif event.type == KEYDOWN:
+                self.handle_key_down(event)
+            elif event.type == MOUSEWHEEL:
+                if self.viewport.zoom(event.y, pygame.mouse.get_pos()):
+                    self.full_redraw = True
+
+    def handle_key_down(self, event):
+        """pan the viewport, toggle the instrumentation overlay"""
+        if event.key == OVERLAY_KEY and self.instruments.enabled:
+            self.show_overlay = not self.show_overlay
+            self.full_redraw = True  # wipe it off the board
+            return
+        dx, dy = PAN_KEYS.get(event.key, (0, 0))
+        left, top = self.viewport.left, self.viewport.top
+        self.viewport.pan(dx * PAN_STEP, dy * PAN_STEP)
+        if (left, top) != (self.viewport.left, self.viewport.top):
+            self.full_redraw = True
 
     def handle_mouse_button_down(self, event):
         self.mouse_x, self.mouse_y = event.pos
-        x = self.mouse_x // MINE_SIZE
-        y = self.mouse_y // MINE_SIZE - 2
+        block = self.viewport.block_at(self.mouse_x, self.mouse_y)
         self.left_btn_pressed, _, self.right_btn_pressed = pygame.mouse.get_pressed()  # ingore middle button
         
         # when both left and right mouse buttons are pressed, if all mines are marked,
         # then open around 8 un-opened blocks, if not all mines are marked, then show the effect
         # that around blocks are pressed down
-        if self.game_status == GameStatus.STARTED and self.left_btn_pressed and self.right_btn_pressed:
+        if self.game_status == GameStatus.STARTED and self.left_btn_pressed and self.right_btn_pressed and block:
+            x, y = block
             mine = self.field.get_mine(x, y)
-            if (
-                mine.status == MineStatus.OPENED
-                and not self.field.double_mouse_button_down(x, y)
-            ):
-                self.game_status = GameStatus.OVER
+            if mine.status == MineStatus.OPENED and self.client:
+                self.play_remote(game_server.CHORD_COMMAND, x, y)
+            elif mine.status == MineStatus.OPENED:
+                self.record(replay.CHORD_DOWN, x, y)
+                if not self.field.double_mouse_button_down(x, y):
+                    self.game_status = GameStatus.OVER
 
     def face_clicked(self, mouse_x, mouse_y):
         y = mouse_y // MINE_SIZE - 2
@@ -202,13 +548,15 @@ class Game:
         )
 
     def handle_mouse_button_up(self, event):
-        x = self.mouse_x // MINE_SIZE
-        y = self.mouse_y // MINE_SIZE - 2
-
         if self.face_clicked(self.mouse_x, self.mouse_y):
             self.reset_game()
             return
 
+        block = self.viewport.block_at(self.mouse_x, self.mouse_y)
+        if block is None:
+            return
+        x, y = block
+
         if self.game_status == GameStatus.READY:
             self.start_game()
             
@@ -216,30 +564,144 @@ class Game:
             self.handle_gameplay_actions(x, y, self.left_btn_pressed, self.right_btn_pressed)
 
     def reset_game(self):
+        pygame.time.set_timer(TIMER_EVENT, 0)
+        self.save_replay()
         self.game_status = GameStatus.READY
-        self.field = MineField(FIELD_WIDTH, FIELD_HEIGHT, MINE_COUNT)
+        if self.infinite:
+            seed = random.getrandbits(32) if self.world_seed is None else self.world_seed
+            self.field = InfiniteMineField(seed)
+            self.recorder = None  # the replay format needs a bounded board
+            self.viewport.center_on(0, 0)
+            start = (0, 0)  # always clear of mines
+        elif self.client:
+            self.field = self.client.new_game(self.width, self.height, self.mine_count)
+            self.recorder = None  # the server holds the mines
+            start = None
+        else:
+            pool = self.board_pool
+            self.field = pool.get() if pool else self.random_board()
+            self.recorder = replay.GameRecorder(self.field)
+            start = getattr(self.field, "start", None)
+        if self.instruments.enabled:
+            self.field.hooks = self.instruments
+        if start is not None:
+            # no-guess boards are solvable from their start block only
+            self.record(replay.REVEAL, *start)
+            self.field.open_mine(*start)
         self.elapsed_time = 0
-        self.flag_count = 0
-        self.opened_count = 0
+        self.full_redraw = True
+
+    def save_replay(self):
+        """write the current game to the replay file, unless it was not played"""
+        if self.replay_writer and self.recorder and self.recorder.actions:
+            self.replay_writer.write(self.recorder)
+        self.recorder = None
+
+    def save_game(self):
+        """keep an unfinished game in save_path, forget a finished one"""
+        if not self.save_path or self.infinite or self.client:
+            return
+        if self.game_status == GameStatus.STARTED:
+            elapsed = time.time() - self.start_time
+            savegame.save_game(self.save_path, self.field, self.game_status, elapsed)
+        elif os.path.exists(self.save_path):
+            os.remove(self.save_path)
+
+    def resume_game(self):
+        if self.infinite or self.client:
+            return  # not a local board
+        field, status, elapsed = savegame.load_game(self.save_path)
+        if (field.width, field.height, field.mine_count) != (
+            self.width,
+            self.height,
+            self.mine_count,
+        ):
+            return  # saved on a board of another size or mine count
+        self.field, self.game_status = field, status
+        if self.instruments.enabled:
+            self.field.hooks = self.instruments
+        # only whole games are recorded, a resumed one lacks its beginning
+        self.recorder = None
+        self.elapsed_time = int(elapsed)
+        self.start_time = time.time() - elapsed
+        if self.game_status == GameStatus.STARTED:
+            pygame.time.set_timer(TIMER_EVENT, 1000)
+        self.full_redraw = True
+
+    def record(self, kind, x, y):
+        if self.recorder is not None:
+            self.recorder.record(kind, x, y)
 
     def start_game(self):
         self.game_status = GameStatus.STARTED
         self.start_time = time.time()
         self.elapsed_time = 0
+        pygame.time.set_timer(TIMER_EVENT, 1000)
+
+    def play_remote(self, command, x, y):
+        """play on the server, the end of a game is the server's call too"""
+        status = self.client.play(command, x, y)
+        if status in (GameStatus.OVER, GameStatus.WIN):
+            self.game_status = status
 
     def handle_gameplay_actions(self, x, y, left_btn_pressed, right_btn_pressed):
         mine = self.field.get_mine(x, y)
+        if self.client:
+            # a chord is played on the server when both buttons go down
+            if left_btn_pressed and not right_btn_pressed:
+                if mine.status == MineStatus.INITIAL:
+                    self.play_remote(game_server.REVEAL_COMMAND, x, y)
+            elif not left_btn_pressed and right_btn_pressed:
+                self.play_remote(game_server.FLAG_COMMAND, x, y)
+            return
         if left_btn_pressed and not right_btn_pressed:
-            if mine.status == MineStatus.INITIAL and not self.field.open_mine(x, y):
-                self.game_status = GameStatus.OVER
+            if mine.status == MineStatus.INITIAL:
+                self.record(replay.REVEAL, x, y)
+                if not self.field.open_mine(x, y):
+                    self.game_status = GameStatus.OVER
         elif not left_btn_pressed and right_btn_pressed:
+            self.record(replay.FLAG, x, y)
             mine.toggle_status()
         elif left_btn_pressed and right_btn_pressed and mine.status == MineStatus.BOTH_BUTTON_CLICKING:
+            self.record(replay.CHORD_UP, x, y)
             self.field.double_mouse_button_up(x, y)
 
 
 def main():
-    game = Game()
+    parser = argparse.ArgumentParser(description="Minesweeper")
+    parser.add_argument(
+        "--no-guess", action="store_true", help="only boards solvable without guessing"
+    )
+    parser.add_argument(
+        "--infinite", action="store_true", help="unbounded board, pan with the arrow keys"
+    )
+    parser.add_argument("--replay", metavar="PATH", help="record the games played")
+    parser.add_argument("--size", default="30x16", help="board size WIDTHxHEIGHT")
+    parser.add_argument("--mines", type=int, default=MINE_COUNT)
+    parser.add_argument(
+        "--server", metavar="ADDRESS", help="play on a game_server, host:port or a socket path"
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="",
+        metavar="PATH",
+        help="time the game loop, F3 shows the numbers; dump them to a .json or .csv",
+    )
+    args = parser.parse_args()
+
+    width, height = (int(v) for v in args.size.lower().split("x"))
+    game = Game(
+        width=width,
+        height=height,
+        mine_count=args.mines,
+        save_path=SAVE_PATH,
+        no_guess=args.no_guess,
+        replay_path=args.replay,
+        infinite=args.infinite,
+        server=args.server and game_client.parse_address(args.server),
+        instruments=None if args.profile is None else Instruments(args.profile or None),
+    )
     game.run()
 
 
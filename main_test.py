@@ -0,0 +1,212 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import savegame
+from game_session import GameStatus
+from mine_field import MineField, MineStatus
+
+try:
+    import pygame
+except ImportError:  # the game needs pygame
+    pygame = None
+
+if pygame is not None:
+    import main
+
+
+def block_pixels(game, x, y):
+    rect = game.viewport.block_rect(x, y)
+    return pygame.image.tostring(game.screen.subsurface(rect), "RGB")
+
+
+def tile_pixels(game, key):
+    tile = game.tile_cache.tiles(game.viewport.tile_size)[key]
+    surface = pygame.Surface(tile.get_size())
+    surface.blit(tile, (0, 0))
+    return pygame.image.tostring(surface, "RGB")
+
+
+@unittest.skipIf(pygame is None, "pygame is not installed")
+class LoopStatsTest(unittest.TestCase):
+    def test_summary(self):
+        stats = main.LoopStats()
+        for ms in range(10, 0, -1):
+            stats.add_frame(ms / 1000)
+        summary = stats.summary()
+        self.assertEqual(summary["frames"], 10)
+        self.assertAlmostEqual(summary["frame_ms_p50"], 6)
+        self.assertAlmostEqual(summary["frame_ms_p95"], 10)
+        self.assertAlmostEqual(summary["frame_ms_max"], 10)
+        self.assertGreaterEqual(summary["cpu_usage"], 0)
+
+    def test_window_and_reset(self):
+        stats = main.LoopStats(window=3)
+        for ms in (50, 1, 2, 3):
+            stats.add_frame(ms / 1000)
+        summary = stats.summary()
+        self.assertEqual(summary["frames"], 4)  # counted, but only 3 kept
+        self.assertAlmostEqual(summary["frame_ms_max"], 3)
+        stats.reset()
+        self.assertEqual(stats.summary()["frames"], 0)
+        self.assertEqual(stats.summary()["frame_ms_max"], 0.0)
+
+
+@unittest.skipIf(pygame is None, "pygame is not installed")
+class EventTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+    def test_mouse_motion_does_not_wake_the_loop(self):
+        main.Game()
+        pygame.event.clear()
+        pygame.event.post(pygame.event.Event(pygame.MOUSEMOTION, pos=(1, 1)))
+        pygame.event.post(pygame.event.Event(main.TIMER_EVENT))
+        types = [event.type for event in pygame.event.get()]
+        self.assertEqual(types, [main.TIMER_EVENT])
+
+
+@unittest.skipIf(pygame is None, "pygame is not installed")
+class RenderTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+    def test_full_redraw_draws_the_win_flags(self):
+        """The mines flagged by a win are drawn in the same frame"""
+        game = main.Game(incremental=False)
+        game.field = MineField.from_mines(game.width, game.height, [0])
+        game.start_game()
+        game.field.open_mine(game.width - 1, game.height - 1)
+        game.render_full()
+        self.assertEqual(game.game_status, GameStatus.WIN)
+        self.assertEqual(game.field.get_mine(0, 0).status, MineStatus.FLAGGED)
+        self.assertEqual(game.field.pop_dirty(), set())
+        self.assertEqual(block_pixels(game, 0, 0), tile_pixels(game, "flag"))
+
+
+@unittest.skipIf(pygame is None, "pygame is not installed")
+class IncrementalRenderTest(unittest.TestCase):
+    """render_changes redraws only the blocks changed since the last frame"""
+
+    @classmethod
+    def setUpClass(cls):
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+    def setUp(self):
+        # wider than the view, so some blocks are off screen
+        self.game = main.Game(width=60, height=16, mine_count=0)
+        self.game.render_full()
+
+    def mark(self, x, y):
+        """give a block the question mark, leaving the flag count and header"""
+        self.game.field.toggle_status(x, y)
+        self.game.field.toggle_status(x, y)
+
+    def test_only_changed_blocks(self):
+        game = self.game
+        changed = [(3, 2), (7, 9)]
+        for x, y in changed:
+            self.mark(x, y)
+        with mock.patch.object(game, "render_mine", wraps=game.render_mine) as render:
+            rects = game.render_changes()
+        self.assertCountEqual([call.args for call in render.call_args_list], changed)
+        self.assertCountEqual(
+            [tuple(rect) for rect in rects],
+            [tuple(game.viewport.block_rect(x, y)) for x, y in changed],
+        )
+        for x, y in changed:
+            self.assertEqual(block_pixels(game, x, y), tile_pixels(game, "ask"))
+
+    def test_visible_blocks_are_found_once(self):
+        game = self.game
+        for x in range(10):
+            self.mark(x, 3)
+        viewport = game.viewport
+        with mock.patch.object(viewport, "visible", wraps=viewport.visible) as visible:
+            self.assertEqual(len(game.render_changes()), 10)
+        visible.assert_called_once_with()
+
+    def test_full_redraw_when_more_changed_than_shown(self):
+        game = self.game
+        game.start_game()
+        game.field.open_mine(0, 0)  # no mines, opens every block
+        with mock.patch.object(game, "render_mine") as render_mine:
+            self.assertEqual(game.render_changes(), [game.screen.get_rect()])
+        render_mine.assert_not_called()
+        self.assertEqual(block_pixels(game, 5, 5), tile_pixels(game, 0))
+
+    def test_nothing_changed(self):
+        self.assertEqual(self.game.render_changes(), [])
+
+    def test_hidden_blocks_are_not_drawn(self):
+        self.mark(55, 0)  # right of the view
+        self.assertEqual(self.game.render_changes(), [])
+
+    def test_header_follows_the_flags(self):
+        game = self.game
+        game.field.toggle_status(1, 1)
+        rects = game.render_changes()
+        header = pygame.Rect(0, 0, game.screen_width, main.MINE_SIZE * 2)
+        self.assertEqual(rects, [game.viewport.block_rect(1, 1), header])
+
+
+@unittest.skipIf(pygame is None, "pygame is not installed")
+class ResumeTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+    def setUp(self):
+        folder = tempfile.TemporaryDirectory()
+        self.addCleanup(folder.cleanup)
+        self.path = os.path.join(folder.name, "game.sav")
+        field = MineField(9, 9, 10, seed=1)
+        field.open_mine(4, 4)
+        savegame.save_game(self.path, field, GameStatus.STARTED, 12.0)
+
+    def game(self, mine_count):
+        return main.Game(width=9, height=9, mine_count=mine_count, save_path=self.path)
+
+    def test_resumes_the_same_board(self):
+        game = self.game(10)
+        self.assertEqual(game.game_status, GameStatus.STARTED)
+        self.assertEqual(game.mine_counter(), 10)
+
+    def test_ignores_another_mine_count(self):
+        game = self.game(20)
+        self.assertEqual(game.game_status, GameStatus.READY)
+        self.assertEqual(game.mine_counter(), 20)
+
+    def test_infinite_does_not_read_the_save(self):
+        with mock.patch.object(savegame, "load_game") as load_game:
+            main.Game(infinite=True, save_path=self.path)
+        load_game.assert_not_called()
+
+
+@unittest.skipIf(pygame is None, "pygame is not installed")
+class NoGuessTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+    def setUp(self):
+        self.game = main.Game(
+            no_guess=True, pool_size=1, width=9, height=9, mine_count=10
+        )
+        self.addCleanup(self.game.pool_executor.shutdown, cancel_futures=True)
+        self.addCleanup(self.game.board_pool.close)
+
+    def test_first_board_comes_from_the_pool(self):
+        self.assertEqual(self.game.board_pool.misses, 0)
+        self.assertEqual(self.game.field.start, (4, 4))
+        self.assertTrue(self.game.field.opened_count)  # opened at its start
+
+    def test_a_miss_builds_a_no_guess_board(self):
+        self.assertEqual(self.game.board_pool.fallback().start, (4, 4))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,14 @@
 import random
 from enum import Enum
+from functools import lru_cache
+from operator import add, sub
+
+from instrumentation import NULL_INSTRUMENTS
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional, the pure Python path does the same
+    np = None
 
 
 class MineStatus(Enum):
@@ -13,165 +22,481 @@ class MineStatus(Enum):
     BOTH_BUTTON_CLICKING = 8
 
 
+_STATUS = {status.value: status for status in MineStatus}
+
+
 class Mine:
-    def __init__(self, x, y, value=0):
+    """A lightweight view of one block of a MineField.
+
+    The state itself lives in the flat buffers of the field, a Mine only knows
+    where to look, so views are cheap to create on demand and to throw away.
+    """
+
+    __slots__ = ("_field", "_x", "_y", "_index")
+
+    def __init__(self, field, x, y):
+        self._field = field
         self._x = x
         self._y = y
-        self._value = 0
-        self._around_mine_count = -1
-        self._status = MineStatus.INITIAL
-        self.set_value(value)
+        self._index = y * field.width + x
 
     def __repr__(self):
-        return str(self._value)
-        # return f'({self._x},{self._y})={self._value}, status={self.status}'
+        return str(self.value)
+        # return f'({self._x},{self._y})={self.value}, status={self.status}'
 
     def get_x(self):
         return self._x
 
-    def set_x(self, x):
-        self._x = x
-
-    x = property(fget=get_x, fset=set_x)
+    x = property(fget=get_x)
 
     def get_y(self):
         return self._y
 
-    def set_y(self, y):
-        self._y = y
-
-    y = property(fget=get_y, fset=set_y)
+    y = property(fget=get_y)
 
     def get_value(self):
-        return self._value
+        return self._field._mines[self._index]
 
     def set_value(self, value):
-        if value:
-            self._value = 1
-        else:
-            self._value = 0
+        self._field.set_mine(self._x, self._y, value)
 
     value = property(fget=get_value, fset=set_value, doc="0:NO MINE 1:MINE")
 
     def get_around_mine_count(self):
-        return self._around_mine_count
+        return self._field._counts[self._index]
 
-    def set_around_mine_count(self, around_mine_count):
-        self._around_mine_count = around_mine_count
-
-    around_mine_count = property(
-        fget=get_around_mine_count, fset=set_around_mine_count, doc="mine count around"
-    )
+    around_mine_count = property(fget=get_around_mine_count, doc="mine count around")
 
     def get_status(self):
-        return self._status
+        return _STATUS[self._field._status[self._index]]
 
     def set_status(self, value):
-        self._status = value
+        self._field.set_status(self._x, self._y, value)
 
     status = property(fget=get_status, fset=set_status, doc="BlockStatus")
 
     def toggle_status(self):
-        if self.status == MineStatus.INITIAL:
-            self.status = MineStatus.FLAGGED
-        elif self.status == MineStatus.FLAGGED:
-            self.status = MineStatus.QUESTION_MARK
-        elif self.status == MineStatus.QUESTION_MARK:
-            self.status = MineStatus.INITIAL
+        self._field.toggle_status(self._x, self._y)
 
 
 class MineField:
-    def __init__(self, width=30, height=16, mine_count=99):
+    """Minesweeper board stored in flat, row-major buffers.
+
+    _mines holds 0/1 per block, _counts the around mine count, _opened 0/1 per
+    block and _status the MineStatus value, so a board costs a few bytes per
+    block instead of one Python object per block. The around counts are
+    computed once when the mines are placed. Running counts of opened and
+    flagged blocks are kept up to date by every change, so winning and losing
+    can be checked without looking at the blocks.
+
+    With first_click_safe the mines are only placed on the first reveal and
+    never on or around the revealed block; the layout then depends on the seed
+    and on that first block.
+
+    hooks receives the size, the depth and the neighbour lookups of every
+    reveal and the neighbour lookups of every chord; a Game running with
+    instrumentation sets it to its instrumentation.Instruments.
+    """
+
+    hooks = NULL_INSTRUMENTS
+
+    def __init__(
+        self, width=30, height=16, mine_count=99, seed=None, first_click_safe=True
+    ):
         self.width = width
         self.height = height
         self.mine_count = mine_count
 
-        self._block = [[Mine(i, j) for i in range(width)] for j in range(height)]
-
-        # set mine
-        for i in random.sample(range(width * height), mine_count):
-            self._block[i // width][i % width].value = 1
+        size = width * height
+        self._mines = bytearray(size)
+        self._opened = bytearray(size)
+        self._status = bytearray([MineStatus.INITIAL.value]) * size
+        # flat indices of blocks whose status changed since the last pop_dirty
+        self._dirty = set()
+        # callables notified with the flat indices of every newly opened area
+        self.open_listeners = []
+
+        self.opened_count = 0
+        self.flag_count = 0
+        self.boomed = False
+
+        # neighbour lookup tables, shared by all boards of the same size
+        self._edges = _edge_kinds(width, height)
+        self._offsets = _around_offsets(width)
+
+        # mines come from the global random generator unless a seed is given;
+        # seed is reset to None once the layout no longer follows from it
+        self.seed = seed
+        self.first_click_safe = first_click_safe
+        self._rng = random if seed is None else random.Random(seed)
+        self._mine_indices = []
+        self._counts = bytearray(size)
+        self._placed = False
+        if not first_click_safe:
+            self._place_mines()
+
+    def _place_mines(self, safe_index=None):
+        """place the mines, keeping safe_index and its neighbours free
+
+        Draws mine_count plus the excluded blocks from the sampler, which is
+        O(mine_count) for sparse boards, and drops the excluded ones.
+        """
+        size = self.width * self.height
+        excluded = set()
+        if safe_index is not None:
+            excluded = {safe_index, *self.around(safe_index)}
+            if size - len(excluded) < self.mine_count:
+                excluded = {safe_index} if size > self.mine_count else set()
+
+        sample = self._rng.sample(range(size), min(size, self.mine_count + len(excluded)))
+        self._set_layout([i for i in sample if i not in excluded][: self.mine_count])
+
+    def _set_layout(self, mine_indices):
+        self._mine_indices = list(mine_indices)
+        self.mine_count = len(self._mine_indices)
+        for i in self._mine_indices:
+            self._mines[i] = 1
+        self._counts = _count_around(
+            self._mines, self.width, self.height, self._mine_indices
+        )
+        self._placed = True
+
+    @classmethod
+    def from_mines(cls, width, height, mine_indices):
+        """return an unopened field with mines at the given flat indices"""
+        field = cls(width, height, len(mine_indices))
+        field._set_layout(mine_indices)
+        return field
+
+    def __getstate__(self):
+        # listeners belong to this process and the global generator is a module
+        state = dict(self.__dict__, open_listeners=[], _edges=None, _offsets=None)
+        state.pop("hooks", None)
+        if state["_rng"] is random:
+            state["_rng"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if self._rng is None:
+            self._rng = random
+        self._edges = _edge_kinds(self.width, self.height)
+        self._offsets = _around_offsets(self.width)
 
     def get_block(self):
-        return self._block
+        return [[Mine(self, i, j) for i in range(self.width)] for j in range(self.height)]
 
-    block = property(fget=get_block)
+    block = property(fget=get_block, doc="rows of Mine views, built on each access")
 
     def get_mine(self, x, y):
-        return self._block[y][x]
+        return Mine(self, x, y)
 
-    def open_mine(self, x, y):
-        # clicked on mine
-        if self._block[y][
-            x
-        ].value:  # and self._block[y][x].status != BlockStatus.FLAGGED:
-            self._block[y][x].status = MineStatus.BOOMED
-            return False
+    def window(self, x0, y0, x1, y1):
+        """(status, counts, mines) of the blocks x0 <= x < x1, y0 <= y < y1
+
+        Each is a bytes object of the window's blocks in row-major order.
+        """
+        rows = range(y0 * self.width, y1 * self.width, self.width)
+        return tuple(
+            b"".join(buffer[row + x0 : row + x1] for row in rows)
+            for buffer in (self._status, self._counts, self._mines)
+        )
+
+    def get_counts(self):
+        return memoryview(self._counts).toreadonly()
+
+    counts = property(fget=get_counts, doc="around mine count of every block, row-major")
 
-        # opened
-        self._block[y][x].status = MineStatus.OPENED
+    def get_statuses(self):
+        return memoryview(self._status).toreadonly()
 
-        around = _get_around(x, y, self.width, self.height)
+    statuses = property(fget=get_statuses, doc="MineStatus value of every block")
 
-        _sum = 0
-        for i, j in around:
-            if self._block[j][i].value:
-                _sum += 1
+    def get_opened(self):
+        return memoryview(self._opened).toreadonly()
 
-        self._block[y][x].around_mine_count = _sum
+    opened = property(fget=get_opened, doc="1 for every opened block, row-major")
 
-        # if no mine around, then open around 8 un-opened blocks recursively
-        # thus to implment the effect of opening a whole area
-        if _sum == 0:
-            for i, j in around:
-                if self._block[j][i].around_mine_count == -1:
-                    self.open_mine(i, j)
+    def get_mines(self):
+        return memoryview(self._mines).toreadonly()
 
+    mines = property(fget=get_mines, doc="1 for every mine, 0 elsewhere, row-major")
+
+    def hidden_indices(self):
+        """flat indices of the untouched blocks, not opened, flagged or marked"""
+        initial = MineStatus.INITIAL.value
+        return [index for index, status in enumerate(self._status) if status == initial]
+
+    def get_mine_indices(self):
+        return tuple(self._mine_indices)
+
+    mine_indices = property(fget=get_mine_indices, doc="flat indices of all mines")
+
+    def get_safe_remaining(self):
+        return self.width * self.height - self.mine_count - self.opened_count
+
+    safe_remaining = property(fget=get_safe_remaining, doc="blocks left to open")
+
+    def is_win(self):
+        block_count = self.width * self.height
+        return (self.flag_count + self.opened_count == block_count) or (
+            self.safe_remaining == 0
+        )
+
+    def is_lost(self):
+        return self.boomed
+
+    def flag_all_mines(self):
+        """flag every mine, e.g. when the game is won"""
+        for index in self._mine_indices:
+            self._write_status(index, MineStatus.FLAGGED.value)
+
+    def set_mine(self, x, y, value):
+        """place or remove a mine, keeping the around counts up to date"""
+        if not self._placed:
+            self._place_mines()
+        index = y * self.width + x
+        value = 1 if value else 0
+        if self._mines[index] == value:
+            return
+        self.seed = None
+        self._mines[index] = value
+        if value:
+            self._mine_indices.append(index)
+        else:
+            self._mine_indices.remove(index)
+        self.mine_count = len(self._mine_indices)
+        delta = 1 if value else -1
+        for around_index in self.around(index):
+            self._counts[around_index] += delta
+
+    def around(self, index):
+        """return the flat indices of all blocks around the flat index"""
+        return [index + offset for offset in self._offsets[self._edges[index]]]
+
+    def set_status(self, x, y, status):
+        self._write_status(y * self.width + x, status.value)
+
+    def _write_status(self, index, value):
+        """change a status, keeping flag_count and the dirty set up to date"""
+        flagged = MineStatus.FLAGGED.value
+        self.flag_count += (value == flagged) - (self._status[index] == flagged)
+        self._status[index] = value
+        self._dirty.add(index)
+
+    def pop_dirty(self):
+        """return the flat indices of blocks changed since the last call"""
+        dirty, self._dirty = self._dirty, set()
+        return dirty
+
+    def toggle_status(self, x, y):
+        index = y * self.width + x
+        status = self._status[index]
+        if status == MineStatus.INITIAL.value:
+            self._write_status(index, MineStatus.FLAGGED.value)
+        elif status == MineStatus.FLAGGED.value:
+            self._write_status(index, MineStatus.QUESTION_MARK.value)
+        elif status == MineStatus.QUESTION_MARK.value:
+            self._write_status(index, MineStatus.INITIAL.value)
+
+    def open_mine(self, x, y):
+        return self._open(y * self.width + x)
+
+    def _open(self, index):
+        if not self._placed:
+            self._place_mines(index)
+
+        # clicked on mine
+        if self._mines[index]:  # and status != MineStatus.FLAGGED:
+            self._write_status(index, MineStatus.BOOMED.value)
+            self.boomed = True
+            return False
+
+        self._flood_fill(index)
         return True
 
+    def flood_fill(self, x, y):
+        """open (x, y) and, if no mine is around, the whole area connected to it
+
+        (x, y) must not be a mine. The area is walked layer by layer with an
+        explicit queue instead of recursion, so big empty regions can not hit
+        the recursion limit. Return the flat indices of the newly opened blocks.
+        """
+        index = y * self.width + x
+        if not self._placed:
+            self._place_mines(index)
+        return self._flood_fill(index)
+
+    def _flood_fill(self, start):
+        counts, opened_flags, status = self._counts, self._opened, self._status
+        edges, offsets = self._edges, self._offsets
+        opened, flagged = MineStatus.OPENED.value, MineStatus.FLAGGED.value
+
+        newly_opened = [] if opened_flags[start] else [start]
+        opened_flags[start] = 1
+        self._write_status(start, opened)
+        flags_opened = 0
+
+        layer = [start]
+        depth = lookups = 0
+        while layer:
+            depth += 1
+            next_layer = []
+            for index in layer:
+                # only blocks without mines around spread to their neighbours
+                if counts[index]:
+                    continue
+                around = offsets[edges[index]]
+                lookups += len(around)
+                for offset in around:
+                    around_index = index + offset
+                    if opened_flags[around_index]:
+                        continue
+                    opened_flags[around_index] = 1
+                    if status[around_index] == flagged:
+                        flags_opened += 1
+                    status[around_index] = opened
+                    newly_opened.append(around_index)
+                    next_layer.append(around_index)
+            layer = next_layer
+
+        self._dirty.update(newly_opened)
+        self.opened_count += len(newly_opened)
+        self.flag_count -= flags_opened
+        self.hooks.flood(newly_opened, depth, lookups)
+        for listener in self.open_listeners:
+            listener(newly_opened)
+        return newly_opened
+
     def double_mouse_button_down(self, x, y):
-        if self._block[y][x].around_mine_count == 0:
+        index = y * self.width + x
+        if self._counts[index] == 0:
             return True
 
-        self._block[y][x].status = MineStatus.BOTH_BUTTON_CLICKING
+        self._write_status(index, MineStatus.BOTH_BUTTON_CLICKING.value)
 
-        around = _get_around(x, y, self.width, self.height)
+        around = self.around(index)
+        self.hooks.count("neighbour_lookups", len(around))
 
         sumflag = 0  # around mine count of marked
-        for i, j in around:
-            if self._block[j][i].status == MineStatus.FLAGGED:
+        for around_index in around:
+            if self._status[around_index] == MineStatus.FLAGGED.value:
                 sumflag += 1
 
         # all mines around are marked
         result = True
-        if sumflag == self._block[y][x].around_mine_count:
-            for i, j in around:
-                if self._block[j][i].status == MineStatus.INITIAL:
-                    if not self.open_mine(i, j):
+        if sumflag == self._counts[index]:
+            for around_index in around:
+                if self._status[around_index] == MineStatus.INITIAL.value:
+                    if not self._open(around_index):
                         result = False
         else:
-            for i, j in around:
-                if self._block[j][i].status == MineStatus.INITIAL:
-                    self._block[j][i].status = MineStatus.HINTING
+            for around_index in around:
+                if self._status[around_index] == MineStatus.INITIAL.value:
+                    self._write_status(around_index, MineStatus.HINTING.value)
         return result
 
     def double_mouse_button_up(self, x, y):
-        self._block[y][x].status = MineStatus.OPENED
-        around = _get_around(x, y, self.width, self.height)
-        for i, j in around:
-            if self._block[j][i].status == MineStatus.HINTING:
-                self._block[j][i].status = MineStatus.INITIAL
+        index = y * self.width + x
+        self._write_status(index, MineStatus.OPENED.value)
+        for around_index in self.around(index):
+            if self._status[around_index] == MineStatus.HINTING.value:
+                self._write_status(around_index, MineStatus.INITIAL.value)
+
+
+def _count_around(mines, width, height, mine_indices=None):
+    """return a bytearray with the number of mines around every block
+
+    Sums the 3x3 neighbourhood of the whole board at once, with numpy when it
+    is installed and with shifted row sums otherwise. Sparse boards whose
+    mine_indices are given are counted mine by mine instead.
+    """
+    if mine_indices is not None and len(mine_indices) * 16 < width * height:
+        counts = bytearray(width * height)
+        offsets, edges = _around_offsets(width), _edge_kinds(width, height)
+        for index in mine_indices:
+            for offset in offsets[edges[index]]:
+                counts[index + offset] += 1
+        return counts
+
+    if np is not None:
+        grid = np.zeros((height + 2, width + 2), dtype=np.uint8)
+        grid[1:-1, 1:-1] = np.frombuffer(mines, dtype=np.uint8).reshape(height, width)
+        counts = sum(
+            grid[1 + dy : height + 1 + dy, 1 + dx : width + 1 + dx]
+            for dy in (-1, 0, 1)
+            for dx in (-1, 0, 1)
+            if dx or dy
+        )
+        return bytearray(counts.astype(np.uint8).tobytes())
+
+    # horizontal sums of each row, mine itself included
+    zero = bytes(1)
+    sums = []
+    for start in range(0, width * height, width):
+        row = mines[start : start + width]
+        sums.append(
+            list(map(add, map(add, row, zero + row[:-1]), row[1:] + zero))
+        )
+    # add the rows above and below, then take the mine itself away again
+    blank = [0] * width
+    counts = bytearray()
+    for j in range(height):
+        above = sums[j - 1] if j > 0 else blank
+        below = sums[j + 1] if j + 1 < height else blank
+        row = mines[j * width : (j + 1) * width]
+        counts += bytes(map(sub, map(add, map(add, above, sums[j]), below), row))
+    return counts
+
+
+# edge kind of a block: bit 0 left, bit 1 right, bit 2 top, bit 3 bottom edge
+LEFT, RIGHT, TOP, BOTTOM = 1, 2, 4, 8
+
+# (dx, dy) around a block for every edge kind, in _get_around order
+_AROUND_DELTAS = tuple(
+    tuple(
+        (dx, dy)
+        for dx in (-1, 0, 1)
+        for dy in (-1, 0, 1)
+        if (dx or dy)
+        and not (dx < 0 and kind & LEFT or dx > 0 and kind & RIGHT)
+        and not (dy < 0 and kind & TOP or dy > 0 and kind & BOTTOM)
+    )
+    for kind in range(16)
+)
+
+
+@lru_cache(maxsize=None)
+def _around_offsets(width):
+    """return the flat index offsets around a block for every edge kind"""
+    return tuple(
+        tuple(dy * width + dx for dx, dy in deltas) for deltas in _AROUND_DELTAS
+    )
+
+
+@lru_cache(maxsize=4)
+def _edge_kinds(width, height):
+    """return the edge kind of every block of a width x height board"""
+    if width == 1:
+        row = bytes([LEFT | RIGHT])
+    else:
+        row = bytes([LEFT]) + bytes(width - 2) + bytes([RIGHT])
+    top = bytes(kind | TOP for kind in row)
+    bottom = bytes(kind | BOTTOM for kind in row)
+    if height == 1:
+        return bytes(kind | BOTTOM for kind in top)
+    return top + row * (height - 2) + bottom
 
 
 def _get_around(x, y, width=30, height=16):
     """return all coordinates around (x, y)"""
-    # note: range end is open interval, so add 1
     if x < 0 or y < 0 or x >= width or y >= height:
         return []
 
-    return [
-        (i, j)
-        for i in range(max(0, x - 1), min(width - 1, x + 1) + 1)
-        for j in range(max(0, y - 1), min(height - 1, y + 1) + 1)
-        if i != x or j != y
-    ]
+    kind = (
+        (x == 0) * LEFT
+        | (x == width - 1) * RIGHT
+        | (y == 0) * TOP
+        | (y == height - 1) * BOTTOM
+    )
+    return [(x + dx, y + dy) for dx, dy in _AROUND_DELTAS[kind]]
@@ -0,0 +1,220 @@
+import random
+import unittest
+from unittest import mock
+
+import mine_field
+from mine_field import Mine, MineField, MineStatus, _count_around, _get_around
+
+
+def make_field(width, height, mines, field_class=MineField):
+    """Build a field with mines exactly at the given (x, y) coordinates"""
+    field = field_class(width, height, 0)
+    for x, y in mines:
+        field.get_mine(x, y).value = 1
+    return field
+
+
+class MineFieldTest(unittest.TestCase):
+    """Behaviour of a MineField engine, run again for every other engine"""
+
+    field_class = MineField
+
+    def make_field(self, width, height, mines):
+        return make_field(width, height, mines, self.field_class)
+
+    def test_mine_count(self):
+        """The requested number of mines is placed"""
+        field = self.field_class(30, 16, 99, first_click_safe=False)
+        self.assertEqual(sum(mine.value for row in field.block for mine in row), 99)
+
+    def test_first_click_safe(self):
+        """Mines are placed on the first reveal, away from the revealed block"""
+        for seed in range(20):
+            field = self.field_class(9, 9, 10, seed=seed)
+            self.assertEqual(field.mine_indices, ())
+            self.assertTrue(field.open_mine(4, 0))
+            self.assertEqual(len(field.mine_indices), 10)
+            self.assertEqual(field.get_mine(4, 0).around_mine_count, 0)
+            same = self.field_class(9, 9, 10, seed=seed)
+            same.open_mine(4, 0)
+            self.assertEqual(field.mine_indices, same.mine_indices)
+
+    def test_first_click_safe_crowded(self):
+        """A board too full to keep the neighbours free still spares the block"""
+        field = self.field_class(3, 3, 8, seed=1)
+        self.assertTrue(field.open_mine(1, 1))
+        self.assertEqual(field.get_mine(1, 1).around_mine_count, 8)
+
+    def test_mine_is_view(self):
+        """Mine objects are views: writes through one are seen by another"""
+        field = self.make_field(3, 3, [])
+        field.get_mine(1, 2).value = 1
+        self.assertEqual(field.get_mine(1, 2).value, 1)
+        self.assertEqual((field.get_mine(1, 2).x, field.get_mine(1, 2).y), (1, 2))
+        self.assertFalse(hasattr(Mine(field, 0, 0), "__dict__"))
+
+    def test_open_mine_boom(self):
+        """Opening a mine reports failure and marks it as boomed"""
+        field = self.make_field(3, 3, [(1, 1)])
+        self.assertFalse(field.open_mine(1, 1))
+        self.assertEqual(field.get_mine(1, 1).status, MineStatus.BOOMED)
+
+    def test_open_mine_number(self):
+        """Opening a block next to a mine opens only that block"""
+        field = self.make_field(3, 3, [(2, 2)])
+        self.assertTrue(field.open_mine(1, 1))
+        self.assertEqual(field.get_mine(1, 1).status, MineStatus.OPENED)
+        self.assertEqual(field.get_mine(1, 1).around_mine_count, 1)
+        self.assertEqual(field.get_mine(0, 0).status, MineStatus.INITIAL)
+
+    def test_open_mine_area(self):
+        """Opening a block without mines around opens the whole area"""
+        field = self.make_field(4, 4, [(3, 3)])
+        self.assertTrue(field.open_mine(0, 0))
+        for row in field.block:
+            for mine in row:
+                expected = MineStatus.INITIAL if mine.value else MineStatus.OPENED
+                self.assertEqual(mine.status, expected)
+        self.assertEqual(field.get_mine(2, 2).around_mine_count, 1)
+
+    def test_flood_fill_returns_opened(self):
+        """flood_fill reports every newly opened block exactly once"""
+        field = self.make_field(4, 4, [(3, 3)])
+        opened = field.flood_fill(0, 0)
+        self.assertEqual(len(opened), len(set(opened)))
+        self.assertEqual(sorted(opened), [i for i in range(16) if i != 15])
+        self.assertEqual(field.flood_fill(0, 0), [])
+
+    def test_open_mine_large_area(self):
+        """A board larger than the recursion limit opens without RecursionError"""
+        field = self.make_field(150, 150, [(149, 149)])
+        self.assertTrue(field.open_mine(0, 0))
+        self.assertEqual(field.get_mine(148, 149).status, MineStatus.OPENED)
+        self.assertEqual(field.get_mine(149, 149).status, MineStatus.INITIAL)
+
+    def test_counts_precomputed(self):
+        """Around counts are known for every block before anything is opened"""
+        field = self.field_class(30, 16, 99, first_click_safe=False)
+        for y in range(16):
+            for x in range(30):
+                expected = sum(field.get_mine(i, j).value for i, j in _get_around(x, y))
+                self.assertEqual(field.counts[y * 30 + x], expected)
+        self.assertEqual(field.get_mine(0, 0).status, MineStatus.INITIAL)
+
+    def test_statuses_and_hidden_indices(self):
+        field = self.make_field(3, 3, [(0, 0)])
+        field.toggle_status(1, 0)
+        field.open_mine(1, 1)
+        self.assertEqual(field.statuses[1], MineStatus.FLAGGED.value)
+        self.assertEqual(field.hidden_indices(), [0, 2, 3, 5, 6, 7, 8])
+        with self.assertRaises(TypeError):
+            field.statuses[0] = MineStatus.OPENED.value
+
+    def test_opened_mines_and_around(self):
+        field = self.make_field(3, 3, [(0, 0)])
+        field.open_mine(2, 2)
+        self.assertEqual(list(field.mines), [1, 0, 0, 0, 0, 0, 0, 0, 0])
+        self.assertEqual(list(field.opened), [0, 1, 1, 1, 1, 1, 1, 1, 1])
+        self.assertEqual(sorted(field.around(0)), [1, 3, 4])
+        with self.assertRaises(TypeError):
+            field.opened[0] = 1
+
+    def test_count_around_without_numpy(self):
+        """The pure Python shifted sums agree with the numpy path"""
+        for width, height in ((1, 1), (1, 5), (7, 1), (13, 9)):
+            mines = bytearray(random.randint(0, 1) for _ in range(width * height))
+            with mock.patch.object(mine_field, "np", None):
+                expected = _count_around(mines, width, height)
+            self.assertEqual(_count_around(mines, width, height), expected)
+            for index, count in enumerate(expected):
+                x, y = index % width, index // width
+                around = _get_around(x, y, width, height)
+                self.assertEqual(count, sum(mines[j * width + i] for i, j in around))
+
+    def test_set_mine_updates_counts(self):
+        """Moving a mine keeps the around counts consistent"""
+        field = self.make_field(3, 3, [(0, 0)])
+        field.set_mine(0, 0, 0)
+        field.set_mine(2, 2, 1)
+        self.assertEqual(field.counts[0], 0)
+        self.assertEqual(field.counts[4], 1)
+        self.assertEqual(field.counts[8], 0)
+
+    def test_running_counts(self):
+        """opened_count and flag_count match the statuses after random play"""
+        random.seed(7)
+        field = self.field_class(16, 16, 30)
+        for _ in range(300):
+            x, y = random.randrange(16), random.randrange(16)
+            mine = field.get_mine(x, y)
+            if random.random() < 0.4:
+                mine.toggle_status()
+            elif mine.status == MineStatus.OPENED:
+                field.double_mouse_button_down(x, y)
+                field.double_mouse_button_up(x, y)
+            elif not mine.value:
+                field.open_mine(x, y)
+        statuses = [mine.status for row in field.block for mine in row]
+        self.assertEqual(field.flag_count, statuses.count(MineStatus.FLAGGED))
+        self.assertEqual(field.opened_count, statuses.count(MineStatus.OPENED))
+        self.assertEqual(field.safe_remaining, 256 - 30 - field.opened_count)
+
+    def test_win_and_loss(self):
+        """is_win once every safe block is open, is_lost after a boom"""
+        field = self.make_field(3, 3, [(0, 0)])
+        self.assertFalse(field.is_win())
+        for x, y in [(1, 0), (0, 1), (1, 1)]:
+            field.open_mine(x, y)
+        self.assertFalse(field.is_win())
+        field.open_mine(2, 2)
+        self.assertTrue(field.is_win())
+        field.flag_all_mines()
+        self.assertEqual(field.get_mine(0, 0).status, MineStatus.FLAGGED)
+        self.assertEqual(field.flag_count, 1)
+        self.assertFalse(field.is_lost())
+        field.open_mine(0, 0)
+        self.assertTrue(field.is_lost())
+
+    def test_toggle_status(self):
+        """Right click cycles INITIAL -> FLAGGED -> QUESTION_MARK -> INITIAL"""
+        field = self.make_field(2, 2, [])
+        mine = field.get_mine(0, 0)
+        statuses = []
+        for _ in range(3):
+            mine.toggle_status()
+            statuses.append(mine.status)
+        self.assertEqual(
+            statuses,
+            [MineStatus.FLAGGED, MineStatus.QUESTION_MARK, MineStatus.INITIAL],
+        )
+
+    def test_double_click_opens_around(self):
+        """Both buttons on a satisfied number open the remaining blocks"""
+        field = self.make_field(3, 3, [(0, 0)])
+        field.open_mine(1, 1)
+        field.get_mine(0, 0).toggle_status()
+        self.assertTrue(field.double_mouse_button_down(1, 1))
+        field.double_mouse_button_up(1, 1)
+        self.assertEqual(field.get_mine(2, 2).status, MineStatus.OPENED)
+        self.assertEqual(field.get_mine(1, 1).status, MineStatus.OPENED)
+
+    def test_double_click_hints(self):
+        """Both buttons on an unsatisfied number only hint the blocks around"""
+        field = self.make_field(3, 3, [(0, 0)])
+        field.open_mine(1, 1)
+        self.assertTrue(field.double_mouse_button_down(1, 1))
+        self.assertEqual(field.get_mine(2, 2).status, MineStatus.HINTING)
+        field.double_mouse_button_up(1, 1)
+        self.assertEqual(field.get_mine(2, 2).status, MineStatus.INITIAL)
+
+    def test_double_click_wrong_flag(self):
+        """Both buttons with a wrongly placed flag hit the mine"""
+        field = self.make_field(3, 3, [(0, 0)])
+        field.open_mine(1, 1)
+        field.get_mine(2, 2).toggle_status()
+        self.assertFalse(field.double_mouse_button_down(1, 1))
+        self.assertEqual(field.get_mine(0, 0).status, MineStatus.BOOMED)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,8 @@
 import random
 from enum import Enum
 
+from mine_field import _get_around as _field_get_around
+
 BLOCK_WIDTH = 30
 BLOCK_HEIGHT = 16
 SIZE = 20           # block size
@@ -165,6 +167,4 @@ class MineBlock:
 
 def _get_around(x, y):
     """return all coordinates around (x, y)"""
-    # note: range end is open interval, so add 1
-    return [(i, j) for i in range(max(0, x - 1), min(BLOCK_WIDTH - 1, x + 1) + 1)
-            for j in range(max(0, y - 1), min(BLOCK_HEIGHT - 1, y + 1) + 1) if i != x or j != y]
+    return _field_get_around(x, y, BLOCK_WIDTH, BLOCK_HEIGHT)
@@ -0,0 +1,124 @@
+"""Boards that can be cleared from their start block without guessing.
+
+A candidate board is opened at its start block and played by the Solver,
+opening every block it proves safe. When the solver stalls, the layout is
+repaired locally instead of thrown away: the mines around one stalled number
+of a frontier component are moved to or from unknown blocks away from the
+opened area so that the number decides its blocks. The same solver reads the
+changed numbers again and carries on from there. Because a repair can
+invalidate what was deduced from the old numbers, a finished board is
+replayed once from the start on its final layout; only boards passing that
+replay are returned.
+
+By default the generator's solver uses the single point and subset rules
+only (max_enumerate=0): such boards need no enumeration from the player
+either, and generating them is about twice as fast. An expert board still
+takes around 10 ms, so games get them from a board_pool.BoardPool filled by
+a background process pool.
+"""
+import random
+
+from mine_field import MineField
+from solver import MAX_ENUMERATE, Solver
+
+MAX_REPAIRS = 200
+
+
+def generate_no_guess(
+    width=30, height=16, mine_count=99, start=None, seed=None, max_enumerate=0
+):
+    """return an unopened MineField solvable from field.start without guessing
+
+    max_enumerate is the largest frontier component the solver may enumerate.
+    """
+    rng = random.Random(seed)
+    if start is None:
+        start = (width // 2, height // 2)
+
+    while True:
+        field = MineField(width, height, mine_count, seed=rng.getrandbits(64))
+        field.open_mine(*start)
+        solver = Solver(field, max_enumerate)
+        for _ in range(MAX_REPAIRS):
+            if not _solve(field, solver):
+                if not _repair(field, solver, rng):
+                    break
+                continue
+            # replay from the start on the final layout
+            board = MineField.from_mines(width, height, field.mine_indices)
+            board.open_mine(*start)
+            solver = Solver(board, max_enumerate)
+            if _solve(board, solver):
+                result = MineField.from_mines(width, height, field.mine_indices)
+                result.start = start
+                return result
+            field = board  # continue repairing where the replay stalled
+        # too many repairs, or nothing left to repair: start over
+
+
+def is_no_guess(field, start, max_enumerate=MAX_ENUMERATE):
+    """check that a fresh copy of the layout is solvable from start"""
+    board = MineField.from_mines(field.width, field.height, field.mine_indices)
+    return board.open_mine(*start) and _solve(board, Solver(board, max_enumerate))
+
+
+def _solve(field, solver):
+    """open every block the solver can prove safe, True if the board is cleared
+
+    The solver follows the opened blocks through the field's open_listeners.
+    """
+    width = field.width
+    while not field.is_win():
+        safe, _ = solver.solve()
+        if not safe:
+            return False
+        for index in safe:
+            field.flood_fill(index % width, index // width)
+    return True
+
+
+def _repair(field, solver, rng):
+    """change the mines of one stalled constraint so that it decides itself
+
+    Only the constraints of one stalled frontier component are considered.
+    Their undecided blocks are either cleared, their mines moved to unknown
+    blocks away from the opened area, or filled with mines taken from there,
+    whichever moves fewer mines. The numbers around the changed blocks are
+    read again by the solver, after which the single point rule applies.
+    Return False if no constraint can be repaired.
+    """
+    _, constraints = next(solver.components(), (None, None))
+    if constraints is None:
+        return False
+
+    # blocks next to an opened number are in a constraint or a known mine
+    opened, layout = field.opened, field.mines
+    touching = solver.mines.union(solver.frontier_blocks())
+    inside = [
+        i
+        for i in range(field.width * field.height)
+        if not opened[i] and i not in touching
+    ]
+    free = [i for i in inside if not layout[i]]
+    mined = [i for i in inside if layout[i]]
+
+    options = []  # (mines to move, blocks to clear, blocks to fill)
+    for blocks, _ in constraints:
+        mines = sorted(i for i in blocks if layout[i])
+        blanks = sorted(i for i in blocks if not layout[i])
+        if len(mines) <= len(free):
+            options.append((len(mines), mines, []))
+        if len(blanks) <= len(mined):
+            options.append((len(blanks), [], blanks))
+    if not options:
+        return False
+
+    fewest = min(moves for moves, _, _ in options)
+    moves, clear, fill = rng.choice([o for o in options if o[0] == fewest])
+    sources = clear or rng.sample(mined, moves)
+    targets = fill or rng.sample(free, moves)
+    for source, target in zip(sources, targets):
+        field.set_mine(source % field.width, source // field.width, 0)
+        field.set_mine(target % field.width, target // field.width, 1)
+    solver.recount(clear or fill)
+    return True
@@ -0,0 +1,29 @@
+import unittest
+
+from no_guess import generate_no_guess, is_no_guess
+
+
+class NoGuessTest(unittest.TestCase):
+    def test_solvable(self):
+        """Generated boards are cleared from their start block by the solver"""
+        for seed in range(10):
+            field = generate_no_guess(16, 16, 40, seed=seed)
+            self.assertEqual(len(field.mine_indices), 40)
+            self.assertEqual(field.opened_count, 0)
+            self.assertTrue(is_no_guess(field, field.start))
+
+    def test_expert(self):
+        """Expert boards are generated too, starting from the given block"""
+        field = generate_no_guess(30, 16, 99, start=(0, 0), seed=1)
+        self.assertEqual(field.start, (0, 0))
+        self.assertTrue(is_no_guess(field, (0, 0)))
+
+    def test_seeded(self):
+        """The same seed generates the same board"""
+        first = generate_no_guess(9, 9, 10, seed=5)
+        second = generate_no_guess(9, 9, 10, seed=5)
+        self.assertEqual(first.mine_indices, second.mine_indices)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,222 @@
+"""Exact mine probabilities for the undecided blocks of a MineField.
+
+When the Solver can not decide anything, every layout of the remaining mines
+that agrees with the opened numbers is equally likely. A layout is a choice
+of mines on each frontier component plus the rest of the mines anywhere in
+the unknown blocks off the frontier, so the number of layouts with k mines
+on the frontier is weighted by comb(outside blocks, mines left - k).
+
+Components are independent, so each is counted on its own with a forward /
+backward dynamic program over its blocks. The state between two blocks is
+the number of mines still needed by the constraints that have blocks on both
+sides, which stays small along a frontier, so components of 40 and more
+blocks are counted without walking their layouts one by one. Counts are kept
+per mine total as exact big integers and cached by component signature.
+"""
+from collections import OrderedDict
+from fractions import Fraction
+from math import comb
+
+from game_session import REVEAL, Action
+from solver import Solver
+
+CACHE_SIZE = 4096
+
+
+class ProbabilityEngine:
+    def __init__(self, field, solver=None, cache_size=CACHE_SIZE):
+        self.field = field
+        self.solver = solver or Solver(field)
+        self.cache_size = cache_size
+        self._cache = OrderedDict()  # component signature -> count_component result
+
+    def probabilities(self):
+        """return ({block: P(mine)}, P(mine) of an unknown block off the frontier)
+
+        The dict holds the frontier blocks and the blocks the solver decided
+        but that are not opened yet (0.0 when safe, 1.0 when a mine).
+        """
+        field = self.field
+        safe, mines = self.solver.solve()
+        components = [
+            self._count(cells, constraints)
+            for cells, constraints in self.solver.components()
+        ]
+
+        frontier = sum(len(cells) for cells, _, _ in components)
+        unknown = field.width * field.height - field.opened_count - len(safe) - len(mines)
+        outside = unknown - frontier
+        left = field.mine_count - len(mines)
+
+        def weight(k):
+            # layouts of the other mines off the frontier, for k on it
+            return comb(outside, left - k) if 0 <= left - k <= outside else 0
+
+        # products of the component counts before and after each component
+        polys = [totals for _, totals, _ in components]
+        prefix = [{0: 1}]
+        for poly in polys:
+            prefix.append(_multiply(prefix[-1], poly))
+        suffix = [{0: 1}]
+        for poly in reversed(polys):
+            suffix.append(_multiply(suffix[-1], poly))
+        suffix.reverse()
+
+        everything = prefix[-1]
+        total = sum(count * weight(k) for k, count in everything.items())
+        if not total:
+            raise ValueError("The opened numbers admit no layout of the mines")
+
+        result = {index: 0.0 for index in safe}
+        result.update((index, 1.0) for index in mines)
+        for c, (cells, _, tallies) in enumerate(components):
+            others = _multiply(prefix[c], suffix[c + 1])
+            for cell, tally in zip(cells, tallies):
+                hits = _multiply(tally, others)
+                result[cell] = float(
+                    Fraction(sum(n * weight(k) for k, n in hits.items()), total)
+                )
+
+        outside_probability = 0.0
+        if outside:
+            # each layout puts left - k mines on the outside blocks
+            hits = sum(count * weight(k) * (left - k) for k, count in everything.items())
+            outside_probability = float(Fraction(hits, total * outside))
+        return result, outside_probability
+
+    def _count(self, cells, constraints):
+        """(cells, totals, tallies) of a component, through the cache"""
+        position = {cell: i for i, cell in enumerate(cells)}
+        signature = (
+            len(cells),
+            tuple(
+                sorted(
+                    (tuple(sorted(position[cell] for cell in blocks)), left)
+                    for blocks, left in constraints
+                )
+            ),
+        )
+        result = self._cache.get(signature)
+        if result is None:
+            positions = [
+                (sorted(position[cell] for cell in blocks), left)
+                for blocks, left in constraints
+            ]
+            result = self._cache[signature] = count_component(len(cells), positions)
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        else:
+            self._cache.move_to_end(signature)
+        totals, tallies = result
+        return cells, totals, tallies
+
+
+def count_component(size, constraints):
+    """count the layouts of a component of blocks 0 .. size - 1
+
+    constraints is a list of (block positions, mines). Return (totals,
+    tallies): totals maps a mine total k to the number of layouts with k
+    mines, tallies[i] the same restricted to layouts with a mine on block i.
+    """
+    first = [min(blocks) for blocks, _ in constraints]
+    last = [max(blocks) for blocks, _ in constraints]
+    cell_constraints = [[] for _ in range(size)]
+    for c, (blocks, _) in enumerate(constraints):
+        for i in blocks:
+            cell_constraints[i].append(c)
+    # blocks of a constraint after position i
+    after = [
+        {c: sum(1 for j in constraints[c][0] if j > i) for c in cell_constraints[i]}
+        for i in range(size)
+    ]
+    # constraints with blocks on both sides of the cut before block i
+    open_at = [
+        [c for c in range(len(constraints)) if first[c] < i <= last[c]]
+        for i in range(size + 1)
+    ]
+
+    def transitions(i, state):
+        """yield (value, next state) for block i assigned 0 or 1"""
+        for value in (0, 1):
+            need = dict(zip(open_at[i], state))
+            for c in cell_constraints[i]:
+                left = need.get(c, constraints[c][1]) - value
+                if left < 0 or left > after[i][c]:
+                    break
+                need[c] = left
+            else:
+                yield value, tuple(need[c] for c in open_at[i + 1])
+
+    # forward: layouts of blocks before i per state and mine total
+    forward = [{(): {0: 1}}]
+    for i in range(size):
+        layer = {}
+        for state, poly in forward[i].items():
+            for value, next_state in transitions(i, state):
+                _add_into(layer.setdefault(next_state, {}), poly, value)
+        forward.append(layer)
+
+    # backward: layouts of blocks from i on per state and mine total
+    backward = [None] * size + [{(): {0: 1}}]
+    for i in range(size - 1, -1, -1):
+        layer = {}
+        for state in forward[i]:
+            poly = {}
+            for value, next_state in transitions(i, state):
+                rest = backward[i + 1].get(next_state)
+                if rest:
+                    _add_into(poly, rest, value)
+            if poly:
+                layer[state] = poly
+        backward[i] = layer
+
+    totals = dict(backward[0].get((), {}))
+    tallies = []
+    for i in range(size):
+        tally = {}
+        for state, poly in forward[i].items():
+            for value, next_state in transitions(i, state):
+                rest = backward[i + 1].get(next_state)
+                if value and rest:
+                    for k, n in _multiply(poly, rest).items():
+                        tally[k + 1] = tally.get(k + 1, 0) + n
+        tallies.append(tally)
+    return totals, tallies
+
+
+def _add_into(target, poly, shift):
+    for k, n in poly.items():
+        target[k + shift] = target.get(k + shift, 0) + n
+
+
+def _multiply(a, b):
+    """product of two polynomials stored as {power: coefficient}"""
+    result = {}
+    for i, x in a.items():
+        for j, y in b.items():
+            result[i + j] = result.get(i + j, 0) + x * y
+    return result
+
+
+def probability_strategy(session, rng):
+    """reveal a safe block, otherwise the block least likely to be a mine"""
+    engine = getattr(session, "probability", None)
+    if engine is None:
+        engine = session.probability = ProbabilityEngine(session.field)
+    field = session.field
+    safe, _ = engine.solver.solve()
+    if safe:
+        index = min(safe)
+        return Action(REVEAL, index % field.width, index // field.width)
+
+    probabilities, outside = engine.probabilities()
+    best = min(probabilities.items(), key=lambda item: (item[1], item[0]), default=None)
+    if best is None or outside < best[1]:
+        candidates = [
+            index for index in field.hidden_indices() if index not in probabilities
+        ]
+        if candidates:
+            index = rng.choice(candidates)
+            return Action(REVEAL, index % field.width, index // field.width, True)
+    index = best[0]
+    return Action(REVEAL, index % field.width, index // field.width, True)
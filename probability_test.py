@@ -0,0 +1,79 @@
+import random
+import unittest
+from itertools import combinations
+
+from batch_runner import run_batch
+from mine_field import MineField
+from probability import ProbabilityEngine, count_component, probability_strategy
+from solver import enumerate_component
+
+
+def brute_force(field):
+    """P(mine) of every unopened block over all layouts matching the numbers"""
+    size = field.width * field.height
+    unopened = [i for i in range(size) if not field._opened[i]]
+    opened = [i for i in range(size) if field._opened[i]]
+    hits = dict.fromkeys(unopened, 0)
+    total = 0
+    for layout in combinations(unopened, field.mine_count):
+        mines = set(layout)
+        if all(
+            sum(n in mines for n in field.around(i)) == field._counts[i] for i in opened
+        ):
+            total += 1
+            for i in layout:
+                hits[i] += 1
+    return {i: hits[i] / total for i in unopened}
+
+
+class ProbabilityTest(unittest.TestCase):
+    def test_count_component_matches_enumeration(self):
+        """The dynamic program counts the same layouts as backtracking"""
+        rng = random.Random(1)
+        for _ in range(30):
+            size = rng.randint(1, 12)
+            constraints = []
+            for _ in range(rng.randint(1, 6)):
+                blocks = rng.sample(range(size), rng.randint(1, min(4, size)))
+                constraints.append((blocks, rng.randint(0, len(blocks))))
+            cells = list(range(size))
+            expected = enumerate_component(cells, [(set(b), n) for b, n in constraints])
+            totals, tallies = count_component(size, constraints)
+            self.assertEqual(totals, {k: n for k, (n, _) in expected.items()})
+            for i in range(size):
+                per_total = {k: t[i] for k, (_, t) in expected.items() if t[i]}
+                self.assertEqual(tallies[i], per_total)
+
+    def test_matches_brute_force(self):
+        """Probabilities equal the share of all consistent layouts"""
+        for seed in range(15):
+            field = MineField(5, 4, 5, seed=seed)
+            field.open_mine(0, 0)
+            if field.is_win():
+                continue
+            probabilities, outside = ProbabilityEngine(field).probabilities()
+            for index, expected in brute_force(field).items():
+                got = probabilities.get(index, outside)
+                self.assertAlmostEqual(got, expected, places=9, msg=(seed, index))
+
+    def test_long_frontier(self):
+        """A frontier of well over 40 blocks is counted without enumeration"""
+        # one long row of 1s: opened row 0, mines every third block in row 1
+        width = 60
+        field = MineField(width, 3, 0)
+        for x in range(0, width, 3):
+            field.set_mine(x, 1, 1)
+        for x in range(width):
+            field.open_mine(x, 0)
+        probabilities, _ = ProbabilityEngine(field).probabilities()
+        self.assertGreaterEqual(len(probabilities), 40)
+        self.assertTrue(all(0.0 <= p <= 1.0 for p in probabilities.values()))
+
+    def test_strategy_plays(self):
+        """The probability strategy finishes expert games"""
+        result = run_batch(5, probability_strategy, seed=4)
+        self.assertEqual(result.games, 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
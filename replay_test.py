@@ -0,0 +1,101 @@
+import os
+import random
+import tempfile
+import unittest
+from unittest import mock
+
+import bitpack
+from batch_runner import play_game, random_strategy, run_batch
+from replay import ReplayFile, ReplayWriter
+from solver import solver_strategy
+
+
+class BitpackTest(unittest.TestCase):
+    def test_round_trip(self):
+        """Packing and unpacking agree with and without numpy"""
+        rng = random.Random(3)
+        for count in (0, 1, 7, 8, 9, 480, 1001):
+            flags = bytearray(rng.getrandbits(1) for _ in range(count))
+            packed = bitpack.pack_bits(flags)
+            self.assertEqual(len(packed), (count + 7) // 8)
+            with mock.patch.object(bitpack, "np", None):
+                self.assertEqual(bitpack.pack_bits(flags), packed)
+                self.assertEqual(bitpack.unpack_bits(packed, count), flags)
+            self.assertEqual(bitpack.unpack_bits(packed, count), flags)
+
+    def test_varint(self):
+        out = bytearray()
+        values = [0, 1, 127, 128, 300, 2**35 + 5]
+        for value in values:
+            bitpack.write_varint(out, value)
+        pos = 0
+        for value in values:
+            got, pos = bitpack.read_varint(out, pos)
+            self.assertEqual(got, value)
+        self.assertEqual(pos, len(out))
+
+
+class ReplayTest(unittest.TestCase):
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix=".msr")
+        os.close(handle)
+        self.addCleanup(os.remove, self.path)
+
+    def test_final_state(self):
+        """Replaying a recorded game ends on the same board as the game"""
+        sessions = [
+            play_game(solver_strategy, 16, 16, 40, seed, record=True) for seed in range(5)
+        ]
+        with ReplayWriter(self.path) as writer:
+            for session in sessions:
+                writer.write(session.recorder)
+        with ReplayFile(self.path) as replays:
+            self.assertEqual(len(replays), 5)
+            for game, session in enumerate(sessions):
+                field = replays[game].field_at()
+                self.assertEqual(bytes(field._status), bytes(session.field._status))
+                self.assertEqual(
+                    sorted(field.mine_indices), sorted(session.field.mine_indices)
+                )
+
+    def test_bitmap_layout(self):
+        """Boards whose layout does not follow from a seed store their mines"""
+        session = play_game(solver_strategy, 9, 9, 10, 4, record=True)
+        session.field.set_mine(0, 0, not session.field.get_mine(0, 0).value)
+        with ReplayWriter(self.path) as writer:
+            writer.write(session.recorder)
+        with ReplayFile(self.path) as replays:
+            self.assertIsNone(replays[0].seed)
+            self.assertEqual(
+                sorted(replays[0].mine_indices), sorted(session.field.mine_indices)
+            )
+
+    def test_intermediate_states(self):
+        """field_at(step) matches the states walked through one by one"""
+        session = play_game(solver_strategy, 16, 16, 40, 2, record=True)
+        with ReplayWriter(self.path) as writer:
+            writer.write(session.recorder)
+        with ReplayFile(self.path) as replays:
+            replay = replays[0]
+            for step, (_, field) in enumerate(replay.states(), 1):
+                self.assertEqual(
+                    bytes(replay.field_at(step)._status), bytes(field._status)
+                )
+
+    def test_compact(self):
+        """A seeded expert game of the random strategy takes about 30 bytes"""
+        with ReplayWriter(self.path) as writer:
+            run_batch(200, random_strategy, writer=writer)
+        self.assertLess(os.path.getsize(self.path), 200 * 50)
+
+    def test_not_closed(self):
+        """A file without its index is refused"""
+        writer = ReplayWriter(self.path)
+        writer.write(play_game(random_strategy, 9, 9, 10, 0, record=True).recorder)
+        writer._file.close()
+        with self.assertRaises(ValueError):
+            ReplayFile(self.path)
+
+
+if __name__ == "__main__":
+    unittest.main()
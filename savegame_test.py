@@ -0,0 +1,84 @@
+import os
+import random
+import tempfile
+import unittest
+from unittest import mock
+
+import bitpack
+import savegame
+from game_session import GameStatus
+from mine_field import MineField, MineStatus
+
+
+def played_field(seed):
+    """A 16x16 board with opened areas, flags, question marks and a chord"""
+    rng = random.Random(seed)
+    field = MineField(16, 16, 40, seed=seed)
+    field.open_mine(8, 8)
+    for _ in range(30):
+        field.toggle_status(rng.randrange(16), rng.randrange(16))
+    field.double_mouse_button_down(8, 8)
+    return field
+
+
+class SaveGameTest(unittest.TestCase):
+    def assertSameField(self, loaded, field):
+        self.assertEqual(bytes(loaded._mines), bytes(field._mines))
+        self.assertEqual(bytes(loaded._counts), bytes(field._counts))
+        self.assertEqual(bytes(loaded._status), bytes(field._status))
+        self.assertEqual(bytes(loaded._opened), bytes(field._opened))
+        self.assertEqual(sorted(loaded.mine_indices), sorted(field.mine_indices))
+        self.assertEqual(
+            (loaded.opened_count, loaded.flag_count, loaded.boomed),
+            (field.opened_count, field.flag_count, field.boomed),
+        )
+
+    def test_round_trip(self):
+        """Every block status survives, with and without numpy"""
+        for seed in range(5):
+            field = played_field(seed)
+            data = savegame.dumps(field, GameStatus.STARTED, 42.5)
+            for numpy in (bitpack.np, None):
+                with mock.patch.object(bitpack, "np", numpy):
+                    loaded, status, elapsed = savegame.loads(data)
+                self.assertSameField(loaded, field)
+                self.assertEqual((status, elapsed), (GameStatus.STARTED, 42.5))
+
+    def test_all_statuses(self):
+        """All eight MineStatus values fit the three status planes"""
+        field = MineField(8, 1, 1, first_click_safe=False)
+        for x, status in enumerate(MineStatus):
+            field.set_status(x, 0, status)
+        loaded, _, _ = savegame.loads(savegame.dumps(field))
+        self.assertEqual(
+            [loaded.get_mine(x, 0).status for x in range(8)], list(MineStatus)
+        )
+
+    def test_unplaced(self):
+        """A board saved before its first reveal still places mines later"""
+        loaded, status, _ = savegame.loads(savegame.dumps(MineField(9, 9, 10)))
+        self.assertEqual(status, GameStatus.READY)
+        self.assertTrue(loaded.open_mine(4, 4))
+        self.assertEqual(len(loaded.mine_indices), 10)
+
+    def test_file(self):
+        """Saved files load through a memory map and keep playing"""
+        handle, path = tempfile.mkstemp(suffix=".sav")
+        os.close(handle)
+        self.addCleanup(os.remove, path)
+        field = played_field(7)
+        savegame.save_game(path, field, GameStatus.STARTED, 3.0)
+        loaded, _, _ = savegame.load_game(path)
+        self.assertSameField(loaded, field)
+        loaded.double_mouse_button_up(8, 8)
+        self.assertEqual(loaded.get_mine(8, 8).status, MineStatus.OPENED)
+
+    def test_rejects_other_data(self):
+        with self.assertRaises(ValueError):
+            savegame.loads(b"\0" * 64)
+        with self.assertRaises(ValueError):
+            savegame.loads(savegame.dumps(played_field(1))[:-1])
+
+
+if __name__ == "__main__":
+    unittest.main()
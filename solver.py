@@ -0,0 +1,381 @@
+"""Deduce safe blocks and mines from what a player can see of a MineField.
+
+Only opened blocks and their around counts are used, never the mine layout
+and never the player's flags. Every opened number with undecided blocks
+around it is a constraint "these blocks hold that many mines"; together they
+form the frontier. The Solver applies, in order of cost:
+
+* the single point rule: a constraint with no mines left, or with as many
+  mines left as blocks, decides all its blocks;
+* the subset rule: if the blocks of one constraint are a subset of another's,
+  the difference holds the difference of their mines;
+* exact reasoning over every mine layout of a connected frontier component:
+  blocks that are a mine in all or in none of the layouts are decided. A
+  dynamic program over the blocks finds them without walking the layouts,
+  which search_layouts does with bitmask backtracking where they are needed.
+
+The Solver follows the field through MineField.open_listeners and only looks
+again at the constraints an opened area touched, so keeping up with a game
+costs time proportional to the change, not to the board.
+"""
+from collections import deque
+
+from game_session import REVEAL, Action
+
+MAX_ENUMERATE = 48  # larger frontier components are left to the other rules
+
+
+class Solver:
+    def __init__(self, field, max_enumerate=MAX_ENUMERATE):
+        self.field = field
+        self.max_enumerate = max_enumerate
+        self.safe = set()  # provably safe blocks that are not opened yet
+        self.mines = set()  # provable mines
+
+        # opened index -> [set of undecided blocks around it, mines among them]
+        self._constraints = {}
+        # undecided block -> indices of the constraints it is part of
+        self._cell_constraints = {}
+        self._queue = set()  # constraints to run the simple rules on
+        self._touched = set()  # constraints changed since the last enumeration
+
+        field.open_listeners.append(self.update)
+        self.update([index for index, opened in enumerate(field.opened) if opened])
+
+    def update(self, opened):
+        """take newly opened blocks (flat indices) into account"""
+        cell_constraints, constraints = self._cell_constraints, self._constraints
+        for index in opened:
+            self.safe.discard(index)
+            for constraint in cell_constraints.pop(index, ()):
+                constraints[constraint][0].discard(index)
+                self._changed(constraint)
+        # only now every block opened in this batch counts as opened
+        for index in opened:
+            self._add_constraint(index)
+
+    def recount(self, blocks):
+        """read the numbers around blocks again, after their mines changed
+
+        Deductions already made are kept, they may no longer follow from the
+        new numbers.
+        """
+        field = self.field
+        opened = field.opened
+        numbers = {i for block in blocks for i in field.around(block) if opened[i]}
+        for index in numbers:
+            entry = self._constraints.pop(index, None)
+            for cell in entry[0] if entry else ():
+                constraints = self._cell_constraints[cell]
+                constraints.discard(index)
+                if not constraints:
+                    del self._cell_constraints[cell]
+            self._add_constraint(index)
+
+    def solve(self):
+        """return (safe, mines), all provably safe unopened blocks and mines"""
+        while True:
+            while self._queue:
+                self._apply_rules(self._queue.pop())
+            if not self._touched or not self._enumerate_touched():
+                break
+        return set(self.safe), set(self.mines)
+
+    def frontier(self):
+        """return the current constraints as {opened index: (blocks, mines)}"""
+        return {
+            index: (frozenset(cells), left)
+            for index, (cells, left) in self._constraints.items()
+            if cells
+        }
+
+    def frontier_blocks(self):
+        """the undecided blocks next to an opened number"""
+        return self._cell_constraints.keys()
+
+    def components(self):
+        """yield (blocks, constraints) of every connected frontier component
+
+        Call solve() first so that decided blocks are out of the frontier.
+        constraints is a list of (blocks, mines) over the component blocks.
+        """
+        seen = set()
+        for start, (cells, _) in list(self._constraints.items()):
+            if start in seen or not cells:
+                continue
+            cells, constraint_indices = self._component(start)
+            seen.update(constraint_indices)
+            yield cells, [
+                (frozenset(self._constraints[index][0]), self._constraints[index][1])
+                for index in constraint_indices
+                if self._constraints[index][0]
+            ]
+
+    def _changed(self, constraint):
+        self._queue.add(constraint)
+        if self.max_enumerate:
+            self._touched.add(constraint)
+
+    def _add_constraint(self, index):
+        field = self.field
+        opened = field.opened
+        cells = set()
+        left = field.counts[index]
+        for around_index in field.around(index):
+            if opened[around_index] or around_index in self.safe:
+                continue
+            if around_index in self.mines:
+                left -= 1
+            else:
+                cells.add(around_index)
+        if not cells:
+            return
+        self._constraints[index] = [cells, left]
+        for cell in cells:
+            self._cell_constraints.setdefault(cell, set()).add(index)
+        self._changed(index)
+
+    def _mark(self, cells, mine):
+        """decide blocks as mines or as safe"""
+        for cell in list(cells):
+            (self.mines if mine else self.safe).add(cell)
+            for constraint in self._cell_constraints.pop(cell, ()):
+                entry = self._constraints.get(constraint)
+                if entry is None:  # being resolved by the caller
+                    continue
+                entry[0].discard(cell)
+                if mine:
+                    entry[1] -= 1
+                self._changed(constraint)
+
+    def _apply_rules(self, index):
+        entry = self._constraints.get(index)
+        if entry is None:
+            return
+        cells, left = entry
+        if not cells:
+            del self._constraints[index]
+            return
+
+        # single point rule
+        if left == 0 or left == len(cells):
+            del self._constraints[index]
+            self._mark(cells, mine=left > 0)
+            return
+
+        # subset rule against every constraint sharing a block
+        others = set()
+        for cell in cells:
+            others.update(self._cell_constraints[cell])
+        others.discard(index)
+        for other in others:
+            other_cells, other_left = self._constraints[other]
+            if cells <= other_cells:
+                rest, rest_mines = other_cells - cells, other_left - left
+            elif other_cells <= cells:
+                rest, rest_mines = cells - other_cells, left - other_left
+            else:
+                continue
+            if rest and (rest_mines == 0 or rest_mines == len(rest)):
+                self._mark(rest, mine=rest_mines > 0)
+                self._changed(index)
+                return
+
+    def _enumerate_touched(self):
+        """enumerate the components of touched constraints, True on progress"""
+        touched, self._touched = self._touched, set()
+        progress = False
+        seen = set()
+        for start in touched:
+            if start in seen or start not in self._constraints:
+                continue
+            cells, constraint_indices = self._component(start)
+            seen.update(constraint_indices)
+            if len(cells) > self.max_enumerate:
+                continue
+            safe, mines = decided_blocks(
+                cells, [self._constraints[index] for index in constraint_indices]
+            )
+            if safe or mines:
+                self._mark(safe, mine=False)
+                self._mark(mines, mine=True)
+                progress = True
+        return progress
+
+    def _component(self, start):
+        """return (blocks, constraint indices) connected to a constraint
+
+        Blocks come in breadth first order, which keeps the blocks of a
+        constraint close together and lets enumeration prune early.
+        """
+        cells, cell_seen = [], set()
+        constraint_indices, queue = [start], deque([start])
+        constraint_seen = {start}
+        while queue:
+            index = queue.popleft()
+            for cell in sorted(self._constraints[index][0]):
+                if cell in cell_seen:
+                    continue
+                cell_seen.add(cell)
+                cells.append(cell)
+                for other in self._cell_constraints[cell]:
+                    if other not in constraint_seen:
+                        constraint_seen.add(other)
+                        constraint_indices.append(other)
+                        queue.append(other)
+        return cells, constraint_indices
+
+
+def search_layouts(cells, constraints, visit):
+    """walk the mine layouts of a frontier component by backtracking
+
+    cells is a list of block indices, constraints a list of (blocks, mines)
+    over them. visit(mask, mines) is called for every layout, bit i of mask
+    set when cells[i] is a mine; returning True from it stops the search.
+    """
+    position = {cell: i for i, cell in enumerate(cells)}
+    need = [left for _, left in constraints]
+    free = [len(blocks) for blocks, _ in constraints]
+    cell_constraints = [[] for _ in cells]
+    for c, (blocks, _) in enumerate(constraints):
+        for cell in blocks:
+            cell_constraints[position[cell]].append(c)
+    size = len(cells)
+
+    def place(i, mask, mines):
+        if i == size:
+            return visit(mask, mines)
+        for value in (0, 1):
+            ok = True
+            for c in cell_constraints[i]:
+                free[c] -= 1
+                need[c] -= value
+                if need[c] < 0 or need[c] > free[c]:
+                    ok = False
+            stop = ok and place(i + 1, mask | (value << i), mines + value)
+            for c in cell_constraints[i]:
+                free[c] += 1
+                need[c] += value
+            if stop:
+                return True
+        return False
+
+    place(0, 0, 0)
+
+
+def decided_blocks(cells, constraints):
+    """return (safe, mines), the blocks decided the same way in every layout
+
+    Runs the dynamic program of probability.count_component with sets of
+    states instead of counts: the state at the cut before a block is the
+    mines still needed by the constraints with blocks on both sides of it.
+    A forward pass collects the states reachable at every cut, a backward
+    pass the values of each block that lead on to a complete layout. This
+    costs the number of states along the frontier, which stays small, where
+    walking the layouts costs up to 2 ** blocks.
+    """
+    position = {cell: i for i, cell in enumerate(cells)}
+    size = len(cells)
+    blocks = [[position[cell] for cell in cells_] for cells_, _ in constraints]
+    cell_constraints = [[] for _ in range(size)]
+    open_at = [[] for _ in range(size + 1)]  # constraints cut before block i
+    for c, positions in enumerate(blocks):
+        for i in positions:
+            cell_constraints[i].append(c)
+        for i in range(min(positions) + 1, max(positions) + 1):
+            open_at[i].append(c)
+
+    # per block: (state slot or -1, mines, blocks after it) of the constraints
+    # it is part of, and (state slot or -1, mines, part of it) of those cut
+    # after it; a constraint without a slot starts at this block
+    steps = []
+    for i in range(size):
+        slot = {c: k for k, c in enumerate(open_at[i])}
+        checks = [
+            (slot.get(c, -1), constraints[c][1], sum(j > i for j in blocks[c]))
+            for c in cell_constraints[i]
+        ]
+        carried = [
+            (slot.get(c, -1), constraints[c][1], c in cell_constraints[i])
+            for c in open_at[i + 1]
+        ]
+        steps.append((checks, carried))
+
+    def transitions(i, state):
+        """yield (value, next state) for block i assigned 0 or 1"""
+        checks, carried = steps[i]
+        for value in (0, 1):
+            for k, left, after in checks:
+                need = (state[k] if k >= 0 else left) - value
+                if need < 0 or need > after:
+                    break
+            else:
+                yield value, tuple(
+                    (state[k] if k >= 0 else left) - (value if part else 0)
+                    for k, left, part in carried
+                )
+
+    forward = [{()}]
+    for i in range(size):
+        forward.append(
+            {step for state in forward[i] for _, step in transitions(i, state)}
+        )
+
+    alive = {()}  # states at the cut after block i that complete a layout
+    values = [0] * size  # bit 0 set if block i can be safe, bit 1 if a mine
+    for i in range(size - 1, -1, -1):
+        live = set()
+        for state in forward[i]:
+            for value, step in transitions(i, state):
+                if step in alive:
+                    live.add(state)
+                    values[i] |= 1 << value
+        alive = live
+    if not alive:
+        return [], []
+    safe = [cell for cell, seen in zip(cells, values) if seen == 1]
+    mines = [cell for cell, seen in zip(cells, values) if seen == 2]
+    return safe, mines
+
+
+def enumerate_component(cells, constraints):
+    """count the mine layouts of a frontier component
+
+    Return {mines in layout: (layouts, per block mine tallies)} where
+    tallies[i] counts the layouts with a mine on cells[i].
+    """
+    layouts = {}
+    size = len(cells)
+
+    def visit(mask, mines):
+        entry = layouts.get(mines)
+        if entry is None:
+            entry = layouts[mines] = [0, [0] * size]
+        entry[0] += 1
+        tallies = entry[1]
+        bit = 0
+        while mask:
+            if mask & 1:
+                tallies[bit] += 1
+            mask >>= 1
+            bit += 1
+        return False
+
+    search_layouts(cells, constraints, visit)
+    return {mines: (count, tallies) for mines, (count, tallies) in layouts.items()}
+
+
+def solver_strategy(session, rng):
+    """reveal a provably safe block, guess a random untouched one otherwise"""
+    solver = getattr(session, "solver", None)
+    if solver is None:
+        solver = session.solver = Solver(session.field)
+    field = session.field
+    safe, mines = solver.solve()
+    if safe:
+        index = min(safe)
+        return Action(REVEAL, index % field.width, index // field.width)
+
+    candidates = [index for index in field.hidden_indices() if index not in mines]
+    index = rng.choice(candidates)
+    return Action(REVEAL, index % field.width, index // field.width, True)
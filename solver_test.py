@@ -0,0 +1,100 @@
+import random
+import unittest
+
+from game_session import GameSession
+from mine_field import MineField
+from solver import Solver, decided_blocks, enumerate_component, solver_strategy
+
+
+def make_field(width, height, mines):
+    """Build a field with mines exactly at the given (x, y) coordinates"""
+    field = MineField(width, height, 0)
+    for x, y in mines:
+        field.set_mine(x, y, 1)
+    return field
+
+
+class SolverTest(unittest.TestCase):
+    def test_single_point(self):
+        """A 1 with a single undecided block around it is a mine"""
+        # . . M
+        field = make_field(3, 1, [(2, 0)])
+        solver = Solver(field)
+        field.open_mine(0, 0)
+        safe, mines = solver.solve()
+        self.assertEqual((safe, mines), (set(), {2}))
+
+    def test_subset_rule(self):
+        """1-1 along a wall: the block beyond the shared pair is safe"""
+        # row 0 is opened 1 1 1 ., mines in row 1 at x=0 and x=3
+        field = make_field(4, 2, [(0, 1), (3, 1)])
+        solver = Solver(field)
+        for x in range(3):
+            field.open_mine(x, 0)
+        self.assertEqual(solver.solve(), ({6}, set()))
+
+    def test_recount(self):
+        """A number read again after its mines moved decides its blocks"""
+        field = make_field(3, 2, [(1, 1)])
+        solver = Solver(field)
+        field.open_mine(0, 0)
+        self.assertEqual(solver.solve(), (set(), set()))
+        field.set_mine(1, 1, 0)
+        field.set_mine(2, 1, 1)
+        solver.recount([4])
+        self.assertEqual(solver.solve(), ({1, 3, 4}, set()))
+
+    def test_enumeration(self):
+        """Layouts of a small component are counted per mine total"""
+        # blocks a, b, c with a + b = 1 and b + c = 1
+        layouts = enumerate_component([0, 1, 2], [({0, 1}, 1), ({1, 2}, 1)])
+        self.assertEqual(layouts, {1: (1, [0, 1, 0]), 2: (1, [1, 0, 1])})
+
+    def test_decided_blocks_match_the_layouts(self):
+        """The blocks decided are those alike in every enumerated layout"""
+        session = GameSession(30, 16, 99, seed=3)
+        rng = random.Random(3)
+        checked = 0
+        while not session.is_over():
+            session.apply(solver_strategy(session, rng))
+            for cells, constraints in session.solver.components():
+                if len(cells) > 16:
+                    continue
+                layouts = enumerate_component(cells, constraints)
+                total = sum(count for count, _ in layouts.values())
+                mines = [
+                    sum(tallies[i] for _, tallies in layouts.values())
+                    for i in range(len(cells))
+                ]
+                expected = (
+                    [cell for cell, n in zip(cells, mines) if n == 0],
+                    [cell for cell, n in zip(cells, mines) if n == total],
+                )
+                self.assertEqual(decided_blocks(cells, constraints), expected)
+                checked += 1
+        self.assertGreater(checked, 0)
+
+    def test_incremental_matches_fresh(self):
+        """Following a game gives the same result as solving from scratch"""
+        session = GameSession(16, 16, 40, seed=2)
+        rng = random.Random(2)
+        while not session.is_over():
+            session.apply(solver_strategy(session, rng))
+            fresh = Solver(session.field).solve()
+            self.assertEqual(session.solver.solve(), fresh)
+
+    def test_sound(self):
+        """Deductions never contradict the real layout"""
+        for seed in range(20):
+            session = GameSession(30, 16, 99, seed=seed)
+            rng = random.Random(seed)
+            while not session.is_over():
+                action = solver_strategy(session, rng)
+                safe, mines = session.solver.solve()
+                self.assertFalse(any(session.field._mines[i] for i in safe))
+                self.assertTrue(all(session.field._mines[i] for i in mines))
+                session.apply(action)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,138 @@
+"""Evaluate a strategy over many seeded games on all cores.
+
+Seeds are split into chunks of consecutive seeds; every worker process plays a
+whole chunk with batch_runner.run_batch and only sends back its totals, so the
+inter-process traffic is one small tuple per chunk. Totals do not depend on
+how the chunks were scheduled, the result of a seed range is deterministic.
+
+    python tournament.py --games 100000 --workers 8
+    python tournament.py --games 20000 --scaling
+"""
+import argparse
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from batch_runner import STRATEGIES, BatchResult, random_strategy, run_batch
+
+CHUNK_SIZE = 500
+
+
+class TournamentResult(namedtuple("TournamentResult", BatchResult._fields + ("wall",))):
+    """totals of a tournament; seconds is the CPU side sum, wall the elapsed time"""
+
+    __slots__ = ()
+
+    def win_rate(self):
+        return self.wins / self.games if self.games else 0.0
+
+    def mean_clicks(self):
+        return self.clicks / self.games if self.games else 0.0
+
+    def mean_guesses(self):
+        return self.guesses / self.games if self.games else 0.0
+
+    def time_per_game(self):
+        return self.seconds / self.games if self.games else 0.0
+
+    def games_per_second(self):
+        return self.games / self.wall if self.wall else 0.0
+
+
+def _chunks(games, seed, chunk_size):
+    for start in range(seed, seed + games, chunk_size):
+        yield start, min(chunk_size, seed + games - start)
+
+
+def iter_tournament(
+    games,
+    strategy=random_strategy,
+    width=30,
+    height=16,
+    mine_count=99,
+    seed=0,
+    workers=None,
+    chunk_size=CHUNK_SIZE,
+):
+    """play seeds seed .. seed + games - 1, yield the running TournamentResult
+
+    A result is yielded after every finished chunk, the last one covers all
+    games. strategy must be picklable, i.e. a module level function.
+    """
+    totals = [0] * len(BatchResult._fields)
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(
+                run_batch, count, strategy, width, height, mine_count, chunk_seed
+            )
+            for chunk_seed, count in _chunks(games, seed, chunk_size)
+        ]
+        for future in as_completed(futures):
+            totals = [a + b for a, b in zip(totals, future.result())]
+            yield TournamentResult(*totals, time.perf_counter() - start)
+
+
+def run_tournament(games, strategy=random_strategy, **kwargs):
+    """play a tournament, return the final TournamentResult"""
+    result = TournamentResult(0, 0, 0, 0, 0.0, 0.0)
+    for result in iter_tournament(games, strategy, **kwargs):
+        pass
+    return result
+
+
+def scaling_report(games, strategy=random_strategy, max_workers=None, **kwargs):
+    """return [(workers, games per second, efficiency)] for 1 .. max_workers
+
+    Efficiency is the speedup over one worker divided by the worker count.
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    report = []
+    for workers in range(1, max_workers + 1):
+        result = run_tournament(games, strategy, workers=workers, **kwargs)
+        rate = result.games_per_second()
+        base = report[0][1] if report else rate
+        report.append((workers, rate, rate / base / workers))
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--games", type=int, default=10000)
+    parser.add_argument("--size", default="30x16", help="board size WIDTHxHEIGHT")
+    parser.add_argument("--mines", type=int, default=99)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--strategy", default="random", choices=sorted(STRATEGIES))
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--scaling", action="store_true", help="compare 1..N workers")
+    args = parser.parse_args()
+
+    width, height = (int(v) for v in args.size.lower().split("x"))
+    strategy = STRATEGIES[args.strategy]
+    options = dict(
+        width=width,
+        height=height,
+        mine_count=args.mines,
+        seed=args.seed,
+        chunk_size=args.chunk_size,
+    )
+    if args.scaling:
+        for workers, rate, efficiency in scaling_report(
+            args.games, strategy, max_workers=args.workers, **options
+        ):
+            print(f"{workers:>3} workers {rate:>10.0f} games/s {efficiency:>6.0%}")
+        return
+
+    result = run_tournament(args.games, strategy, workers=args.workers, **options)
+    print(
+        f"{result.games} games, win rate {result.win_rate():.2%}, "
+        f"{result.mean_clicks():.1f} clicks, {result.mean_guesses():.1f} guesses, "
+        f"{result.time_per_game() * 1e6:.0f} us/game, "
+        f"{result.games_per_second():.0f} games/s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,20 @@
+import unittest
+
+from batch_runner import run_batch
+from tournament import iter_tournament, run_tournament
+
+
+class TournamentTest(unittest.TestCase):
+    def test_matches_single_process(self):
+        """Chunked multi-process totals equal one sequential batch"""
+        result = run_tournament(120, seed=9, workers=2, chunk_size=25)
+        self.assertEqual(result[:4], run_batch(120, seed=9)[:4])
+
+    def test_streams_partial_results(self):
+        """A running total is yielded after every chunk"""
+        results = list(iter_tournament(60, workers=2, chunk_size=20))
+        self.assertEqual([r.games for r in results], [20, 40, 60])
+
+
+if __name__ == "__main__":
+    unittest.main()
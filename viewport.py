@@ -0,0 +1,267 @@
+"""A pannable, zoomable window onto a board of any size.
+
+The Viewport maps between screen pixels and board blocks. Its camera is the
+board pixel, at the current tile size, shown at the top left corner of its
+rect, so panning moves by whole pixels and never leaves seams between tiles.
+Only the blocks intersecting the rect are drawn.
+
+Tiles are scaled once per tile size by TileCache instead of on every frame,
+and copied into the screen's pixels with numpy indexing over an atlas of them
+rather than blitted one by one.
+At tile sizes up to PIXEL_ZOOM a block covers a few pixels only and blitting
+them one by one would be far too slow; the blocks are then mapped to colours
+with numpy, straight from the board's state buffers, written to a surface of
+one pixel per block with pygame.surfarray and scaled up once.
+"""
+import pygame
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional, small tiles are then blitted one by one
+    np = None
+
+from mine_field import MineStatus
+
+ZOOM_LEVELS = (1, 2, 3, 4, 6, 8, 12, 16, 20, 24, 32, 40)  # pixels per block
+PIXEL_ZOOM = 4  # largest tile size drawn as coloured pixels
+
+# tiles in tile index order, BACKGROUND is a block drawn in the background colour
+TILE_KEYS = tuple(range(9)) + ("blank", "flag", "ask", "mine", "blood", "error")
+BACKGROUND = len(TILE_KEYS)
+_TILE = {key: index for index, key in enumerate(TILE_KEYS)}
+
+
+def _status_tiles():
+    """tile of every status value, _OPENED_TILE where the around count decides"""
+    tiles = bytearray([BACKGROUND]) * (max(status.value for status in MineStatus) + 1)
+    for status, tile in (
+        (MineStatus.INITIAL, _TILE["blank"]),
+        (MineStatus.OPENED, _OPENED_TILE),
+        (MineStatus.BOTH_BUTTON_CLICKING, _OPENED_TILE),
+        (MineStatus.BOOMED, _TILE["blood"]),
+        (MineStatus.FLAGGED, _TILE["flag"]),
+        (MineStatus.QUESTION_MARK, _TILE["ask"]),
+        (MineStatus.HINTING, _TILE[0]),
+    ):
+        tiles[status.value] = tile
+    return bytes(tiles)
+
+
+_OPENED_TILE = 255
+_STATUS_TILES = _status_tiles()
+
+
+def tile_indices(status, counts, mines, game_over):
+    """map the state of a block window to tile indices, as Game.mine_image does
+
+    Takes numpy uint8 arrays of MineStatus values, around counts and 0/1
+    mines of the same shape, returns an array of indices into TILE_KEYS.
+    """
+    tiles = np.frombuffer(_STATUS_TILES, dtype=np.uint8)[status]
+    opened = tiles == _OPENED_TILE
+    tiles[opened] = counts[opened]
+    if game_over:
+        hidden = (status == MineStatus.INITIAL.value) | (status == MineStatus.MINE.value)
+        tiles[hidden & (mines != 0)] = _TILE["mine"]
+    return tiles
+
+
+class TileCache:
+    """The block images scaled to every tile size in use, each scaled once"""
+
+    def __init__(self, sources, background, scaled=None):
+        """scaled holds tiles already scaled, {tile size: {tile key: Surface}}"""
+        self.sources = sources  # tile key -> unscaled Surface
+        self.background = background
+        self._sizes = dict(scaled or {})  # tile size -> {tile key: Surface}
+        self._atlases = {}  # tile size -> numpy array, see atlas
+        self._palette = None
+
+    def tiles(self, size):
+        tiles = self._sizes.get(size)
+        if tiles is None:
+            tiles = self._sizes[size] = {
+                key: pygame.transform.smoothscale(image, (size, size))
+                for key, image in self.sources.items()
+            }
+        return tiles
+
+    def atlas(self, size):
+        """pixels of every tile index, BACKGROUND last, as a numpy array
+
+        Indexed [tile index, x, y, channel] like pygame.surfarray.
+        """
+        atlas = self._atlases.get(size)
+        if atlas is None:
+            tiles = self.tiles(size)
+            atlas = np.empty((BACKGROUND + 1, size, size, 3), dtype=np.uint8)
+            for index, key in enumerate(TILE_KEYS):
+                atlas[index] = pygame.surfarray.array3d(tiles[key])
+            atlas[BACKGROUND] = tuple(self.background)[:3]
+            self._atlases[size] = atlas
+        return atlas
+
+    def palette(self):
+        """average colour of every tile index, BACKGROUND last"""
+        if self._palette is None:
+            colors = [
+                pygame.transform.average_color(self.sources[key])[:3]
+                for key in TILE_KEYS
+            ]
+            colors.append(tuple(self.background)[:3])
+            self._palette = np.array(colors, dtype=np.uint8)
+        return self._palette
+
+
+class Viewport:
+    def __init__(self, rect, board_size=None, tile_size=20, zoom_levels=ZOOM_LEVELS):
+        """rect is the screen area, board_size (width, height) or None if unbounded"""
+        self.rect = pygame.Rect(rect)
+        self.board_size = board_size
+        self.zoom_levels = tuple(sorted(set(zoom_levels) | {tile_size}))
+        self.tile_size = tile_size
+        self.left = self.top = 0  # board pixel at the top left corner
+        self._clamp()
+
+    def center_on(self, x, y):
+        """put the middle of block (x, y) in the middle of the rect"""
+        size = self.tile_size
+        self.left = x * size + size // 2 - self.rect.width // 2
+        self.top = y * size + size // 2 - self.rect.height // 2
+        self._clamp()
+
+    def pan(self, dx, dy):
+        """move the camera by (dx, dy) screen pixels"""
+        self.left += dx
+        self.top += dy
+        self._clamp()
+
+    def zoom(self, steps, anchor=None):
+        """change the tile size by steps zoom levels, keeping the anchor in place
+
+        anchor is a screen position, the middle of the rect by default.
+        Return True if the tile size changed.
+        """
+        level = self.zoom_levels.index(self.tile_size) + steps
+        size = self.zoom_levels[max(0, min(len(self.zoom_levels) - 1, level))]
+        if size == self.tile_size:
+            return False
+        ax, ay = anchor or self.rect.center
+        ax -= self.rect.x
+        ay -= self.rect.y
+        scale = size / self.tile_size
+        self.left = round((self.left + ax) * scale - ax)
+        self.top = round((self.top + ay) * scale - ay)
+        self.tile_size = size
+        self._clamp()
+        return True
+
+    def _clamp(self):
+        if self.board_size is None:
+            return
+        width, height = self.board_size
+        self.left = _clamp_axis(self.left, width * self.tile_size, self.rect.width)
+        self.top = _clamp_axis(self.top, height * self.tile_size, self.rect.height)
+
+    def pixel_mode(self):
+        """whether blocks are drawn as coloured pixels instead of tiles"""
+        return np is not None and self.tile_size <= PIXEL_ZOOM
+
+    def vectorized(self):
+        """whether tiles are looked up with numpy instead of block by block"""
+        return np is not None
+
+    def visible(self):
+        """(x0, y0, x1, y1): the blocks x0 <= x < x1, y0 <= y < y1 in the rect"""
+        size = self.tile_size
+        x0, y0 = self.left // size, self.top // size
+        x1 = -(-(self.left + self.rect.width) // size)
+        y1 = -(-(self.top + self.rect.height) // size)
+        if self.board_size is not None:
+            width, height = self.board_size
+            x0, y0 = max(x0, 0), max(y0, 0)
+            x1, y1 = min(x1, width), min(y1, height)
+        return x0, y0, x1, y1
+
+    def block_at(self, px, py):
+        """the board (x, y) at a screen position, None outside rect or board"""
+        if not self.rect.collidepoint(px, py):
+            return None
+        x = (self.left + px - self.rect.x) // self.tile_size
+        y = (self.top + py - self.rect.y) // self.tile_size
+        if self.board_size is not None:
+            width, height = self.board_size
+            if not (0 <= x < width and 0 <= y < height):
+                return None
+        return x, y
+
+    def block_rect(self, x, y):
+        size = self.tile_size
+        return pygame.Rect(
+            self.rect.x + x * size - self.left, self.rect.y + y * size - self.top, size, size
+        )
+
+    def _tile_indices(self, window, width, height, game_over):
+        status, counts, mines = (
+            np.frombuffer(buffer, dtype=np.uint8).reshape(height, width)
+            for buffer in window
+        )
+        return tile_indices(status, counts, mines, game_over)
+
+    def draw_composite(self, surface, window, atlas, game_over):
+        """write the visible blocks as tiles straight into surface's pixels
+
+        window is (status, counts, mines) of the visible blocks, as returned by
+        the board's window method for the range of visible(). The tile of every
+        block is looked up with numpy and the tiles are composited with numpy
+        fancy indexing over an atlas (TileCache.atlas) into
+        pygame.surfarray.pixels3d, a row of blocks at a time, without a blit
+        per block. Blocks cut by the rect's edge are clipped. The surface must
+        have 24 or 32 bits per pixel.
+        """
+        x0, y0, x1, y1 = self.visible()
+        if x1 <= x0 or y1 <= y0:
+            return
+        width, height, size = x1 - x0, y1 - y0, self.tile_size
+        indices = self._tile_indices(window, width, height, game_over)
+        area = self.block_rect(x0, y0)
+        area.size = (width * size, height * size)
+        clipped = area.clip(self.rect).clip(surface.get_rect())
+        if not clipped.width or not clipped.height:
+            return
+        left, right = clipped.left - area.left, clipped.right - area.left
+        target = pygame.surfarray.pixels3d(surface)[clipped.left : clipped.right]
+        # one row of blocks at a time: atlas[row] is indexed [x, tile x, tile y]
+        # and reshapes to pixels [x, y] without a copy
+        y = clipped.top
+        while y < clipped.bottom:
+            j, offset = divmod(y - area.top, size)
+            rows = min(size - offset, clipped.bottom - y)
+            pixels = atlas[indices[j]].reshape(width * size, size, 3)
+            target[:, y : y + rows] = pixels[left:right, offset : offset + rows]
+            y += rows
+        del target  # unlock the surface
+
+    def draw_pixels(self, surface, window, palette, game_over):
+        """draw the visible blocks as coloured pixels
+
+        window is (status, counts, mines) of the visible blocks, as returned by
+        the board's window method for the range of visible().
+        """
+        x0, y0, x1, y1 = self.visible()
+        if x1 <= x0 or y1 <= y0:
+            return
+        shape = (y1 - y0, x1 - x0)
+        colors = palette[self._tile_indices(window, shape[1], shape[0], game_over)]
+        # surfarray is indexed [x, y]
+        small = pygame.surfarray.make_surface(colors.transpose(1, 0, 2))
+        size = self.tile_size
+        if size > 1:
+            small = pygame.transform.scale(small, (shape[1] * size, shape[0] * size))
+        surface.blit(small, self.block_rect(x0, y0))
+
+
+def _clamp_axis(offset, board, view):
+    if board <= view:
+        return -((view - board) // 2)  # centre a board smaller than the view
+    return max(0, min(offset, board - view))
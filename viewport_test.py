@@ -0,0 +1,149 @@
+import os
+import unittest
+from unittest import mock
+
+try:
+    import pygame
+except ImportError:  # the viewport needs pygame
+    pygame = None
+
+if pygame is not None:
+    import viewport
+    from viewport import TILE_KEYS, Viewport
+
+from game_session import GameStatus
+from mine_field import MineField, MineStatus
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+@unittest.skipIf(pygame is None, "pygame is not installed")
+class ViewportTest(unittest.TestCase):
+    def test_block_at_block_rect(self):
+        """block_at is the inverse of block_rect, whatever the pan and zoom"""
+        view = Viewport((0, 40, 600, 320), (2000, 2000), 20)
+        for steps, dx, dy in ((0, 0, 0), (-3, 1234, 567), (2, -50, 999)):
+            view.zoom(steps)
+            view.pan(dx, dy)
+            x0, y0, x1, y1 = view.visible()
+            for x, y in ((x0, y0), (x1 - 1, y1 - 1), ((x0 + x1) // 2, y0)):
+                rect = view.block_rect(x, y)
+                center = rect.clip(view.rect).center
+                self.assertEqual(view.block_at(*center), (x, y))
+
+    def test_clamped_to_board(self):
+        view = Viewport((0, 0, 600, 320), (100, 100), 20)
+        view.pan(-500, 10**6)
+        self.assertEqual(view.left, 0)
+        self.assertEqual(view.top, 100 * 20 - 320)
+        self.assertEqual(view.visible(), (0, 84, 30, 100))
+        self.assertIsNone(view.block_at(-1, 5))
+
+    def test_zoom_keeps_anchor(self):
+        """The block under the mouse stays under it when zooming"""
+        view = Viewport((0, 40, 600, 320), None, 20)
+        view.center_on(500, -300)
+        anchor = (123, 201)
+        block = view.block_at(*anchor)
+        self.assertTrue(view.zoom(-2, anchor))
+        self.assertEqual(view.block_at(*anchor), block)
+        self.assertFalse(view.zoom(-100, anchor) and view.zoom(-1, anchor))
+
+    @unittest.skipIf(pygame is None or viewport.np is None, "numpy is not installed")
+    def test_tile_indices(self):
+        """Vectorized tile lookup agrees with the statuses block by block"""
+        np = viewport.np
+        field = MineField(16, 16, 40, seed=1)
+        field.open_mine(8, 8)
+        for x, status in enumerate(MineStatus):
+            if field.get_mine(x, 0).status == MineStatus.INITIAL:
+                field.set_status(x, 0, status)
+        status, counts, mines = (
+            np.frombuffer(buffer, dtype=np.uint8).reshape(16, 16)
+            for buffer in field.window(0, 0, 16, 16)
+        )
+        for game_over in (False, True):
+            tiles = viewport.tile_indices(status, counts, mines, game_over)
+            for y in range(16):
+                for x in range(16):
+                    mine = field.get_mine(x, y)
+                    self.assertEqual(
+                        tiles[y, x], expected_tile(mine, game_over), (x, y, game_over)
+                    )
+
+
+@unittest.skipIf(
+    pygame is None or viewport.np is None, "pygame or numpy is not installed"
+)
+class CompositeTest(unittest.TestCase):
+    """The surfarray compositor draws exactly what the block by block loop draws"""
+
+    @classmethod
+    def setUpClass(cls):
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        import main
+
+        cls.game = main.Game()
+
+    @classmethod
+    def tearDownClass(cls):
+        pygame.quit()
+
+    def screenshot(self, vectorized):
+        game = self.game
+        with mock.patch.object(Viewport, "vectorized", return_value=vectorized):
+            game.render_minesweeper()
+        return pygame.image.tostring(game.screen, "RGB")
+
+    def assert_identical(self):
+        self.assertEqual(self.screenshot(True), self.screenshot(False))
+
+    def test_identical_to_block_renderer(self):
+        game = self.game
+        game.reset_game()
+        field = game.field
+        field.open_mine(field.width // 2, field.height // 2)
+        for x, status in enumerate(MineStatus):
+            if field.get_mine(x, 0).status == MineStatus.INITIAL:
+                field.set_status(x, 0, status)
+        for game_status in (GameStatus.STARTED, GameStatus.OVER):
+            game.game_status = game_status
+            self.assert_identical()
+
+    def test_identical_when_panned_and_zoomed(self):
+        """blocks cut by the viewport's edges are clipped the same way"""
+        game = self.game
+        game.reset_game()
+        game.field.open_mine(0, 0)
+        view = game.viewport
+        for steps, dx, dy in ((1, 7, 13), (2, 35, 3), (-1, -9, -30)):
+            view.zoom(steps)
+            view.pan(dx, dy)
+            self.assert_identical()
+        view.zoom(view.zoom_levels.index(20) - view.zoom_levels.index(view.tile_size))
+
+
+def expected_tile(mine, game_over):
+    """the tile index Game.mine_image picks"""
+    status = mine.status
+    if status in (MineStatus.OPENED, MineStatus.BOTH_BUTTON_CLICKING):
+        key = mine.around_mine_count
+    elif status == MineStatus.BOOMED:
+        key = "blood"
+    elif status == MineStatus.FLAGGED:
+        key = "flag"
+    elif status == MineStatus.QUESTION_MARK:
+        key = "ask"
+    elif status == MineStatus.HINTING:
+        key = 0
+    elif game_over and mine.value:
+        key = "mine"
+    elif status == MineStatus.INITIAL:
+        key = "blank"
+    else:
+        return viewport.BACKGROUND
+    return TILE_KEYS.index(key)
+
+
+if __name__ == "__main__":
+    unittest.main()